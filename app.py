@@ -1,20 +1,22 @@
 import streamlit as st
 import pandas as pd
-import matplotlib.pyplot as plt
 from pathlib import Path
-from datetime import datetime
+from datetime import datetime, timedelta
 
 from models.cyber_incident import CyberIncident
 from services.cyber_services import CyberIncidentService
 from services.cyber_analytics import CyberAnalyticsService
 from services.ai_insights_services import AIInsightsService
+from services.incident_summary import IncidentSummary
 
-from models.it_ticket import ITTicket
+from models.it_ticket import ITTicket, DISPLAY_COLUMNS
 from services.it_services import ITTicketService
 from services.it_analytics_service import ITOperationsAnalyticsService
 from services.it_ai_insights import ITAIInsights
 
 from services.ai_openai_service import OpenAIAssistant
+from services.chart_cache import bar_chart, line_chart
+from services.metrics import Laps, export as export_metrics, profile_once, timer
 
 
 # -------------------------------
@@ -27,6 +29,9 @@ st.set_page_config(
 
 DATA_PATH = Path("data/cyber_incidents.csv")
 USERS_PATH = Path("data/users.csv")
+# Rerun interval of the cyber dashboard when "Live refresh" is on, for
+# incidents arriving through services.incident_feed
+LIVE_REFRESH_SECONDS = 5
 
 DOMAINS = [
     "Cybersecurity Intelligence",
@@ -42,6 +47,50 @@ for key in ["logged_in", "page"]:
         st.session_state[key] = None
 
 
+# -------------------------------
+# PAGED TABLES
+# -------------------------------
+def paged_table(name, query, df, filters, sort_options, rename=None):
+    """
+    Renders one filtered page at a time. ``query`` is a service ``query``
+    method; ``filters`` maps its keyword to a (label, column) pair whose
+    distinct values become the multiselect options.
+    """
+    cols = st.columns(len(filters) + 2)
+    chosen = {}
+    for col, (argument, (label, column)) in zip(cols, filters.items()):
+        options = sorted(df[column].dropna().astype(str).unique())
+        chosen[argument] = col.multiselect(label, options, key=f"{name}_{argument}")
+
+    dates = cols[-2].date_input("Date range", value=(), key=f"{name}_dates")
+    start = dates[0] if len(dates) > 0 else None
+    end = dates[1] + timedelta(days=1) if len(dates) > 1 else None
+    sort = cols[-1].selectbox("Sort by", list(sort_options), key=f"{name}_sort",
+                              format_func=lambda value: sort_options[value])
+    descending = st.checkbox("Descending", key=f"{name}_desc")
+
+    # Cursor stack: one entry per page visited; reset when the view changes
+    view = (tuple((k, tuple(v)) for k, v in chosen.items()), start, end, sort, descending)
+    pager = st.session_state.setdefault(f"{name}_pager", {"view": None, "cursors": [None]})
+    if pager["view"] != view:
+        pager["view"], pager["cursors"] = view, [None]
+
+    page = query(**chosen, start=start, end=end, sort=sort, descending=descending,
+                 after=pager["cursors"][-1])
+
+    rows = page["rows"].rename(columns=rename) if rename else page["rows"]
+    st.caption(f"{page['total']} matching records · page {len(pager['cursors'])}")
+    st.dataframe(rows, use_container_width=True)
+
+    prev_col, next_col = st.columns(2)
+    if prev_col.button("◀ Previous", key=f"{name}_prev", disabled=len(pager["cursors"]) == 1):
+        pager["cursors"].pop()
+        st.rerun()
+    if next_col.button("Next ▶", key=f"{name}_next", disabled=page["next_cursor"] is None):
+        pager["cursors"].append(page["next_cursor"])
+        st.rerun()
+
+
 # -------------------------------
 # USER STORAGE
 # -------------------------------
@@ -118,107 +167,147 @@ def dashboard():
 # -------------------------------
 # CYBERSECURITY DASHBOARD
 # -------------------------------
-def cybersecurity_dashboard():
-    st.markdown("## 🛡️ Cybersecurity Intelligence")
-    st.caption("Operational visibility into organisational cyber incidents")
-
-    if st.button("⬅ Back"):
-        st.session_state.page = "dashboard"
-        return
-
-    df = pd.read_csv(DATA_PATH)
+def cyber_panels():
+    """
+    Overview, KPIs, insights and trends. Rendered as a fragment: with
+    "Live refresh" on, only this part reruns every LIVE_REFRESH_SECONDS.
+    """
+    laps = Laps("cyber")
+    laps.lap("load")
+    df = CyberIncidentService.load_frame()
+    # One pass over severity/status shared by every KPI below
+    summary = IncidentSummary.from_frame(df)
 
     # -------------------------------
     # BAR CHART ANALYTICS
     # -------------------------------
+    laps.lap("overview")
     st.markdown("### 📊 Incident Overview")
     st.caption("High-level distribution of incidents by severity and status")
 
+    # Charts are rendered once per data version and served from CHARTS
+    version = CyberIncidentService.data_version()
     col1, col2 = st.columns(2)
 
     with col1:
-        fig, ax = plt.subplots(figsize=(5, 5))
-        df["severity"].value_counts().plot(kind="bar", ax=ax)
-        ax.set_title("Incidents by Severity", fontsize=11)
-        ax.tick_params(labelsize=9)
-        plt.tight_layout()
-        st.pyplot(fig)
+        st.image(
+            bar_chart(version, "cyber_severity", lambda: pd.Series(summary.severity_counts()),
+                      "Incidents by Severity"),
+            use_container_width=True
+        )
 
     with col2:
-        fig, ax = plt.subplots(figsize=(5, 5))
-        df["status"].value_counts().plot(kind="bar", ax=ax)
-        ax.set_title("Incidents by Status", fontsize=11)
-        ax.tick_params(labelsize=9)
-        plt.tight_layout()
-        st.pyplot(fig)
+        st.image(
+            bar_chart(version, "cyber_status", lambda: pd.Series(summary.status_counts()),
+                      "Incidents by Status"),
+            use_container_width=True
+        )
 
     # -------------------------------
     # KPIs
     # -------------------------------
+    laps.lap("kpis")
     st.markdown("### 📌 Key Risk Indicators")
     st.caption("Automated metrics supporting situational awareness")
 
-    kpis = CyberAnalyticsService.compute_kpis(df)
+    kpis = CyberAnalyticsService.compute_kpis(summary)
     c1, c2, c3, c4 = st.columns(4)
     c1.metric("Total Incidents", kpis["total"])
     c2.metric("Open", kpis["open"])
     c3.metric("Critical", kpis["critical"])
     c4.metric("Resolution %", kpis["resolution_rate"])
 
-    st.info(CyberAnalyticsService.risk_score(df))
+    st.info(CyberAnalyticsService.risk_score(summary))
 
     # -------------------------------
     # 🤖 AI-ASSISTED INSIGHTS (CYBERSECURITY)
     # -------------------------------
+    laps.lap("ai_insights")
     st.markdown("### 🤖 AI-Assisted Insights")
     st.caption("Automated and AI-supported interpretation of cybersecurity data")
 
     # Rule-based AI insights
-    ai_insights = CyberAnalyticsService.ai_insights(df)
+    ai_insights = CyberAnalyticsService.ai_insights(summary)
     for insight in ai_insights:
         st.info(insight)
 
     # Optional OpenAI-powered summary
     if st.button("Generate AI Summary"):
-        summary = OpenAIAssistant.generate(
-            "Provide a concise cybersecurity risk summary based on incident trends."
-        )
-        st.success(summary)
+        # Streamed so text appears as soon as the first tokens arrive
+        st.write_stream(OpenAIAssistant.stream(
+            "Provide a concise cybersecurity risk summary based on incident trends.",
+            data_fingerprint=version
+        ))
 
 
     # -------------------------------
     # TREND ANALYSIS 
     # -------------------------------
+    laps.lap("trends")
     st.markdown("### 📈 Incident Trends")
     st.caption("Temporal analysis highlighting changes in incident frequency")
 
-    trend_df = CyberAnalyticsService.incidents_over_time(df)
+    trend_df = CyberAnalyticsService.incidents_over_time()
     if not trend_df.empty:
-        fig, ax = plt.subplots(figsize=(4.5, 2.8))
-        ax.plot(trend_df["date"], trend_df["count"], marker="o")
-        ax.set_title("Incidents Over Time", fontsize=11)
-        ax.tick_params(axis="x", rotation=45, labelsize=8)
-        ax.tick_params(axis="y", labelsize=8)
-        plt.tight_layout()
-        st.pyplot(fig, use_container_width=False)
-        st.info(CyberAnalyticsService.interpret_trends(trend_df))
+        st.image(line_chart(version, "cyber_trend", trend_df.set_index("date")["count"],
+                            "Incidents Over Time"))
+        st.info(CyberAnalyticsService.interpret_trends())
+        for alert in CyberAnalyticsService.rate_alerts()[:3]:
+            st.warning(
+                f"{alert['kind'].title()} in {alert['series']} on {alert['date']}: "
+                f"{alert['count']} incidents vs ~{alert['expected']:.1f} expected (z={alert['z']})"
+            )
     else:
         st.warning("Not enough data for trend analysis.")
 
+    laps.done()
+
+
+def cybersecurity_dashboard():
+    st.markdown("## 🛡️ Cybersecurity Intelligence")
+    st.caption("Operational visibility into organisational cyber incidents")
+
+    if st.button("⬅ Back"):
+        st.session_state.page = "dashboard"
+        return
+
+    live = st.checkbox("Live refresh", key="live_refresh",
+                       help=f"Reload every {LIVE_REFRESH_SECONDS}s to show incidents ingested from feeds")
+
+    # Only the panels rerun on the timer, so the CRUD forms below keep their input
+    st.fragment(run_every=LIVE_REFRESH_SECONDS if live else None)(cyber_panels)()
+
     # -------------------------------
     # CRUD (NOW WORKS)
     # -------------------------------
+    laps = Laps("cyber")
+    laps.lap("crud")
+    df = CyberIncidentService.load_frame()
     st.markdown("### 🛠️ Incident Management (CRUD)")
     st.caption("Create, update and manage cybersecurity incidents")
 
     action = st.selectbox(
         "Choose Action",
-        ["View All Incidents", "Create Incident", "Update Incident Status", "Delete Incident"]
+        ["View All Incidents", "Search Incidents", "Create Incident", "Update Incident Status", "Delete Incident"]
     )
 
     if action == "View All Incidents":
-        incidents = CyberIncidentService.load_all()
-        st.dataframe(pd.DataFrame([i.to_dict() for i in incidents]), use_container_width=True)
+        paged_table(
+            "incidents",
+            CyberIncidentService.query,
+            df,
+            {
+                "severity": ("Severity", "severity"),
+                "status": ("Status", "status"),
+                "category": ("Category", "category")
+            },
+            {"incident_id": "Incident ID", "timestamp": "Timestamp"}
+        )
+
+    elif action == "Search Incidents":
+        text = st.text_input("Search descriptions", help='Use "quotes" for an exact phrase')
+        if text:
+            st.dataframe(CyberIncidentService.search(text), use_container_width=True)
 
     elif action == "Create Incident":
         with st.form("create_incident"):
@@ -229,17 +318,20 @@ def cybersecurity_dashboard():
             description = st.text_area("Description")
 
             if st.form_submit_button("Create"):
-                CyberIncidentService.add_incident(
-                    CyberIncident(
-                        incident_id,
-                        datetime.now(),
-                        severity,
-                        category,
-                        status,
-                        description
+                try:
+                    CyberIncidentService.add_incident(
+                        CyberIncident(
+                            incident_id,
+                            datetime.now(),
+                            severity,
+                            category,
+                            status,
+                            description
+                        )
                     )
-                )
-                st.success("Incident created successfully.")
+                    st.success("Incident created successfully.")
+                except ValueError:
+                    st.error(f"Incident {incident_id} already exists.")
 
     elif action == "Update Incident Status":
         incident_id = st.number_input("Incident ID", min_value=1)
@@ -254,6 +346,8 @@ def cybersecurity_dashboard():
             CyberIncidentService.delete_incident(incident_id)
             st.success("Incident deleted.")
 
+    laps.done()
+
 # -------------------------------
 # IT OPERATIONS DASHBOARD
 # -------------------------------
@@ -268,17 +362,18 @@ def it_dashboard():
     # -------------------------------
     # LOAD DATA
     # -------------------------------
-    tickets = ITTicketService.load_all()
+    laps = Laps("it")
+    laps.lap("load")
+    df = ITTicketService.load_frame()
 
-    if not tickets:
+    if df.empty:
         st.info("No IT tickets available.")
         return
 
-    df = pd.DataFrame([t.to_dict() for t in tickets])
-
     # -------------------------------
     # KPIs
     # -------------------------------
+    laps.lap("kpis")
     st.markdown("### 📊 Operational KPIs")
     st.caption("Snapshot of service health")
 
@@ -290,6 +385,7 @@ def it_dashboard():
     # -------------------------------
     # TRENDS (FORCED RENDER – FINAL)
     # -------------------------------
+    laps.lap("trends")
     st.markdown("### 📈 Ticket Trends")
     st.caption("Monthly ticket volume trends based on creation date")
 
@@ -302,27 +398,38 @@ def it_dashboard():
     if trend_df.empty:
         st.warning("Trend data unavailable.")
     else:
-        fig, ax = plt.subplots(figsize=(4.5, 3.0))
-
-        ax.bar(
-            trend_df["date"].astype(str),
-            trend_df["count"].astype(int),
+        st.image(bar_chart(
+            ITTicketService.data_version(),
+            "it_trend",
+            trend_df.set_index("date")["count"].astype(int),
+            "Ticket Volume Over Time",
+            figsize=(4.5, 3.0),
+            xlabel="Month",
+            ylabel="Number of Tickets",
             color="#4F81BD"
-        )
-
-        ax.set_title("Ticket Volume Over Time", fontsize=11)
-        ax.set_xlabel("Month", fontsize=9)
-        ax.set_ylabel("Number of Tickets", fontsize=9)
-
-        ax.tick_params(axis="x", rotation=45, labelsize=8)
-        ax.tick_params(axis="y", labelsize=8)
+        ))
 
-        plt.tight_layout()
-        st.pyplot(fig, use_container_width=False)
+    # -------------------------------
+    # RESOLUTION TIMES
+    # -------------------------------
+    laps.lap("resolution_times")
+    st.markdown("### ⏱️ Resolution Times")
+    st.caption("Resolution-time percentiles (hours) across the full ticket history")
+
+    by = st.selectbox(
+        "Group by",
+        ["priority", "assigned_to", "month"],
+        format_func=lambda value: DISPLAY_COLUMNS.get(value, value.title())
+    )
+    st.dataframe(
+        ITOperationsAnalyticsService.resolution_times(by=by).round(1),
+        use_container_width=True
+    )
 
     # -------------------------------
     # AI INSIGHTS
     # -------------------------------
+    laps.lap("ai_insights")
     st.markdown("### 🤖 AI-Assisted Insights")
     st.caption("Automated analysis of operational workload and risks")
 
@@ -331,20 +438,49 @@ def it_dashboard():
     st.info(insights["risk"])
     st.success(insights["recommendation"])
 
+    plan = insights["plan"]
+    if plan["moves"]:
+        with st.expander(f"Proposed reassignments ({len(plan['moves'])})"):
+            st.dataframe(
+                pd.DataFrame(plan["moves"], columns=["Ticket ID", "From", "To"]),
+                use_container_width=True
+            )
+            st.bar_chart(pd.DataFrame({"Current": plan["before"], "Proposed": plan["after"]}))
+
     # -------------------------------
     # CRUD
     # -------------------------------
     st.divider()
+    laps.lap("crud")
     st.markdown("### 🛠️ IT Ticket Management (CRUD)")
     st.caption("Create, update, and manage IT service tickets")
 
     action = st.selectbox(
         "Choose Action",
-        ["View All Tickets", "Create Ticket", "Update Ticket Status", "Delete Ticket"]
+        ["View All Tickets", "Search Tickets", "Create Ticket", "Update Ticket Status", "Delete Ticket"]
     )
 
     if action == "View All Tickets":
-        st.dataframe(df, use_container_width=True)
+        paged_table(
+            "tickets",
+            ITTicketService.query,
+            df,
+            {
+                "priority": ("Priority", "priority"),
+                "status": ("Status", "status"),
+                "assigned_to": ("Assigned To", "assigned_to")
+            },
+            {"ticket_id": "Ticket ID", "created_at": "Created At"},
+            rename=DISPLAY_COLUMNS
+        )
+
+    elif action == "Search Tickets":
+        text = st.text_input("Search descriptions", help='Use "quotes" for an exact phrase')
+        if text:
+            st.dataframe(
+                ITTicketService.search(text).rename(columns=DISPLAY_COLUMNS),
+                use_container_width=True
+            )
 
     elif action == "Create Ticket":
         with st.form("create_ticket"):
@@ -357,18 +493,21 @@ def it_dashboard():
             resolution_time = st.number_input("Resolution Time (hours)", min_value=0.0)
 
             if st.form_submit_button("Create Ticket"):
-                ITTicketService.add_ticket(
-                    ITTicket(
-                        ticket_id,
-                        priority,
-                        description,
-                        status,
-                        assigned_to,
-                        created_at,
-                        resolution_time
+                try:
+                    ITTicketService.add_ticket(
+                        ITTicket(
+                            ticket_id,
+                            priority,
+                            description,
+                            status,
+                            assigned_to,
+                            created_at,
+                            resolution_time
+                        )
                     )
-                )
-                st.success("Ticket created successfully.")
+                    st.success("Ticket created successfully.")
+                except ValueError:
+                    st.error(f"Ticket {ticket_id} already exists.")
 
     elif action == "Update Ticket Status":
         ticket_id = st.number_input("Ticket ID", min_value=1)
@@ -388,18 +527,26 @@ def it_dashboard():
             ITTicketService.delete_ticket(ticket_id)
             st.success("Ticket deleted.")
 
+    laps.done()
+
 # -------------------------------
 # ROUTER
 # -------------------------------
-if not st.session_state.logged_in:
-    login_ui()
-else:
-    if st.session_state.page is None:
-        st.session_state.page = "dashboard"
+# PROFILE_RERUN=<file> captures one rerun with cProfile (PROFILE_RERUN_PAGE
+# picks the page); METRICS_PROMETHEUS_PATH / METRICS_JSONL_PATH export timings.
+current_page = st.session_state.page if st.session_state.logged_in else "login"
+with profile_once(current_page), timer("dashboard.rerun", page=current_page or "dashboard"):
+    if not st.session_state.logged_in:
+        login_ui()
+    else:
+        if st.session_state.page is None:
+            st.session_state.page = "dashboard"
+
+        if st.session_state.page == "dashboard":
+            dashboard()
+        elif st.session_state.page == "cyber":
+            cybersecurity_dashboard()
+        elif st.session_state.page == "it":
+            it_dashboard()
 
-    if st.session_state.page == "dashboard":
-        dashboard()
-    elif st.session_state.page == "cyber":
-        cybersecurity_dashboard()
-    elif st.session_state.page == "it":
-        it_dashboard()
+export_metrics()
@@ -1,69 +1,63 @@
 import os
-from security import hash_password, verify_password
+import security
+from security import PasswordWorkerBusy, hash_password, verify_password
+from auth.user_store import UserStore
+from services.metrics import timed, timer
 
 USER_FILE = os.path.join("data", "users.txt")
 
+_stores = {}
 
-def user_exists(username: str) -> bool:
-    if not os.path.exists(USER_FILE):
-        return False
-
-    with open(USER_FILE, "r") as file:
-        for line in file:
-            line = line.strip()
-            if not line or ":" not in line:
-                continue  # skip bad lines safely
-
-            stored_username, _ = line.split(":", 1)
-            if stored_username == username:
-                return True
-
-    return False
-
+# bcrypt time on the workers; the timed() entry points below include queue wait
+security.configure(timer=timer)
 
 
-def register_user(username: str, password: str) -> bool:
-    if user_exists(username):
-        return False
-
-    os.makedirs("data", exist_ok=True)
+def _store() -> UserStore:
+    # One index per user file, built on first use
+    if USER_FILE not in _stores:
+        _stores[USER_FILE] = UserStore(USER_FILE)
+    return _stores[USER_FILE]
 
-    hashed_password = hash_password(password).decode("utf-8")
 
-    with open(USER_FILE, "a") as file:
-        file.write(f"{username}:{hashed_password}\n")
+def user_exists(username: str) -> bool:
+    return _store().exists(username)
 
-    return True
 
 
-def authenticate_user(username: str, password: str) -> bool:
-    if not os.path.exists(USER_FILE):
+@timed("auth.register_user")
+def register_user(username: str, password: str):
+    """
+    True if registered, False if the name is taken, None if the password
+    workers are saturated and the user should try again.
+    """
+    store = _store()
+    if store.exists(username):
         return False
-    
-    with open(USER_FILE, "r") as file:
-        for line in file:
-            stored_username, stored_hash = line.strip().split(":", 1)
-            if stored_username == username:
-                return verify_password(password, stored_hash.encode("utf-8"))
-    return False
 
+    # Hash outside the file lock; add() re-checks the name under it
+    try:
+        hashed_password = hash_password(password).decode("utf-8")
+    except PasswordWorkerBusy:
+        return None
 
+    return store.add(username, hashed_password)
 
-def login_user(username: str, password: str) -> bool:
-    if not os.path.exists(USER_FILE):
-        return False
-
-    with open(USER_FILE, "r") as file:
-        for line in file:
-            line = line.strip()
-            if not line or ":" not in line:
-                continue
 
-            stored_username, stored_hash = line.split(":", 1)
+@timed("auth.authenticate_user")
+def authenticate_user(username: str, password: str):
+    """
+    True or False, or None if the password workers are saturated (a login
+    burst) and the user should try again.
+    """
+    stored_hash = _store().get_hash(username)
+    if stored_hash is None:
+        return False
+    try:
+        return verify_password(password, stored_hash.encode("utf-8"))
+    except PasswordWorkerBusy:
+        return None
 
-            if stored_username == username:
-                return verify_password(password, stored_hash.encode("utf-8"))
 
-    return False
 
-    
\ No newline at end of file
+def login_user(username: str, password: str):
+    return authenticate_user(username, password)
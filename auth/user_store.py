@@ -0,0 +1,71 @@
+import os
+import threading
+
+from services.csv_store import FileLock
+
+
+class UserStore:
+    """
+    In-memory username -> password hash index over a ``username:hash`` file.
+
+    The index is rebuilt only when the file's mtime or size changes, so
+    lookups are a dict access. Appends are serialised with a file lock and
+    the duplicate check is repeated under it, so concurrent registrations
+    of the same name cannot both succeed.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.lock = FileLock(path + ".lock")
+        self._users = {}
+        self._identity = None
+        self._mutex = threading.Lock()
+
+    def _stat(self):
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def _reload(self):
+        identity = self._stat()
+        if identity == self._identity:
+            return
+
+        users = {}
+        if identity is not None:
+            with open(self.path, "r") as file:
+                for line in file:
+                    line = line.strip()
+                    if not line or ":" not in line:
+                        continue  # skip bad lines safely
+                    username, stored_hash = line.split(":", 1)
+                    users.setdefault(username, stored_hash)
+
+        self._users, self._identity = users, identity
+
+    def get_hash(self, username: str):
+        with self._mutex:
+            self._reload()
+            return self._users.get(username)
+
+    def exists(self, username: str) -> bool:
+        return self.get_hash(username) is not None
+
+    def add(self, username: str, hashed_password: str) -> bool:
+        with self.lock.acquire():
+            with self._mutex:
+                self._reload()
+                if username in self._users:
+                    return False
+
+                directory = os.path.dirname(self.path)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                with open(self.path, "a") as file:
+                    file.write(f"{username}:{hashed_password}\n")
+
+                self._users[username] = hashed_password
+                self._identity = self._stat()
+        return True
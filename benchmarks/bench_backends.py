@@ -0,0 +1,143 @@
+import argparse
+import json
+import os
+import tempfile
+from datetime import datetime
+from pathlib import Path
+
+from benchmarks.bench_services import _git_commit, _measure
+from benchmarks.generate_data import SIZES, generate, parse_size
+from db.database import DatabaseManager
+from models.schema import CYBER_INCIDENTS
+from services.cyber_services import STORE
+from services.dataset_cache import DATASETS
+from services.repository import BACKENDS, make_repository
+
+# CSV vs SQLite storage backend for the incident repository, on the same
+# seeded data.
+#   python -m benchmarks.bench_backends --sizes 100k,1m --output backends.json
+#
+# Each backend gets its own scratch directory, so neither sees the
+# other's writes. "open" is the first load: parsing the CSV and writing
+# its column snapshot, or importing it into SQLite.
+
+
+def _bench_backend(backend, rows, seed, repeat):
+    results = []
+
+    def measure(name, fn, times=repeat, setup=None):
+        result = _measure(f"{backend}.{name}", fn, times, rows, setup)
+        results.append({**result, "backend": backend, "op": name})
+
+    generate("data", rows, seed, ticket_rows=0)
+    Path("db").mkdir(exist_ok=True)
+    DATASETS.invalidate()
+    DatabaseManager.close()  # pooled connection belongs to the previous directory
+
+    repository = make_repository(STORE, CYBER_INCIDENTS, "cyber_incidents", "timestamp", backend=backend)
+    first, new_id = 1000, 1000 + rows
+
+    def key(i):
+        return first + (i * 7919) % rows
+
+    measure("open", lambda i: repository.frame(), times=1)
+    measure("frame.reload", lambda i: repository.frame(), setup=DATASETS.invalidate)
+    measure("frame.cached", lambda i: repository.frame())
+    measure("rows.1", lambda i: repository.rows([key(i)]))
+
+    # Single-row writes, then the read that has to see them
+    measure("patch.1", lambda i: repository.patch_many([key(i)], status="Resolved"))
+    measure("frame.after_patch", lambda i: repository.frame(),
+            setup=lambda: repository.patch_many([key(7)], status="Closed"))
+    measure("delete.1", lambda i: repository.delete_many([first + rows - 1 - i]))
+
+    batch = 1000
+
+    def records(i):
+        start = new_id + i * batch
+        return [
+            {"incident_id": start + n, "timestamp": "2024-06-01 12:00:00", "severity": "High",
+             "category": "Phishing", "status": "Open", "description": "Benchmark phishing incident"}
+            for n in range(batch)
+        ]
+
+    repository.frame()
+    measure("append.1k", lambda i: repository.append(records(i)))
+    extra = iter(range(repeat, 2 * repeat))
+    measure("frame.after_append", lambda i: repository.frame(),
+            setup=lambda: repository.append(records(next(extra))))
+    measure("patch.1k", lambda i: repository.patch_many(
+        range(first + i, first + rows, max(rows // batch, 1)), status="Resolved"
+    ))
+
+    measure("query.page", lambda i: repository.query(
+        {"severity": "Critical", "status": "Open"}, sort="timestamp", descending=True, limit=50
+    ))
+    measure("search", lambda i: repository.search("phishing", limit=20))
+
+    DatabaseManager.close()
+    return results
+
+
+def run(sizes, backends, seed=0, repeat=5):
+    report = {
+        "meta": {
+            "commit": _git_commit(),
+            "created": datetime.now().isoformat(timespec="seconds"),
+            "seed": seed,
+            "repeat": repeat
+        },
+        "results": []
+    }
+
+    cwd = os.getcwd()
+    try:
+        for rows in sizes:
+            for backend in backends:
+                print(f"{rows} rows, {backend}")
+                with tempfile.TemporaryDirectory() as tmp:
+                    os.chdir(tmp)
+                    try:
+                        report["results"].extend(_bench_backend(backend, rows, seed, repeat))
+                    finally:
+                        DatabaseManager.close()
+                        os.chdir(cwd)
+    finally:
+        DATASETS.invalidate()
+
+    return report
+
+
+def summary(report):
+    """
+    One line per (rows, op) with each backend's median in ms.
+    """
+    table = {}
+    for result in report["results"]:
+        table.setdefault((result["rows"], result["op"]), {})[result["backend"]] = result["median_s"] * 1000
+    backends = sorted({result["backend"] for result in report["results"]})
+    lines = [f"{'rows':>10}  {'op':<20}" + "".join(f"{backend:>14}" for backend in backends)]
+    for (rows, op), medians in table.items():
+        cells = "".join(
+            f"{medians[backend]:>11.2f} ms" if backend in medians else f"{'-':>14}" for backend in backends
+        )
+        lines.append(f"{rows:>10}  {op:<20}{cells}")
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare the CSV and SQLite storage backends.")
+    parser.add_argument("--sizes", default="10k,100k", help=f"comma-separated row counts or {', '.join(SIZES)}")
+    parser.add_argument("--backends", default=",".join(BACKENDS))
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", help="write results as JSON to this file")
+    args = parser.parse_args()
+
+    sizes = [parse_size(size) for size in args.sizes.split(",")]
+    report = run(sizes, args.backends.split(","), args.seed, args.repeat)
+    print(summary(report))
+
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(report, file, indent=2)
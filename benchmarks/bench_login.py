@@ -0,0 +1,67 @@
+import argparse
+import json
+import os
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import security
+from auth import auth
+
+# Login throughput against bcrypt pool size.
+#   python -m benchmarks.bench_login --rounds 10 --clients 32 --logins 128
+
+
+def run(pool_sizes, rounds, clients, logins, seed_users=50):
+    security.configure(rounds=rounds)
+    user_file = auth.USER_FILE
+
+    with tempfile.TemporaryDirectory() as tmp:
+        auth.USER_FILE = os.path.join(tmp, "users.txt")
+        for i in range(seed_users):
+            auth.register_user(f"analyst{i}", "SecurePass123")
+
+        results = []
+        for workers in pool_sizes:
+            security.configure(workers=workers, max_pending=max(clients, workers) * 2)
+
+            def attempt(i):
+                return auth.login_user(f"analyst{i % seed_users}", "SecurePass123")
+
+            start = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=clients) as sessions:
+                outcomes = list(sessions.map(attempt, range(logins)))
+            elapsed = time.perf_counter() - start
+            ok = outcomes.count(True)
+
+            results.append({
+                "pool_size": workers,
+                "rounds": rounds,
+                "clients": clients,
+                "logins": logins,
+                "successful": ok,
+                "busy": outcomes.count(None),
+                "seconds": round(elapsed, 4),
+                "logins_per_sec": round(logins / elapsed, 2)
+            })
+            print(results[-1])
+
+    auth.USER_FILE = user_file
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark login throughput vs bcrypt pool size.")
+    parser.add_argument("--pool-sizes", default="1,2,4,8")
+    parser.add_argument("--rounds", type=int, default=security.BCRYPT_ROUNDS)
+    parser.add_argument("--clients", type=int, default=32)
+    parser.add_argument("--logins", type=int, default=128)
+    parser.add_argument("--output", help="write results as JSON to this file")
+    args = parser.parse_args()
+
+    sizes = [int(size) for size in args.pool_sizes.split(",")]
+    results = run(sizes, args.rounds, args.clients, args.logins)
+
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(results, file, indent=2)
@@ -0,0 +1,202 @@
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+import security
+from auth import auth
+from benchmarks.generate_data import SIZES, generate, parse_size
+from db import crud
+from db.database import DatabaseManager
+from db.migrate_csv_to_sqlite import migrate
+from models.cyber_incident import CyberIncident
+from services.cyber_analytics import CyberAnalyticsService
+from services.cyber_services import CyberIncidentService
+from services.dataset_cache import DATASETS
+from services.it_analytics_service import ITOperationsAnalyticsService
+from services.it_services import ITTicketService
+
+# Service-layer timings on seeded synthetic data, saved as JSON so two
+# commits can be compared.
+#   python -m benchmarks.bench_services --sizes 10k,100k --output before.json
+#   python -m benchmarks.bench_services --sizes 10k,100k --baseline before.json
+#
+# Each size runs in a scratch directory holding its own data/ and db/,
+# so the real datasets are never touched.
+
+REGRESSION_RATIO = 1.2
+
+
+def _measure(name, fn, repeat, rows, setup=None):
+    timings = []
+    for i in range(repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        fn(i)
+        timings.append(time.perf_counter() - start)
+
+    result = {
+        "name": name,
+        "rows": rows,
+        "repeat": repeat,
+        "min_s": round(min(timings), 6),
+        "median_s": round(statistics.median(timings), 6),
+        "mean_s": round(statistics.fmean(timings), 6)
+    }
+    print(f"  {name:<34} median {result['median_s'] * 1000:10.2f} ms")
+    return result
+
+
+def _bench_size(rows, seed, repeat, rounds):
+    results = []
+
+    def measure(name, fn, times=repeat, setup=None):
+        results.append(_measure(name, fn, times, rows, setup))
+
+    generate("data", rows, seed)
+    Path("db").mkdir(exist_ok=True)
+    DATASETS.invalidate()
+    DatabaseManager.close()  # pooled connection belongs to the previous directory
+
+    # -------------------------------
+    # CSV-BACKED SERVICES
+    # -------------------------------
+    measure("load_frame.csv", lambda i: CyberIncidentService.load_frame(), times=1)
+    measure("load_frame.snapshot", lambda i: CyberIncidentService.load_frame(), setup=DATASETS.invalidate)
+    measure("load_frame.cached", lambda i: CyberIncidentService.load_frame())
+    measure("load_all", lambda i: CyberIncidentService.load_all())
+
+    new_id = 1000 + rows
+    measure("add_incident", lambda i: CyberIncidentService.add_incident(
+        CyberIncident(new_id + i, datetime(2024, 6, 1), "High", "Phishing", "Open", "Benchmark incident")
+    ))
+    measure("update_incident_status", lambda i: CyberIncidentService.update_incident_status(
+        1000 + (i * 7919) % rows, "Resolved"
+    ))
+
+    df = CyberIncidentService.load_frame()
+    measure("compute_kpis", lambda i: CyberAnalyticsService.compute_kpis(df))
+    measure("incidents_over_time.backfill", lambda i: CyberAnalyticsService.incidents_over_time(), times=1)
+    measure("incidents_over_time", lambda i: CyberAnalyticsService.incidents_over_time())
+
+    tickets = ITTicketService.load_frame()
+    measure("ticket_trends", lambda i: ITOperationsAnalyticsService.ticket_trends(tickets))
+
+    # -------------------------------
+    # SQLITE CRUD
+    # -------------------------------
+    measure("migrate", lambda i: migrate(), times=1)
+    measure("crud.get_all_incidents", lambda i: crud.get_all_incidents())
+    measure("crud.get_incident_by_id", lambda i: crud.get_incident_by_id(1000 + (i * 7919) % rows))
+    measure("crud.create_incident", lambda i: crud.create_incident("High", "Open", "Phishing"))
+    measure("crud.update_incident_status", lambda i: crud.update_incident_status(
+        1000 + (i * 7919) % rows, "Closed"
+    ))
+    measure("crud.query_incidents", lambda i: crud.query_incidents(severity="Critical", sort="timestamp"))
+    measure("crud.update_incident_statuses.1k", lambda i: crud.update_incident_statuses(
+        range(1000 + i, 1000 + rows, max(rows // 1000, 1)), "Resolved"
+    ))
+
+    # -------------------------------
+    # LOGIN
+    # -------------------------------
+    security.configure(rounds=rounds)
+    auth.register_user("bench_analyst", "SecurePass123")
+    measure("login_user", lambda i: auth.login_user("bench_analyst", "SecurePass123"))
+
+    DatabaseManager.close()
+    return results
+
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True, cwd=Path(__file__).resolve().parent
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(sizes, seed=0, repeat=5, rounds=security.BCRYPT_ROUNDS):
+    report = {
+        "meta": {
+            "commit": _git_commit(),
+            "created": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "seed": seed,
+            "repeat": repeat,
+            "bcrypt_rounds": rounds
+        },
+        "results": []
+    }
+
+    cwd, user_file = os.getcwd(), auth.USER_FILE
+    try:
+        for rows in sizes:
+            print(f"{rows} rows")
+            with tempfile.TemporaryDirectory() as tmp:
+                os.chdir(tmp)
+                auth.USER_FILE = os.path.join(tmp, "users.txt")
+                try:
+                    report["results"].extend(_bench_size(rows, seed, repeat, rounds))
+                finally:
+                    DatabaseManager.close()
+                    os.chdir(cwd)
+    finally:
+        auth.USER_FILE = user_file
+        DATASETS.invalidate()
+
+    return report
+
+
+def compare(baseline, report, threshold=REGRESSION_RATIO):
+    """
+    Pairs results by (name, rows) and returns those whose median grew by
+    more than ``threshold`` times.
+    """
+    before = {(r["name"], r["rows"]): r for r in baseline["results"]}
+    regressions = []
+    for result in report["results"]:
+        old = before.get((result["name"], result["rows"]))
+        if old is None or old["median_s"] == 0:
+            continue
+        ratio = result["median_s"] / old["median_s"]
+        print(f"  {result['name']:<34} {result['rows']:>10} rows  x{ratio:6.2f}")
+        if ratio > threshold:
+            regressions.append({**result, "baseline_median_s": old["median_s"], "ratio": round(ratio, 3)})
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the service layer on synthetic data.")
+    parser.add_argument("--sizes", default="10k,100k", help=f"comma-separated row counts or {', '.join(SIZES)}")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--rounds", type=int, default=security.BCRYPT_ROUNDS, help="bcrypt cost for login_user")
+    parser.add_argument("--output", help="write results as JSON to this file")
+    parser.add_argument("--baseline", help="compare against a previous --output file")
+    parser.add_argument("--threshold", type=float, default=REGRESSION_RATIO)
+    args = parser.parse_args()
+
+    sizes = [parse_size(size) for size in args.sizes.split(",")]
+    report = run(sizes, args.seed, args.repeat, args.rounds)
+
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(report, file, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as file:
+            regressions = compare(json.load(file), report, args.threshold)
+        for regression in regressions:
+            print(f"REGRESSION {regression['name']} ({regression['rows']} rows): x{regression['ratio']}")
+        raise SystemExit(1 if regressions else 0)
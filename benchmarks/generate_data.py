@@ -0,0 +1,136 @@
+import argparse
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Seeded synthetic datasets with the same columns and value formats as
+# data/cyber_incidents.csv and data/it_tickets.csv.
+#   python -m benchmarks.generate_data --size 1m --out-dir /tmp/bench/data
+
+SIZES = {
+    "10k": 10_000,
+    "100k": 100_000,
+    "1m": 1_000_000,
+    "10m": 10_000_000,
+}
+
+# Rows are generated and written in fixed-size chunks, each with its own
+# seeded generator, so 10M rows never sit in memory at once and the output
+# depends only on (seed, rows).
+CHUNK_ROWS = 500_000
+
+START = np.datetime64("2024-01-01T00:00:00")
+SPAN_HOURS = 365 * 24
+
+SEVERITIES = (["Low", "Medium", "High", "Critical"], [0.30, 0.42, 0.22, 0.06])
+CATEGORIES = (
+    ["Phishing", "Malware", "DDoS", "Misconfiguration", "Unauthorized Access"],
+    [0.52, 0.20, 0.12, 0.08, 0.08]
+)
+INCIDENT_STATUSES = (["Open", "In Progress", "Resolved", "Closed"], [0.20, 0.20, 0.35, 0.25])
+
+PRIORITIES = (["Low", "Medium", "High", "Critical"], [0.30, 0.45, 0.20, 0.05])
+TICKET_STATUSES = (
+    ["Open", "In Progress", "Waiting for User", "Resolved", "Closed"],
+    [0.15, 0.15, 0.08, 0.52, 0.10]
+)
+ASSIGNEES = (["IT_Support_A", "IT_Support_B", "IT_Support_C"], [0.36, 0.33, 0.31])
+
+# Small vocabulary so full-text search has realistic hit rates
+WORDS = np.array([
+    "suspicious", "login", "email", "attachment", "endpoint", "firewall",
+    "credential", "vpn", "beacon", "payload", "outbound", "traffic",
+    "printer", "password", "reset", "laptop", "network", "slow", "access",
+    "denied", "server", "disk", "update", "failed", "license", "mailbox",
+])
+
+
+def _pick(rng, choices, n):
+    values, weights = choices
+    return pd.Categorical.from_codes(rng.choice(len(values), size=n, p=weights), categories=values)
+
+
+def _timestamps(rng, n):
+    hours = rng.integers(0, SPAN_HOURS, size=n)
+    return pd.Series(START + hours.astype("timedelta64[h]"))
+
+
+def _descriptions(rng, prefix, ids, words=4):
+    text = prefix + " " + pd.Series(ids).astype(str)
+    for column in rng.integers(0, len(WORDS), size=(words, len(ids))):
+        text = text + " " + WORDS[column]
+    return text
+
+
+def incidents_frame(rows, seed=0, start_id=1000, chunk=0):
+    rng = np.random.default_rng([seed, 1, chunk])
+    ids = np.arange(start_id, start_id + rows)
+    return pd.DataFrame({
+        "incident_id": ids,
+        "timestamp": _timestamps(rng, rows).dt.strftime("%Y-%m-%d %H:%M:%S.%f"),
+        "severity": _pick(rng, SEVERITIES, rows),
+        "category": _pick(rng, CATEGORIES, rows),
+        "status": _pick(rng, INCIDENT_STATUSES, rows),
+        "description": _descriptions(rng, "Incident", ids),
+    })
+
+
+def tickets_frame(rows, seed=0, start_id=2000, chunk=0):
+    rng = np.random.default_rng([seed, 2, chunk])
+    ids = np.arange(start_id, start_id + rows)
+    priority = _pick(rng, PRIORITIES, rows)
+    # Higher priority tickets are resolved faster
+    scale = np.array([40.0, 30.0, 18.0, 8.0])[priority.codes]
+    hours = np.clip(np.rint(rng.gamma(2.0, scale / 2.0)), 1, 240).astype(int)
+    return pd.DataFrame({
+        "ticket_id": ids,
+        "priority": priority,
+        "description": _descriptions(rng, "Ticket", ids),
+        "status": _pick(rng, TICKET_STATUSES, rows),
+        "assigned_to": _pick(rng, ASSIGNEES, rows),
+        "created_at": _timestamps(rng, rows).dt.strftime("%Y-%m-%d %H:%M:%S"),
+        "resolution_time_hours": hours,
+    })
+
+
+def write_dataset(path, make_frame, rows, seed=0, start_id=0):
+    """
+    Writes ``rows`` rows built by ``make_frame`` to ``path`` in chunks.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w", newline="") as file:
+        for chunk, offset in enumerate(range(0, rows, CHUNK_ROWS)):
+            n = min(CHUNK_ROWS, rows - offset)
+            frame = make_frame(n, seed=seed, start_id=start_id + offset, chunk=chunk)
+            frame.to_csv(file, index=False, header=chunk == 0)
+    return path
+
+
+def generate(out_dir, rows, seed=0, ticket_rows=None):
+    """
+    Writes cyber_incidents.csv and it_tickets.csv into ``out_dir``.
+    """
+    out_dir = Path(out_dir)
+    return {
+        "cyber_incidents": write_dataset(out_dir / "cyber_incidents.csv", incidents_frame, rows, seed, 1000),
+        "it_tickets": write_dataset(
+            out_dir / "it_tickets.csv", tickets_frame, rows if ticket_rows is None else ticket_rows, seed, 2000
+        ),
+    }
+
+
+def parse_size(value):
+    return SIZES.get(value.lower()) or int(value)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate seeded synthetic incident and ticket CSVs.")
+    parser.add_argument("--size", default="10k", help=f"row count or one of {', '.join(SIZES)}")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out-dir", required=True)
+    args = parser.parse_args()
+
+    for name, path in generate(args.out_dir, parse_size(args.size), args.seed).items():
+        print(f"{name}: {path}")
@@ -1,24 +1,81 @@
-import pandas as pd
-from pathlib import Path
+from db.database import get_connection
 
-CSV_PATH = Path("data/cyber_incidents.csv")
+# Aggregations run as GROUP BY queries over the indexed columns declared in
+# db/database.py, so only the aggregated rows leave SQLite.
 
 
-def _load_df():
-    if not CSV_PATH.exists():
-        return pd.DataFrame()
-    return pd.read_csv(CSV_PATH)
+def _query(table, sql, params=()):
+    # Imported here: the migrator imports the services for their STORE.
+    # The sync also creates the schema, and is only a checkpoint read when
+    # nothing changed (or the SQLite backend holds the table).
+    from db.migrate_csv_to_sqlite import sync_source
 
+    sync_source(table)
+    with get_connection() as conn:
+        return conn.execute(sql, params).fetchall()
 
+
+def _group_counts(table, column):
+    rows = _query(
+        table,
+        f"SELECT {column}, COUNT(*) AS n FROM {table} "
+        f"WHERE {column} IS NOT NULL GROUP BY {column} ORDER BY n DESC"
+    )
+    return dict(rows)
+
+
+def _bucket_counts(table, column, width, start=None, end=None):
+    # Timestamps are stored as ISO text, so a prefix is the day/month bucket
+    # and range filters can use the column index.
+    sql = f"SELECT substr({column}, 1, {width}) AS bucket, COUNT(*) FROM {table} WHERE {column} IS NOT NULL"
+    params = []
+    if start is not None:
+        sql += f" AND {column} >= ?"
+        params.append(str(start))
+    if end is not None:
+        sql += f" AND {column} < ?"
+        params.append(str(end))
+    sql += " GROUP BY bucket ORDER BY bucket"
+    return dict(_query(table, sql, params))
+
+
+# -------------------------------
+# CYBER INCIDENTS
+# -------------------------------
 def incidents_by_severity():
-    df = _load_df()
-    if df.empty or "severity" not in df.columns:
-        return {}
-    return df["severity"].value_counts().to_dict()
+    return _group_counts("cyber_incidents", "severity")
 
 
 def incidents_by_status():
-    df = _load_df()
-    if df.empty or "status" not in df.columns:
-        return {}
-    return df["status"].value_counts().to_dict()
+    return _group_counts("cyber_incidents", "status")
+
+
+def incidents_by_category():
+    return _group_counts("cyber_incidents", "category")
+
+
+def incidents_per_day(start=None, end=None):
+    return _bucket_counts("cyber_incidents", "timestamp", 10, start, end)
+
+
+def incidents_per_month(start=None, end=None):
+    return _bucket_counts("cyber_incidents", "timestamp", 7, start, end)
+
+
+# -------------------------------
+# IT TICKETS
+# -------------------------------
+def tickets_by_status():
+    return _group_counts("it_tickets", "status")
+
+
+def tickets_by_priority():
+    return _group_counts("it_tickets", "priority")
+
+
+def tickets_by_assignee():
+    return _group_counts("it_tickets", "assigned_to")
+
+
+def tickets_per_month(start=None, end=None):
+    return _bucket_counts("it_tickets", "created_at", 7, start, end)
@@ -1,50 +1,196 @@
 from db.database import get_connection
 
 def create_incident(severity, status, category):
-    conn = get_connection()
-    cursor = conn.cursor()
-    cursor.execute(
-        "INSERT INTO cyber_incidents (severity, status, category) VALUES (?, ?, ?)",
-        (severity, status, category)
-    )
-    conn.commit()
-    conn.close()
+    with get_connection() as conn:
+        conn.execute(
+            "INSERT INTO cyber_incidents (severity, status, category) VALUES (?, ?, ?)",
+            (severity, status, category)
+        )
 
 def get_all_incidents():
-    conn = get_connection()
-    cursor = conn.cursor()
-    cursor.execute("SELECT * FROM cyber_incidents")
-    rows = cursor.fetchall()
-    conn.close()
-    return rows
+    with get_connection() as conn:
+        return conn.execute("SELECT * FROM cyber_incidents").fetchall()
 
 def get_incident_by_id(incident_id):
-    conn = get_connection()
-    cursor = conn.cursor()
-    cursor.execute(
-        "SELECT * FROM cyber_incidents WHERE id = ?",
-        (incident_id,)
-    )
-    row = cursor.fetchone()
-    conn.close()
-    return row
+    with get_connection() as conn:
+        return conn.execute(
+            "SELECT * FROM cyber_incidents WHERE incident_id = ?",
+            (incident_id,)
+        ).fetchone()
 
 def update_incident_status(incident_id, new_status):
-    conn = get_connection()
-    cursor = conn.cursor()
-    cursor.execute(
-        "UPDATE cyber_incidents SET status = ? WHERE id = ?",
-        (new_status, incident_id)
-    )
-    conn.commit()
-    conn.close()
+    with get_connection() as conn:
+        conn.execute(
+            "UPDATE cyber_incidents SET status = ? WHERE incident_id = ?",
+            (new_status, incident_id)
+        )
 
 def delete_incident(incident_id):
-    conn = get_connection()
-    cursor = conn.cursor()
-    cursor.execute(
-        "DELETE FROM cyber_incidents WHERE id = ?",
-        (incident_id,)
+    with get_connection() as conn:
+        conn.execute(
+            "DELETE FROM cyber_incidents WHERE incident_id = ?",
+            (incident_id,)
+        )
+
+
+# -------------------------------
+# BULK OPERATIONS
+# -------------------------------
+# One executemany per call inside a single transaction. Each function
+# returns the number of rows affected.
+INCIDENT_COLUMNS = ("incident_id", "timestamp", "severity", "category", "status", "description")
+TICKET_COLUMNS = (
+    "ticket_id",
+    "priority",
+    "description",
+    "status",
+    "assigned_to",
+    "created_at",
+    "resolution_time_hours"
+)
+
+
+def sql_value(value):
+    if hasattr(value, "isoformat"):
+        return str(value)  # datetime/date/Timestamp -> same text format as the CSVs
+    if hasattr(value, "item"):
+        return value.item()  # numpy scalars
+    return value
+
+
+def record_rows(records, columns):
+    for record in records:
+        if not isinstance(record, dict):
+            record = record.to_record() if hasattr(record, "to_record") else record.to_dict()
+        yield tuple(sql_value(record.get(column)) for column in columns)
+
+
+def _insert_many(table, columns, records):
+    placeholders = ", ".join("?" for _ in columns)
+    with get_connection() as conn:
+        cur = conn.executemany(
+            f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({placeholders})",
+            record_rows(records, columns)
+        )
+        return cur.rowcount
+
+
+def _update_status_many(table, key, ids, new_status):
+    with get_connection() as conn:
+        cur = conn.executemany(
+            f"UPDATE {table} SET status = ? WHERE {key} = ?",
+            ((new_status, sql_value(i)) for i in ids)
+        )
+        return cur.rowcount
+
+
+def _delete_many(table, key, ids):
+    with get_connection() as conn:
+        cur = conn.executemany(
+            f"DELETE FROM {table} WHERE {key} = ?",
+            ((sql_value(i),) for i in ids)
+        )
+        return cur.rowcount
+
+
+def create_incidents(records):
+    return _insert_many("cyber_incidents", INCIDENT_COLUMNS, records)
+
+def update_incident_statuses(incident_ids, new_status):
+    return _update_status_many("cyber_incidents", "incident_id", incident_ids, new_status)
+
+def delete_incidents(incident_ids):
+    return _delete_many("cyber_incidents", "incident_id", incident_ids)
+
+def create_tickets(records):
+    return _insert_many("it_tickets", TICKET_COLUMNS, records)
+
+def update_ticket_statuses(ticket_ids, new_status):
+    return _update_status_many("it_tickets", "ticket_id", ticket_ids, new_status)
+
+def delete_tickets(ticket_ids):
+    return _delete_many("it_tickets", "ticket_id", ticket_ids)
+
+
+# -------------------------------
+# FILTERED, PAGINATED QUERIES
+# -------------------------------
+# WHERE clauses hit the secondary indexes from init_schema; pages are
+# fetched by keyset ((sort, key) > cursor) instead of OFFSET.
+def _as_list(value):
+    if value is None:
+        return []
+    return list(value) if isinstance(value, (list, tuple, set)) else [value]
+
+
+def _query_page(table, key, columns, date_column, filters, start, end, sort, descending, after, limit):
+    sort = sort or key
+    # Interpolated into ORDER BY and the keyset condition below
+    if sort not in columns:
+        raise ValueError(f"Cannot sort {table} by {sort!r}")
+    where, params = [], []
+    for column, value in filters.items():
+        values = _as_list(value)
+        if values:
+            where.append(f"{column} IN ({', '.join('?' * len(values))})")
+            params.extend(values)
+    if start is not None:
+        where.append(f"{date_column} >= ?")
+        params.append(str(start))
+    if end is not None:
+        where.append(f"{date_column} < ?")
+        params.append(str(end))
+
+    clause = f" WHERE {' AND '.join(where)}" if where else ""
+    with get_connection() as conn:
+        total = conn.execute(f"SELECT COUNT(*) FROM {table}{clause}", params).fetchone()[0]
+
+        page_where, page_params = list(where), list(params)
+        if after is not None:
+            op = "<" if descending else ">"
+            if sort == key:
+                page_where.append(f"{key} {op} ?")
+                page_params.append(after[1])
+            else:
+                page_where.append(f"({sort}, {key}) {op} (?, ?)")
+                page_params.extend(after)
+
+        direction = "DESC" if descending else "ASC"
+        order = f"{key} {direction}" if sort == key else f"{sort} {direction}, {key} {direction}"
+        page_clause = f" WHERE {' AND '.join(page_where)}" if page_where else ""
+        # One row past the page tells whether there is a next one
+        cur = conn.execute(
+            f"SELECT * FROM {table}{page_clause} ORDER BY {order} LIMIT ?",
+            page_params + [limit + 1]
+        )
+        columns = [description[0] for description in cur.description]
+        rows = cur.fetchall()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = dict(zip(columns, rows[-1]))
+        next_cursor = (last[sort], last[key])
+
+    return {"columns": columns, "rows": rows, "total": total, "next_cursor": next_cursor}
+
+
+def query_incidents(severity=None, status=None, category=None, start=None, end=None,
+                    sort="incident_id", descending=False, after=None, limit=50):
+    return _query_page(
+        "cyber_incidents", "incident_id", INCIDENT_COLUMNS, "timestamp",
+        {"severity": severity, "status": status, "category": category},
+        start, end, sort, descending, after, limit
     )
-    conn.commit()
-    conn.close()
+
+
+def query_tickets(priority=None, status=None, assigned_to=None, start=None, end=None,
+                  sort="ticket_id", descending=False, after=None, limit=50):
+    return _query_page(
+        "it_tickets", "ticket_id", TICKET_COLUMNS, "created_at",
+        {"priority": priority, "status": status, "assigned_to": assigned_to},
+        start, end, sort, descending, after, limit
+    )
+
+
+QUERIES = {"cyber_incidents": query_incidents, "it_tickets": query_tickets}
@@ -1,17 +1,88 @@
 import sqlite3
+import threading
+from contextlib import contextmanager
 from pathlib import Path
 
 DB_PATH = Path("db/platform.db")
 
+# Seconds a writer waits on a locked database before raising
+BUSY_TIMEOUT = 5.0
+
+PRAGMAS = (
+    "PRAGMA journal_mode=WAL",         # readers no longer block the writer
+    "PRAGMA synchronous=NORMAL",       # safe with WAL, far fewer fsyncs
+    "PRAGMA cache_size=-65536",        # 64 MB page cache
+    "PRAGMA mmap_size=268435456",      # 256 MB memory-mapped reads
+    "PRAGMA temp_store=MEMORY",
+)
+
+INDEXED_COLUMNS = (
+    ("cyber_incidents", "severity"),
+    ("cyber_incidents", "status"),
+    ("cyber_incidents", "timestamp"),
+    ("cyber_incidents", "category"),
+    ("it_tickets", "status"),
+    ("it_tickets", "priority"),
+    ("it_tickets", "assigned_to"),
+    ("it_tickets", "created_at"),
+)
+
+# Full-text indexes (FTS5, external content) over each table's description.
+# Triggers keep them in step with every INSERT/UPDATE/DELETE on the table.
+FTS_TABLES = (
+    ("cyber_incidents", "incident_id"),
+    ("it_tickets", "ticket_id"),
+)
+
+# One long-lived connection per thread (Streamlit runs each session in its own)
+_local = threading.local()
+
+
 class DatabaseManager:
     @staticmethod
     def connect():
         DB_PATH.parent.mkdir(exist_ok=True)
-        return sqlite3.connect(DB_PATH)
+        conn = sqlite3.connect(DB_PATH, timeout=BUSY_TIMEOUT)
+        for pragma in PRAGMAS:
+            conn.execute(pragma)
+        return conn
+
+    @staticmethod
+    @contextmanager
+    def connection():
+        """
+        Yields this thread's pooled connection inside a transaction.
+        The outermost block commits on success and rolls back on error.
+        """
+        conn = getattr(_local, "conn", None)
+        if conn is None or _local.path != DB_PATH:
+            if conn is not None:
+                conn.close()  # DB_PATH moved; don't leak the old file's connection
+            conn = DatabaseManager.connect()
+            _local.conn, _local.path, _local.depth = conn, DB_PATH, 0
+
+        _local.depth += 1
+        try:
+            yield conn
+            if _local.depth == 1:
+                conn.commit()
+        except Exception:
+            if _local.depth == 1:
+                conn.rollback()
+            raise
+        finally:
+            _local.depth -= 1
+
+    @staticmethod
+    def close():
+        conn = getattr(_local, "conn", None)
+        if conn is not None:
+            conn.close()
+            _local.conn = None
 
     @staticmethod
     def init_schema():
-        with DatabaseManager.connect() as conn:
+        with DatabaseManager.connection() as conn:
             cur = conn.cursor()
             cur.execute("""
                 CREATE TABLE IF NOT EXISTS cyber_incidents (
@@ -34,4 +105,75 @@ class DatabaseManager:
                     resolution_time_hours REAL
                 )
             """)
-            conn.commit()
+            # Per-table counter the SQLite storage backend's writes bump so
+            # readers can tell when cached frames are stale
+            cur.execute("""
+                CREATE TABLE IF NOT EXISTS storage_versions (
+                    source TEXT PRIMARY KEY,
+                    version INTEGER NOT NULL
+                )
+            """)
+            # The backend whose writes a table holds: 'sqlite' once the
+            # SQLite backend has taken it over, otherwise a copy of the CSV
+            cur.execute("""
+                CREATE TABLE IF NOT EXISTS storage_owners (
+                    source TEXT PRIMARY KEY,
+                    backend TEXT NOT NULL
+                )
+            """)
+            # Secondary indexes for the GROUP BY / range queries in db/analytics.py
+            for table, column in INDEXED_COLUMNS:
+                cur.execute(
+                    f"CREATE INDEX IF NOT EXISTS idx_{table}_{column} ON {table} ({column})"
+                )
+            for table, key in FTS_TABLES:
+                _create_fts(cur, table, key)
+
+
+def _create_fts(cur, table, key):
+    fts = f"{table}_fts"
+    existing = {
+        name for (name,) in cur.execute(
+            "SELECT name FROM sqlite_master WHERE name IN (?, ?, ?, ?)",
+            (fts, f"{fts}_ai", f"{fts}_ad", f"{fts}_au")
+        )
+    }
+    # prefix='2 3' adds prefix indexes so short "term*" queries stay fast
+    cur.execute(f"""
+        CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5(
+            description,
+            content='{table}',
+            content_rowid='{key}',
+            prefix='2 3'
+        )
+    """)
+    cur.execute(fts_insert_trigger(table, key))
+    cur.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {table} BEGIN
+            INSERT INTO {fts} ({fts}, rowid, description) VALUES ('delete', old.{key}, old.description);
+        END
+    """)
+    cur.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE OF {key}, description ON {table} BEGIN
+            INSERT INTO {fts} ({fts}, rowid, description) VALUES ('delete', old.{key}, old.description);
+            INSERT INTO {fts} (rowid, description) VALUES (new.{key}, new.description);
+        END
+    """)
+    # A new index, or a table recreated without its triggers, is out of
+    # step with the rows already there; rebuild it from the table.
+    if len(existing) < 4:
+        cur.execute(f"INSERT INTO {fts} ({fts}) VALUES ('rebuild')")
+
+
+def fts_insert_trigger(table, key):
+    # Also used to restore the trigger after a bulk insert indexed its rows directly
+    fts = f"{table}_fts"
+    return f"""
+        CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {table} BEGIN
+            INSERT INTO {fts} (rowid, description) VALUES (new.{key}, new.description);
+        END
+    """
+
+
+def get_connection():
+    return DatabaseManager.connection()
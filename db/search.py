@@ -0,0 +1,82 @@
+import re
+
+import pandas as pd
+
+from db.crud import INCIDENT_COLUMNS, TICKET_COLUMNS
+from db.database import DatabaseManager, get_connection
+
+# Ranked full-text search over the FTS5 indexes declared in db/database.py.
+# Results are ordered by bm25 (best first) and only the page of matches
+# asked for leaves SQLite.
+
+# bm25 costs ~1.5 µs per matching row, so a word found in a third of a
+# million-row table takes half a second to rank. Callers that can live
+# with ranking only the newest matches pass ``window=RANK_WINDOW``: broad
+# queries then stay in the tens of milliseconds, but an older, better
+# match outside the window is never returned.
+RANK_WINDOW = 10_000
+
+_TOKEN = re.compile(r'"([^"]*)"|(\S+)')
+_WORD = re.compile(r"\w+", re.UNICODE)
+
+
+def build_match(text, prefix=True):
+    """
+    Turns user input into an FTS5 MATCH expression.
+
+    ``"quoted words"`` become phrase queries; every other word must match
+    too and, with ``prefix``, also matches longer words (``phish`` finds
+    ``phishing``). Punctuation is dropped, so input can never be a syntax
+    error. Returns None if nothing searchable is left.
+    """
+    parts = []
+    for phrase, word in _TOKEN.findall(text or ""):
+        if phrase:
+            words = _WORD.findall(phrase)
+            if words:
+                parts.append('"' + " ".join(words) + '"')
+        else:
+            for token in _WORD.findall(word):
+                parts.append(f'"{token}"*' if prefix else f'"{token}"')
+    return " AND ".join(parts) if parts else None
+
+
+def _search(table, key, columns, text, limit, prefix, window):
+    match = build_match(text, prefix)
+    if match is None:
+        return pd.DataFrame(columns=[*columns, "rank"])
+
+    # Every time: DB_PATH (or the working directory) may have changed
+    DatabaseManager.init_schema()
+
+    fts = f"{table}_fts"
+    selected = ", ".join(f"t.{column}" for column in columns)
+    if window is None:
+        matches, params = f"SELECT rowid, rank FROM {fts} WHERE {fts} MATCH ?", (match, limit)
+    else:
+        # Newest ``window`` matches by id, ranked among themselves
+        matches = (
+            f"SELECT rowid, rank FROM ("
+            f"  SELECT rowid, rank FROM {fts} WHERE {fts} MATCH ? ORDER BY rowid DESC LIMIT ?"
+            f")"
+        )
+        params = (match, window, limit)
+    sql = (
+        f"SELECT {selected}, top.rank FROM ("
+        f"  {matches} ORDER BY rank LIMIT ?"
+        f") top JOIN {table} t ON t.{key} = top.rowid ORDER BY top.rank"
+    )
+    with get_connection() as conn:
+        rows = conn.execute(sql, params).fetchall()
+    return pd.DataFrame(rows, columns=[*columns, "rank"])
+
+
+def search_incidents(text, limit=20, prefix=True, window=None):
+    return _search("cyber_incidents", "incident_id", INCIDENT_COLUMNS, text, limit, prefix, window)
+
+
+def search_tickets(text, limit=20, prefix=True, window=None):
+    return _search("it_tickets", "ticket_id", TICKET_COLUMNS, text, limit, prefix, window)
+
+
+SEARCHES = {"cyber_incidents": search_incidents, "it_tickets": search_tickets}
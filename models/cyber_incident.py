@@ -1,4 +1,10 @@
+import pandas as pd
+
+
 class CyberIncident:
+    # No per-instance __dict__; loading large incident files builds many of these
+    __slots__ = ("incident_id", "timestamp", "severity", "category", "status", "description")
+
     def __init__(self, incident_id, timestamp, severity, category, status, description):
         self.incident_id = incident_id
         self.timestamp = timestamp
@@ -7,6 +13,18 @@ class CyberIncident:
         self.status = status
         self.description = description
 
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame):
+        """
+        Builds incidents from a DataFrame, converting whole columns at once.
+        """
+        if df.empty:
+            return []
+
+        columns = [df[name] for name in cls.__slots__]
+        columns[1] = pd.to_datetime(columns[1], errors="coerce", format="mixed")
+        return list(map(cls, *(column.tolist() for column in columns)))
+
     def to_dict(self):
         return {
             "incident_id": self.incident_id,
@@ -1,4 +1,20 @@
+import pandas as pd
+
+# Storage column -> label shown in the dashboard
+DISPLAY_COLUMNS = {
+    "ticket_id": "Ticket ID",
+    "priority": "Priority",
+    "description": "Description",
+    "status": "Status",
+    "assigned_to": "Assigned To",
+    "created_at": "Created At",
+    "resolution_time_hours": "Resolution Time (hrs)"
+}
+
+
 class ITTicket:
+    __slots__ = tuple(DISPLAY_COLUMNS)
+
     def __init__(
         self,
         ticket_id,
@@ -17,13 +33,21 @@ class ITTicket:
         self.created_at = created_at
         self.resolution_time_hours = resolution_time_hours
 
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame):
+        """
+        Builds tickets from a DataFrame, converting whole columns at once.
+        """
+        if df.empty:
+            return []
+
+        return list(map(cls, *(df[name].tolist() for name in cls.__slots__)))
+
+    def to_record(self):
+        # Column names as stored in data/it_tickets.csv
+        return {name: getattr(self, name) for name in self.__slots__}
+
     def to_dict(self):
         return {
-            "Ticket ID": self.ticket_id,
-            "Priority": self.priority,
-            "Description": self.description,
-            "Status": self.status,
-            "Assigned To": self.assigned_to,
-            "Created At": self.created_at,
-            "Resolution Time (hrs)": self.resolution_time_hours
+            label: getattr(self, name) for name, label in DISPLAY_COLUMNS.items()
         }
@@ -0,0 +1,86 @@
+import pandas as pd
+
+
+class DatasetSchema:
+    """
+    Declared column types for one dataset, applied once at ingest.
+
+    Low-cardinality text becomes ``category``, timestamps ``datetime64``
+    and numbers are downcast, so filters and groupbys downstream work on
+    compact typed columns instead of Python strings.
+    """
+
+    def __init__(self, key, categories=(), datetimes=(), integers=(), floats=(), text=()):
+        self.key = key
+        self.categories = list(categories)
+        self.datetimes = list(datetimes)
+        self.integers = list(integers)
+        self.floats = list(floats)
+        self.text = list(text)
+
+    @property
+    def columns(self):
+        return [self.key, *self.categories, *self.datetimes, *self.integers, *self.floats, *self.text]
+
+    def read_dtypes(self):
+        # dtypes that are safe to hand to read_csv (values round-trip unchanged)
+        return {column: "category" for column in self.categories}
+
+    @staticmethod
+    def normalize_columns(df: pd.DataFrame) -> pd.DataFrame:
+        df.columns = df.columns.str.strip().str.lower().str.replace(" ", "_")
+        return df
+
+    def apply(self, df: pd.DataFrame) -> pd.DataFrame:
+        df = self.normalize_columns(df)
+
+        for column in self.categories:
+            if column in df and not isinstance(df[column].dtype, pd.CategoricalDtype):
+                df[column] = df[column].astype("category")
+
+        for column in self.datetimes:
+            if column in df and not pd.api.types.is_datetime64_any_dtype(df[column]):
+                df[column] = pd.to_datetime(df[column], errors="coerce", format="mixed")
+
+        for column in [self.key, *self.integers]:
+            if column in df:
+                values = pd.to_numeric(df[column], errors="coerce")
+                if values.isna().any():
+                    df[column] = values
+                else:
+                    df[column] = pd.to_numeric(values, downcast="integer")
+
+        for column in self.floats:
+            if column in df:
+                df[column] = pd.to_numeric(df[column], errors="coerce", downcast="float")
+
+        return df
+
+
+def with_categories(column: pd.Series, values) -> pd.Series:
+    """
+    ``column`` (categorical) able to hold ``values`` too. Categories stay
+    sorted, the order ``apply`` gives a fresh load, so a frame updated in
+    place equals one read again.
+    """
+    categories = column.cat.categories
+    new = pd.Index(values).dropna().unique().difference(categories)
+    if not len(new):
+        return column
+    return column.cat.set_categories(categories.union(new))
+
+
+CYBER_INCIDENTS = DatasetSchema(
+    key="incident_id",
+    categories=["severity", "category", "status"],
+    datetimes=["timestamp"],
+    text=["description"]
+)
+
+IT_TICKETS = DatasetSchema(
+    key="ticket_id",
+    categories=["priority", "status", "assigned_to"],
+    datetimes=["created_at"],
+    floats=["resolution_time_hours"],
+    text=["description"]
+)
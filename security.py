@@ -1,19 +1,106 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+
 import bcrypt
 
+# bcrypt work factor for new hashes; existing hashes keep their own cost
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+
+# bcrypt releases the GIL, so a thread pool gives real parallelism while
+# capping how many hashes run at once.
+BCRYPT_WORKERS = int(os.getenv("BCRYPT_WORKERS", str(os.cpu_count() or 4)))
+BCRYPT_MAX_PENDING = int(os.getenv("BCRYPT_MAX_PENDING", str(BCRYPT_WORKERS * 8)))
+
+
+class PasswordWorkerBusy(RuntimeError):
+    """
+    Raised when the bcrypt queue is full; callers should ask the user to retry.
+    """
+
+
+class _BcryptPool:
+    def __init__(self, workers, max_pending):
+        self.workers = workers
+        self.max_pending = max_pending
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="bcrypt")
+        self._slots = threading.BoundedSemaphore(max_pending)
+
+    def submit(self, fn, *args):
+        if not self._slots.acquire(blocking=False):
+            raise PasswordWorkerBusy(
+                f"{self.max_pending} password checks already queued"
+            )
+        try:
+            future = self._executor.submit(fn, *args)
+        except Exception:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return future
+
+    def shutdown(self):
+        self._executor.shutdown(wait=True)
+
+
+_pool = _BcryptPool(BCRYPT_WORKERS, BCRYPT_MAX_PENDING)
+
+# timer(op) context manager around each bcrypt call on its worker (queue
+# wait excluded); the caller installs one, e.g. services.metrics.timer
+_timer = None
+
+
+def configure(workers=None, max_pending=None, rounds=None, timer=None):
+    """
+    Replaces the bcrypt worker pool and/or work factor (used by benchmarks),
+    or installs the timer bcrypt calls are measured with.
+    """
+    global _pool, BCRYPT_ROUNDS, _timer
+    if rounds is not None:
+        BCRYPT_ROUNDS = rounds
+    if timer is not None:
+        _timer = timer
+    if workers is not None or max_pending is not None:
+        workers = workers or _pool.workers
+        max_pending = max_pending or workers * 8
+        old, _pool = _pool, _BcryptPool(workers, max_pending)
+        old.shutdown()
+
+
+def _timed(op):
+    return _timer(op) if _timer is not None else nullcontext()
+
+
+def _hash(password_bytes, rounds):
+    with _timed("security.bcrypt_hash"):
+        return bcrypt.hashpw(password_bytes, bcrypt.gensalt(rounds=rounds))
+
 
 def hash_password(password: str) -> bytes:
     """
     Takes a plain-text password and returns a hashed version using bcrypt.
     """
     password_bytes = password.encode("utf-8")
-    salt = bcrypt.gensalt()
-    hashed = bcrypt.hashpw(password_bytes, salt)
-    return hashed
+    return _pool.submit(_hash, password_bytes, BCRYPT_ROUNDS).result()
+
+
+def _check(password_bytes, hashed_password):
+    with _timed("security.bcrypt_verify"):
+        return bcrypt.checkpw(password_bytes, hashed_password)
+
+
+def verify_password_async(password: str, hashed_password: bytes):
+    """
+    Queues a bcrypt check on the worker pool and returns a Future[bool].
+    Raises PasswordWorkerBusy if the queue is full.
+    """
+    password_bytes = password.encode("utf-8")
+    return _pool.submit(_check, password_bytes, hashed_password)
 
 
 def verify_password(password: str, hashed_password: bytes) -> bool:
     """
     Verifies a plain-text password against a stored bcrypt hash.
     """
-    password_bytes = password.encode("utf-8")
-    return bcrypt.checkpw(password_bytes, hashed_password)
+    return verify_password_async(password, hashed_password).result()
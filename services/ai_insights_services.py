@@ -1,19 +1,20 @@
-import pandas as pd
+from services.incident_summary import IncidentSummary
+from services.metrics import timed
 
 class AIInsightsService:
 
     @staticmethod
-    def generate_insights(df: pd.DataFrame) -> dict:
+    @timed("cyber.generate_insights")
+    def generate_insights(df) -> dict:
+        summary = IncidentSummary.of(df)
         insights = {}
 
-        if df.empty:
+        if summary.total == 0:
             insights["summary"] = "No incident data available for analysis."
             return insights
 
         # --- Severity Analysis ---
-        severity_counts = df["severity"].value_counts()
-
-        high_risk = severity_counts.get("High", 0) + severity_counts.get("Critical", 0)
+        high_risk = summary.severity("High") + summary.severity("Critical")
 
         if high_risk > 0:
             insights["risk_level"] = "High Risk Environment"
@@ -28,7 +29,7 @@ class AIInsightsService:
             )
 
         # --- Status Analysis ---
-        open_cases = df[df["status"] == "Open"].shape[0]
+        open_cases = summary.status("Open")
 
         if open_cases > 5:
             insights["operational_health"] = "Backlog Detected"
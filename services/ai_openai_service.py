@@ -1,30 +1,267 @@
 import os
+import queue
+import threading
+import time
+from collections import deque
+
+from services.metrics import METRICS
+from services.response_cache import ResponseCache, SingleFlight
 
 try:
     from openai import OpenAI
 except ImportError:
     OpenAI = None
 
+try:
+    import httpx
+except ImportError:  # newer openai releases no longer ship httpx
+    httpx = None
+
+MODEL = "gpt-4o-mini"
+SYSTEM_PROMPT = "You are a cybersecurity analyst."
+
+SIMULATED_SUMMARY = (
+    "AI Assistant (Simulated): Based on current data trends, "
+    "focus should be placed on reducing high-severity incidents "
+    "and improving response times."
+)
+
+# Hard limits so a slow upstream can never freeze the dashboard
+CONNECT_TIMEOUT = float(os.getenv("AI_CONNECT_TIMEOUT", "3"))
+READ_TIMEOUT = float(os.getenv("AI_READ_TIMEOUT", "10"))
+DEADLINE_SECONDS = float(os.getenv("AI_DEADLINE_SECONDS", "15"))
+MAX_CONCURRENT = int(os.getenv("AI_MAX_CONCURRENT", "4"))
+
+# Identical questions about identical data are answered from disk
+RESPONSE_CACHE = ResponseCache(
+    os.getenv("AI_CACHE_PATH", "data/ai_response_cache.db"),
+    ttl=float(os.getenv("AI_CACHE_TTL_SECONDS", "3600")),
+    max_bytes=int(os.getenv("AI_CACHE_MAX_KB", "2048")) * 1024
+)
+_inflight = SingleFlight()
+METRICS.register_cache("ai_responses", RESPONSE_CACHE.stats)
+
+# Process-wide cap on in-flight LLM calls
+_slots = threading.BoundedSemaphore(MAX_CONCURRENT)
+
+# Per-call latency records: time to first token and total, in seconds
+CALL_METRICS = deque(maxlen=200)
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def _get_client(api_key):
+    # One client per process: its HTTP connection pool stays warm (keep-alive).
+    # OPENAI_BASE_URL points it at a stub server in tests.
+    global _client
+    with _client_lock:
+        if _client is None or _client.api_key != api_key:
+            _client = OpenAI(
+                api_key=api_key,
+                base_url=os.getenv("OPENAI_BASE_URL") or None,
+                timeout=(
+                    httpx.Timeout(READ_TIMEOUT, connect=CONNECT_TIMEOUT) if httpx else READ_TIMEOUT
+                ),
+                max_retries=0  # the deadline leaves no room for retries
+            )
+        return _client
+
+
+def _timeout(deadline):
+    # Per-request timeout that never reaches past the call's deadline
+    remaining = max(deadline - time.perf_counter(), 0)
+    if httpx is None:
+        return min(READ_TIMEOUT, remaining)
+    return httpx.Timeout(min(READ_TIMEOUT, remaining), connect=min(CONNECT_TIMEOUT, remaining))
+
+
+def _until(response, deadline):
+    """
+    Yields the chunks of a streamed response and raises TimeoutError once
+    the deadline passes, even while a read is still blocked. The stream is
+    consumed by a daemon thread so the wait itself can be bounded.
+    """
+    chunks = queue.Queue()
+
+    def pump():
+        try:
+            for chunk in response:
+                chunks.put((chunk, None))
+        except Exception as exc:
+            chunks.put((None, exc))
+        else:
+            chunks.put((None, None))
+
+    threading.Thread(target=pump, daemon=True).start()
+    while True:
+        try:
+            chunk, error = chunks.get(timeout=max(deadline - time.perf_counter(), 0))
+        except queue.Empty:
+            raise TimeoutError from None
+        if chunk is None:
+            if error is not None:
+                raise error
+            return
+        yield chunk
+
+
+def _within(fn, deadline):
+    """
+    ``fn()``, or TimeoutError once the deadline passes; a call cut short
+    ends in the background at its own read timeout.
+    """
+    def call():
+        yield fn()
+
+    (result,) = _until(call(), deadline)
+    return result
+
+
+def _messages(prompt):
+    return [
+        {"role": "system", "content": SYSTEM_PROMPT},
+        {"role": "user", "content": prompt}
+    ]
+
+
+def _record(start, first_token, outcome):
+    end = time.perf_counter()
+    CALL_METRICS.append({
+        "ttft": None if first_token is None else round(first_token - start, 4),
+        "total": round(end - start, 4),
+        "outcome": outcome
+    })
+    METRICS.observe("ai.call", end - start, outcome=outcome)
+    if first_token is not None:
+        METRICS.observe("ai.first_token", first_token - start)
+
+
 class OpenAIAssistant:
     @staticmethod
-    def generate(prompt: str) -> str:
+    def generate(prompt: str, data_fingerprint=None) -> str:
+        """
+        ``data_fingerprint`` identifies the data the prompt is about (e.g. a
+        dataset version) so cached answers are not reused after it changes.
+        """
         api_key = os.getenv("OPENAI_API_KEY")
 
         # SAFE FALLBACK (no key required)
         if not api_key or OpenAI is None:
-            return (
-                "AI Assistant (Simulated): Based on current data trends, "
-                "focus should be placed on reducing high-severity incidents "
-                "and improving response times."
-            )
+            return SIMULATED_SUMMARY
+
+        key = ResponseCache.make_key(MODEL, SYSTEM_PROMPT, prompt, data_fingerprint)
+        cached = RESPONSE_CACHE.get(key)
+        if cached is not None:
+            return cached
+
+        def call():
+            start = time.perf_counter()
+            deadline = start + DEADLINE_SECONDS
+            if not _slots.acquire(timeout=DEADLINE_SECONDS):
+                _record(start, None, "busy")
+                return SIMULATED_SUMMARY
+            try:
+                # The whole request, not just each read, ends at the deadline
+                resp = _within(lambda: _get_client(api_key).chat.completions.create(
+                    model=MODEL,
+                    messages=_messages(prompt),
+                    max_tokens=120,
+                    timeout=_timeout(deadline)
+                ), deadline)
+            except TimeoutError:
+                _record(start, None, "deadline")
+                return SIMULATED_SUMMARY
+            except Exception:
+                _record(start, None, "fallback")
+                return SIMULATED_SUMMARY
+            finally:
+                _slots.release()
+
+            text = resp.choices[0].message.content
+            RESPONSE_CACHE.set(key, text)
+            _record(start, time.perf_counter(), "ok")
+            return text
+
+        # Concurrent sessions asking the same thing share one request
+        return _inflight.do(key, call)
+
+    @staticmethod
+    def stream(prompt: str, data_fingerprint=None):
+        """
+        Yields the summary as it arrives. Falls back to the simulated
+        summary if nothing arrives before the deadline.
+        """
+        api_key = os.getenv("OPENAI_API_KEY")
+        if not api_key or OpenAI is None:
+            yield SIMULATED_SUMMARY
+            return
+
+        key = ResponseCache.make_key(MODEL, SYSTEM_PROMPT, prompt, data_fingerprint)
+        cached = RESPONSE_CACHE.get(key)
+        if cached is not None:
+            yield cached
+            return
+
+        # Concurrent sessions asking the same thing share one request: the
+        # leader streams it, the others get its text in one piece when done
+        # (bounded by the leader's wait for a slot plus its deadline)
+        try:
+            followed, text = _inflight.follow(key, timeout=2 * DEADLINE_SECONDS)
+        except TimeoutError:
+            followed, text = True, None
+        if followed:
+            yield SIMULATED_SUMMARY if text is None else text
+            return
+
+        text = None
+        try:
+            text = yield from OpenAIAssistant._stream(api_key, prompt, key)
+        finally:
+            _inflight.finish(key, text)
+
+    @staticmethod
+    def _stream(api_key, prompt, key):
+        # Yields the chunks of one streamed call; returns all the text shown
+        start = time.perf_counter()
+        deadline = start + DEADLINE_SECONDS
+        if not _slots.acquire(timeout=DEADLINE_SECONDS):
+            _record(start, None, "busy")
+            yield SIMULATED_SUMMARY
+            return SIMULATED_SUMMARY
+
+        first_token, parts, outcome, response = None, [], "ok", None
+        try:
+            try:
+                response = _within(lambda: _get_client(api_key).chat.completions.create(
+                    model=MODEL,
+                    messages=_messages(prompt),
+                    max_tokens=120,
+                    stream=True,
+                    timeout=_timeout(deadline)
+                ), deadline)
+                for chunk in _until(response, deadline):
+                    if not chunk.choices:
+                        continue
+                    text = chunk.choices[0].delta.content
+                    if text:
+                        if first_token is None:
+                            first_token = time.perf_counter()
+                        parts.append(text)
+                        yield text
+            except TimeoutError:
+                outcome = "deadline"
+                if response is not None:
+                    response.close()
+            except Exception:
+                outcome = "fallback"
 
-        client = OpenAI(api_key=api_key)
-        resp = client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[
-                {"role": "system", "content": "You are a cybersecurity analyst."},
-                {"role": "user", "content": prompt}
-            ],
-            max_tokens=120
-        )
-        return resp.choices[0].message.content
+            if not parts:
+                yield SIMULATED_SUMMARY
+                return SIMULATED_SUMMARY
+            if outcome == "ok":
+                RESPONSE_CACHE.set(key, "".join(parts))
+            return "".join(parts)
+        finally:
+            _slots.release()
+            _record(start, first_token, outcome)
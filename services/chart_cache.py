@@ -0,0 +1,121 @@
+import io
+import os
+import threading
+from collections import OrderedDict
+
+import matplotlib
+matplotlib.use("Agg")  # non-interactive; never opens GUI windows
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+from services.metrics import METRICS, timed
+
+
+class ChartCache:
+    """
+    Renders matplotlib charts to PNG once per (data version, chart spec).
+
+    Streamlit reruns the whole script on every widget change; with the
+    encoded image cached a rerun only re-sends bytes. Figures are created
+    without pyplot, so nothing is kept in pyplot's global figure registry,
+    and each one is released right after encoding.
+    """
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._images = OrderedDict()
+        self._lock = threading.Lock()
+
+    def render(self, version, spec, draw) -> bytes:
+        """
+        ``spec`` must be hashable and, with ``version``, fully determine the
+        chart. ``draw(fig, ax)`` is only called on a cache miss.
+        """
+        key = (version, spec)
+        with self._lock:
+            if key in self._images:
+                self._images.move_to_end(key)
+                self.hits += 1
+                return self._images[key]
+            self.misses += 1
+
+        png = _render_png(spec, draw)
+
+        with self._lock:
+            self._images[key] = png
+            total = sum(len(image) for image in self._images.values())
+            while total > self.max_bytes and len(self._images) > 1:
+                _, evicted = self._images.popitem(last=False)
+                total -= len(evicted)
+        return png
+
+    def stats(self):
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "entries": len(self._images),
+                "bytes": sum(len(image) for image in self._images.values())
+            }
+
+
+@timed("chart.render")
+def _render_png(spec, draw):
+    figsize = dict(spec).get("figsize", (5, 5))
+    fig = Figure(figsize=figsize)
+    FigureCanvasAgg(fig)
+    try:
+        ax = fig.add_subplot()
+        draw(fig, ax)
+        fig.tight_layout()
+        buffer = io.BytesIO()
+        fig.savefig(buffer, format="png", dpi=100)
+        return buffer.getvalue()
+    finally:
+        fig.clear()
+
+
+CHARTS = ChartCache(max_bytes=int(os.getenv("CHART_CACHE_MB", "32")) * 1024 * 1024)
+METRICS.register_cache("charts", CHARTS.stats)
+
+
+# -------------------------------
+# CHART HELPERS
+# -------------------------------
+def bar_chart(version, name, data, title, figsize=(5, 5), xlabel=None, ylabel=None, **style):
+    """
+    ``data`` is only read on a cache miss, so it may be a callable
+    returning a pandas Series.
+    """
+    spec = (
+        ("name", name), ("figsize", figsize), ("title", title),
+        ("xlabel", xlabel), ("ylabel", ylabel), *sorted(style.items())
+    )
+
+    def draw(fig, ax):
+        series = data() if callable(data) else data
+        ax.bar(series.index.astype(str), series.values, **style)
+        ax.set_title(title, fontsize=11)
+        if xlabel:
+            ax.set_xlabel(xlabel, fontsize=9)
+        if ylabel:
+            ax.set_ylabel(ylabel, fontsize=9)
+        ax.tick_params(axis="x", rotation=45, labelsize=8)
+        ax.tick_params(axis="y", labelsize=8)
+
+    return CHARTS.render(version, spec, draw)
+
+
+def line_chart(version, name, data, title, figsize=(4.5, 2.8)):
+    spec = (("name", name), ("figsize", figsize), ("title", title))
+
+    def draw(fig, ax):
+        series = data() if callable(data) else data
+        ax.plot(series.index, series.values, marker="o")
+        ax.set_title(title, fontsize=11)
+        ax.tick_params(axis="x", rotation=45, labelsize=8)
+        ax.tick_params(axis="y", labelsize=8)
+
+    return CHARTS.render(version, spec, draw)
@@ -0,0 +1,189 @@
+import json
+import os
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from services.csv_store import FileLock
+
+# Bumped when the on-disk layout changes; older snapshots count as stale
+FORMAT = 2
+
+
+class ColumnSnapshot:
+    """
+    Binary column store written next to a CSV file.
+
+    Every column is saved as a ``.npy`` array and reopened with
+    ``np.load(mmap_mode="r")``, so loads skip CSV parsing and worker
+    processes share the pages through the OS cache. Categorical and
+    free-text columns are dictionary-encoded (codes + distinct values,
+    with -1 for missing) and strings are stored as utf-8 bytes plus int64
+    character offsets, so the size follows the total text rather than the
+    longest value. Timestamps are int64 ticks in the column's own unit. The
+    snapshot records the size and mtime of the CSV it was built from and
+    is ignored once they change. Builds take an exclusive lock; loads
+    take none.
+    """
+
+    def __init__(self, directory, schema):
+        self.directory = Path(directory)
+        self.schema = schema
+        self.meta_path = self.directory / "meta.json"
+        self.lock = FileLock(self.directory / "build.lock")
+
+    @staticmethod
+    def _source_identity(source):
+        stat = Path(source).stat()
+        return [stat.st_mtime_ns, stat.st_size]
+
+    def _load_meta(self):
+        try:
+            with open(self.meta_path, "r") as file:
+                return json.load(file)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    def is_fresh(self, source):
+        meta = self._load_meta()
+        return self._matches(meta, source)
+
+    def _matches(self, meta, source):
+        return meta is not None and meta.get("format") == FORMAT and meta["source"] == self._source_identity(source)
+
+    # -------------------------------
+    # LOAD
+    # -------------------------------
+    def load(self, source):
+        """
+        Returns the snapshot as a DataFrame, or None if it is missing or stale.
+        """
+        meta = self._load_meta()
+        if not self._matches(meta, source):
+            return None
+
+        def array(name):
+            return np.load(self.directory / name, mmap_mode="r", allow_pickle=False)
+
+        try:
+            columns = {}
+            for column, spec in meta["columns"].items():
+                if spec["kind"] == "dictionary":
+                    columns[column] = pd.Categorical.from_codes(
+                        array(spec["codes"]), categories=_load_strings(array, spec["categories"])
+                    )
+                elif spec["kind"] == "text":
+                    # Plain strings rather than a category per unique
+                    # description; code -1 picks the trailing NaN
+                    values = np.array(_load_strings(array, spec["values"]) + [np.nan], dtype=object)
+                    columns[column] = values.take(array(spec["codes"]))
+                elif spec["kind"] == "datetime":
+                    # int64 min is NaT, so the view needs no fix-up
+                    columns[column] = array(spec["values"]).view(f"datetime64[{spec['unit']}]")
+                else:
+                    columns[column] = array(spec["values"])
+        except FileNotFoundError:
+            return None  # replaced by a concurrent rebuild
+
+        return pd.DataFrame(columns, copy=False)
+
+    # -------------------------------
+    # WRITE
+    # -------------------------------
+    def rebuild(self, source, build):
+        """
+        The snapshot of ``source``, first written from ``build()`` if it is
+        missing or stale. Concurrent callers wait for one build instead of
+        each parsing the source and interleaving their files.
+        """
+        with self.lock.acquire():
+            df = self.load(source)
+            if df is None:
+                df = build()
+                self._write_locked(df, source)
+            return df
+
+    def write(self, df: pd.DataFrame, source):
+        with self.lock.acquire():
+            self._write_locked(df, source)
+
+    def _write_locked(self, df, source):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        # A fresh token per build means readers never see half-written files;
+        # meta.json is swapped in last.
+        token = str(time.time_ns())
+        columns = {}
+
+        def save(name, values):
+            filename = f"{name}.{token}.npy"
+            np.save(self.directory / filename, np.ascontiguousarray(values), allow_pickle=False)
+            return filename
+
+        def strings(name, values):
+            # Offsets count characters, so a load decodes the blob once and slices it
+            values = [str(value) for value in values]
+            offsets = np.zeros(len(values) + 1, dtype=np.int64)
+            np.cumsum([len(value) for value in values], out=offsets[1:])
+            data = "".join(values).encode("utf-8")
+            return {
+                "data": save(f"{name}.data", np.frombuffer(data, dtype=np.uint8)),
+                "offsets": save(f"{name}.offsets", offsets)
+            }
+
+        for column in df.columns:
+            series = df[column]
+            if pd.api.types.is_datetime64_any_dtype(series):
+                values = series.to_numpy()
+                columns[column] = {
+                    "kind": "datetime",
+                    "unit": np.datetime_data(values.dtype)[0],
+                    "values": save(column, values.view("int64"))
+                }
+            elif pd.api.types.is_numeric_dtype(series) and not isinstance(series.dtype, pd.CategoricalDtype):
+                columns[column] = {"kind": "numeric", "values": save(column, series.to_numpy())}
+            else:
+                if isinstance(series.dtype, pd.CategoricalDtype):
+                    codes, categories = series.cat.codes.to_numpy(), series.cat.categories
+                else:
+                    codes, categories = pd.factorize(series)
+                    codes = codes.astype(np.int32)
+                kind, values = ("text", "values") if column in self.schema.text else ("dictionary", "categories")
+                columns[column] = {
+                    "kind": kind,
+                    "codes": save(f"{column}.codes", codes),
+                    values: strings(f"{column}.{values}", categories)
+                }
+
+        meta = {"format": FORMAT, "source": self._source_identity(source), "rows": len(df), "columns": columns}
+        tmp_path = self.meta_path.with_suffix(".json.tmp" + token)
+        with open(tmp_path, "w") as file:
+            json.dump(meta, file)
+        replaced = self._load_meta()
+        os.replace(tmp_path, self.meta_path)
+
+        # Builds are serialised, so the snapshot just replaced is the only
+        # one whose files are still on disk
+        if replaced is not None:
+            self._remove(replaced)
+
+    def _remove(self, meta):
+        for name in _filenames(meta["columns"]):
+            try:
+                (self.directory / name).unlink()
+            except OSError:
+                pass  # already gone, or still mapped by a reader (Windows)
+
+
+def _filenames(spec):
+    if isinstance(spec, dict):
+        for value in spec.values():
+            yield from _filenames(value)
+    elif isinstance(spec, str) and spec.endswith(".npy"):
+        yield spec
+
+
+def _load_strings(array, spec):
+    text, offsets = array(spec["data"]).tobytes().decode("utf-8"), array(spec["offsets"]).tolist()
+    return [text[start:end] for start, end in zip(offsets[:-1], offsets[1:])]
@@ -0,0 +1,344 @@
+import io
+import json
+import os
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from models.schema import with_categories
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+
+class FileLock:
+    """
+    Inter-process lock backed by a sidecar ``.lock`` file.
+
+    Every acquisition opens its own file handle, so two Streamlit sessions
+    (threads of one process) exclude each other just like two processes do.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+
+    @contextmanager
+    def acquire(self, shared=False):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, "a+b") as handle:
+            if fcntl is not None:
+                fcntl.flock(handle, fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+            else:
+                # msvcrt has no shared mode; readers lock exclusively too
+                handle.seek(0)
+                while True:
+                    try:
+                        msvcrt.locking(handle.fileno(), msvcrt.LK_LOCK, 1)
+                        break
+                    except OSError:
+                        continue
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(handle, fcntl.LOCK_UN)
+                else:
+                    handle.seek(0)
+                    msvcrt.locking(handle.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def _json_default(value):
+    if isinstance(value, np.generic):
+        return value.item()
+    return str(value)
+
+
+# Reused across writes; json.dumps(default=...) builds a new encoder per call
+_ENCODER = json.JSONEncoder(default=_json_default)
+
+
+class CSVStore:
+    """
+    Append-only persistence for a CSV dataset.
+
+    The CSV file is the compacted base. Inserts, field patches and
+    tombstones are appended to a JSON-lines journal next to it, folded in
+    on every read and written back into the CSV by ``compact``.
+    """
+
+    def __init__(self, path, key, columns, dtypes=None, snapshot=None, compact_bytes=8 * 1024 * 1024):
+        self.path = Path(path)
+        self.key = key
+        self.columns = list(columns)
+        # Passed to read_csv for the base file; must round-trip through to_csv
+        self.dtypes = dtypes
+        # Optional ColumnSnapshot of the typed base, used by read()
+        self.snapshot = snapshot
+        self.journal_path = self.path.with_suffix(".journal")
+        self.compact_bytes = compact_bytes
+        self.lock = FileLock(self.path.with_suffix(".lock"))
+        # Bumped on every write from this process; part of identity()
+        self.version = 0
+
+    # -------------------------------
+    # READ
+    # -------------------------------
+    def identity(self):
+        """
+        Cheap token that changes whenever the stored data may have changed.
+        """
+        stats = []
+        for path in (self.path, self.journal_path):
+            try:
+                stat = path.stat()
+                stats.append((stat.st_mtime_ns, stat.st_size))
+            except FileNotFoundError:
+                stats.append(None)
+        return (str(self.path), *stats, self.version)
+
+    def read(self, with_identity=False):
+        """
+        Current state of the dataset. With a snapshot configured the base
+        comes back typed from the memory-mapped column store.
+        ``with_identity`` also returns the identity the data was read at.
+        """
+        with self.lock.acquire(shared=True):
+            df = self._read_locked(typed=True)
+            return (df, self.identity()) if with_identity else df
+
+    def _read_locked(self, typed=False):
+        return self._fold(self._read_base(typed), self._read_journal())
+
+    def _read_base(self, typed):
+        if not self.path.exists():
+            return pd.DataFrame(columns=self.columns)
+
+        if not typed or self.snapshot is None:
+            return pd.read_csv(self.path, dtype=self.dtypes)
+
+        base = self.snapshot.load(self.path)
+        if base is None:
+            base = self.snapshot.rebuild(
+                self.path, lambda: self.snapshot.schema.apply(pd.read_csv(self.path, dtype=self.dtypes))
+            )
+        return base
+
+    def _read_journal(self):
+        if not self.journal_path.exists():
+            return []
+
+        ops = []
+        with open(self.journal_path, "r", encoding="utf-8") as file:
+            for line in file:
+                try:
+                    ops.append(json.loads(line))
+                except json.JSONDecodeError:
+                    continue  # torn trailing line from an interrupted write
+        return ops
+
+    def _fold(self, base, ops):
+        if not ops:
+            return base
+
+        inserts, patches, deletes = [], [], {}
+        for seq, op in enumerate(ops):
+            if op["op"] == "insert":
+                inserts.append((seq, op["row"]))
+            elif op["op"] == "patch":
+                patches.append((seq, op["key"], op["fields"]))
+            elif op["op"] == "delete":
+                deletes[op["key"]] = seq
+
+        # Every row remembers when it was written so that tombstones and
+        # patches only touch rows that existed before them.
+        frames = [base.assign(_seq=-1)]
+        if inserts:
+            rows = pd.DataFrame([row for _, row in inserts])
+            rows["_seq"] = [seq for seq, _ in inserts]
+            frames.append(rows)
+        df = pd.concat(frames, ignore_index=True)
+
+        if deletes:
+            deleted_at = df[self.key].map(deletes)
+            df = df[~(deleted_at > df["_seq"])].reset_index(drop=True)
+
+        if patches:
+            positions = df.groupby(self.key, sort=False).indices
+            seqs = df["_seq"].to_numpy()
+            updates = {}
+            for seq, key, fields in patches:
+                rows = positions.get(key)
+                if rows is None or deletes.get(key, -1) > seq:
+                    continue
+                rows = rows[seqs[rows] < seq]
+                for field, value in fields.items():
+                    column = updates.setdefault(field, {})
+                    for row in rows:
+                        column[row] = value
+
+            for field, column in updates.items():
+                values = list(column.values())
+                if isinstance(df[field].dtype, pd.CategoricalDtype):
+                    df[field] = with_categories(df[field], values)
+                df.loc[list(column), field] = values
+
+        return df.drop(columns="_seq")
+
+    # -------------------------------
+    # WRITE
+    # -------------------------------
+    def append(self, records):
+        """
+        Journals new rows. Every write returns the (before, after)
+        identity tokens taken under the write lock, so a cache holding
+        ``before`` can apply the write itself instead of rereading.
+        """
+        return self._write([{"op": "insert", "row": record} for record in records])
+
+    def patch(self, key, **fields):
+        return self.patch_many([key], **fields)
+
+    def patch_many(self, keys, **fields):
+        return self._write([{"op": "patch", "key": key, "fields": fields} for key in keys])
+
+    def delete(self, key):
+        return self.delete_many([key])
+
+    def delete_many(self, keys):
+        return self._write([{"op": "delete", "key": key} for key in keys])
+
+    def _write(self, entries):
+        if not entries:
+            return None, None
+
+        payload = "".join(_ENCODER.encode(entry) + "\n" for entry in entries)
+
+        with self.lock.acquire():
+            before = self.identity()
+            self.journal_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.journal_path, "a", encoding="utf-8") as file:
+                file.write(payload)
+                file.flush()
+                os.fsync(file.fileno())
+
+            if self.journal_path.stat().st_size > self.compact_bytes:
+                self._compact_locked()
+            self.version += 1
+            return before, self.identity()
+
+    def compact(self):
+        """
+        Folds the journal into the CSV base and truncates it. Returns the
+        (before, after) identities; the rows themselves are unchanged.
+        """
+        with self.lock.acquire():
+            before = self.identity()
+            self._compact_locked()
+            return before, self.identity()
+
+    def _compact_locked(self):
+        if not self.journal_path.exists():
+            return
+
+        df = self._read_locked()
+        tmp_path = self.path.with_suffix(".csv.tmp")
+        df.to_csv(tmp_path, index=False)
+        os.replace(tmp_path, self.path)
+        if self.snapshot is not None:
+            self.snapshot.write(self.snapshot.schema.apply(df), self.path)
+        # A fresh epoch tells incremental readers (e.g. the SQLite
+        # migrator) that the base was rewritten and offsets are stale.
+        with open(self.journal_path, "w", encoding="utf-8") as file:
+            file.write(json.dumps({"op": "epoch", "id": time.time_ns()}) + "\n")
+        self.version += 1
+
+    def epoch(self):
+        """
+        Id written by the last compaction, or None if never compacted.
+        """
+        if not self.journal_path.exists():
+            return None
+        with open(self.journal_path, "r", encoding="utf-8") as file:
+            try:
+                first = json.loads(file.readline())
+            except json.JSONDecodeError:
+                return None
+        return first["id"] if first.get("op") == "epoch" else None
+
+
+def iter_csv_chunks(path, offset=0, chunk_rows=50_000, final=True):
+    """
+    Streams a CSV from a byte offset, yielding (DataFrame, end_offset).
+
+    Records are split on newlines outside quoted fields, so descriptions
+    with embedded line breaks stay intact. With ``final=False`` an
+    unterminated last record is held back, because a writer may still be
+    appending to it.
+    """
+    with open(path, "rb") as file:
+        header = file.readline()
+        offset = max(offset, len(header))
+        file.seek(offset)
+
+        chunk, rows = [], 0
+        record, quotes = [], 0
+        for line in file:
+            record.append(line)
+            quotes += line.count(b'"')
+            if quotes % 2 or not line.endswith(b"\n"):
+                continue
+
+            chunk.extend(record)
+            offset += sum(len(part) for part in record)
+            record, quotes = [], 0
+            rows += 1
+            if rows >= chunk_rows:
+                yield pd.read_csv(io.BytesIO(header + b"".join(chunk))), offset
+                chunk, rows = [], 0
+
+        if record and final and quotes % 2 == 0:
+            chunk.extend(record)
+            offset += sum(len(part) for part in record)
+
+        if chunk:
+            yield pd.read_csv(io.BytesIO(header + b"".join(chunk))), offset
+
+
+def iter_jsonl_chunks(path, offset=0, chunk_rows=50_000, final=True):
+    """
+    JSON-lines counterpart of ``iter_csv_chunks``: yields (DataFrame,
+    end_offset) from a byte offset. Lines that are not JSON objects are
+    skipped; with ``final=False`` an unterminated last line is held back.
+    """
+    with open(path, "rb") as file:
+        file.seek(offset)
+        records = []
+        for line in file:
+            if not line.endswith(b"\n") and not final:
+                break
+            offset += len(line)
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if isinstance(record, dict):
+                records.append(record)
+            if len(records) >= chunk_rows:
+                yield pd.DataFrame.from_records(records), offset
+                records = []
+        if records:
+            yield pd.DataFrame.from_records(records), offset
+
+
+if __name__ == "__main__":
+    import sys
+
+    # python -m services.csv_store data/cyber_incidents.csv incident_id
+    path, key = sys.argv[1], sys.argv[2]
+    CSVStore(path, key, columns=[]).compact()
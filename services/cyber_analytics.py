@@ -1,13 +1,23 @@
 import pandas as pd
+from services.incident_summary import IncidentSummary
+from datetime import date, timedelta
+
+from services.incident_anomalies import DETECTOR, WARMUP_DAYS, TREND_RATIO, daily_state
+from services.metrics import timed
+
+# The KPI methods below take either the incident DataFrame or an
+# IncidentSummary built from it once per page.
 
 class CyberAnalyticsService:
 
     @staticmethod
-    def compute_kpis(df: pd.DataFrame):
-        total = len(df)
-        open_incidents = len(df[df["status"] == "Open"])
-        critical = len(df[df["severity"] == "Critical"])
-        resolved = len(df[df["status"] == "Resolved"])
+    @timed("cyber.compute_kpis")
+    def compute_kpis(df):
+        summary = IncidentSummary.of(df)
+        total = summary.total
+        open_incidents = summary.status("Open")
+        critical = summary.severity("Critical")
+        resolved = summary.status("Resolved")
 
         resolution_rate = round((resolved / total) * 100, 2) if total > 0 else 0
 
@@ -19,11 +29,13 @@ class CyberAnalyticsService:
         }
 
     @staticmethod
-    def risk_score(df: pd.DataFrame):
+    @timed("cyber.risk_score")
+    def risk_score(df):
+        summary = IncidentSummary.of(df)
         score = 0
-        score += len(df[df["severity"] == "Critical"]) * 3
-        score += len(df[df["severity"] == "High"]) * 2
-        score += len(df[df["status"] == "Open"]) * 1
+        score += summary.severity("Critical") * 3
+        score += summary.severity("High") * 2
+        score += summary.status("Open") * 1
 
         if score > 15:
             return "HIGH"
@@ -32,18 +44,20 @@ class CyberAnalyticsService:
         return "LOW"
 
     @staticmethod
-    def ai_insights(df: pd.DataFrame):
+    @timed("cyber.ai_insights")
+    def ai_insights(df):
+        summary = IncidentSummary.of(df)
         insights = []
 
-        if df.empty:
+        if summary.total == 0:
             return ["No incidents available for intelligent analysis."]
 
-        if (df["severity"] == "Critical").sum() >= 3:
+        if summary.severity("Critical") >= 3:
             insights.append(
                 "⚠️ A high concentration of critical incidents has been detected. This indicates elevated organisational risk."
             )
 
-        if (df["status"] == "Open").sum() > len(df) / 2:
+        if summary.status("Open") > summary.total / 2:
             insights.append(
                 "🚨 More than half of incidents remain open, suggesting possible delays in incident response."
             )
@@ -57,40 +71,86 @@ class CyberAnalyticsService:
     
 
     @staticmethod
-    def incidents_over_time(df: pd.DataFrame):
+    @timed("cyber.incidents_over_time", rows=len)
+    def incidents_over_time(df: pd.DataFrame = None):
+        # Without a frame, read the persisted daily rollup (O(days))
+        if df is None:
+            from services.cyber_services import CyberIncidentService
+            return CyberIncidentService.daily_rollup().trend()
+
         if df.empty:
             return pd.DataFrame()
 
-        df_copy = df.copy()
-        df_copy["timestamp"] = pd.to_datetime(df_copy["timestamp"])
-        df_copy["date"] = df_copy["timestamp"].dt.date
+        timestamps = df["timestamp"]
+        if not pd.api.types.is_datetime64_any_dtype(timestamps):
+            timestamps = pd.to_datetime(timestamps, errors="coerce", format="mixed")
 
-        trend = df_copy.groupby("date").size().reset_index(name="count")
+        trend = timestamps.groupby(timestamps.dt.date.rename("date")).size().reset_index(name="count")
         return trend
 
     @staticmethod
-    def severity_distribution(df: pd.DataFrame):
-        if df.empty:
-            return {}
+    def severity_distribution(df):
+        return IncidentSummary.of(df).severity_counts()
 
-        return df["severity"].value_counts().to_dict()
+    @staticmethod
+    def _detector_state():
+        # Rebuilt from the incident data whenever it doesn't match them,
+        # otherwise kept up to date by CyberIncidentService.add_incidents
+        from services.cyber_services import CyberIncidentService
+        return CyberIncidentService.rate_detector().load()
 
     @staticmethod
-    def interpret_trends(trend_df: pd.DataFrame):
-        if trend_df.empty:
+    @timed("cyber.interpret_trends")
+    def interpret_trends(trend_df: pd.DataFrame = None):
+        """
+        Compares the short-term daily incident rate with its EWMA baseline
+        and mentions rate anomalies from the last week. Reads the online
+        detector state unless a (date, count) frame is given.
+        """
+        if trend_df is not None and trend_df.empty:
             return "No trend data available for interpretation."
 
-        if len(trend_df) >= 2:
-            if trend_df.iloc[-1]["count"] > trend_df.iloc[0]["count"]:
-                return (
-                    "Incident frequency shows an increasing trend over time, "
-                    "which may indicate growing threat activity or improved detection."
-                )
-            else:
-                return (
-                    "Incident frequency appears stable or decreasing, "
-                    "suggesting improved security posture or reduced threat activity."
-                )
-
-        return "Insufficient data points to determine a clear trend."
+        state = CyberAnalyticsService._detector_state() if trend_df is None else daily_state(trend_df)
+        level = DETECTOR.level("all", state)
+        if level is None or level["days"] < WARMUP_DAYS:
+            return "Insufficient data points to determine a clear trend."
+
+        change = level["recent"] / level["baseline"] - 1 if level["baseline"] > 0 else 0.0
+        if change > TREND_RATIO:
+            message = (
+                f"Incident frequency is rising ({level['recent']:.1f}/day vs a "
+                f"{level['baseline']:.1f}/day baseline), which may indicate growing "
+                "threat activity or improved detection."
+            )
+        elif change < -TREND_RATIO:
+            message = (
+                f"Incident frequency is falling ({level['recent']:.1f}/day vs a "
+                f"{level['baseline']:.1f}/day baseline), suggesting improved security "
+                "posture or reduced threat activity."
+            )
+        else:
+            message = f"Incident frequency is stable at about {level['baseline']:.1f}/day."
+
+        since = date.fromisoformat(level["day"]) - timedelta(days=7)
+        anomalies = DETECTOR.alerts(since=since, state=state)
+        if anomalies:
+            worst = max(anomalies, key=lambda alert: alert["z"])
+            message += (
+                f" {len(anomalies)} rate anomal{'y' if len(anomalies) == 1 else 'ies'} in the "
+                f"last 7 days; largest: {worst['series']} on {worst['date']} "
+                f"({worst['count']} vs ~{worst['expected']:.1f} expected)."
+            )
+        return message
+
+    @staticmethod
+    def rate_alerts(days=7):
+        """
+        Detector alerts (newest first) for the last ``days`` days of data.
+        """
+        state = CyberAnalyticsService._detector_state()
+        level = DETECTOR.level("all", state)
+        if level is None:
+            return []
+        since = date.fromisoformat(level["day"]) - timedelta(days=days)
+        return DETECTOR.alerts(since=since, state=state)
 
@@ -1,57 +1,173 @@
 import pandas as pd
 from pathlib import Path
 from models.cyber_incident import CyberIncident
+from models.schema import CYBER_INCIDENTS
+from services.column_snapshot import ColumnSnapshot
+from services.csv_store import CSVStore
+from services.incident_anomalies import DETECTOR
+from services.incident_rollup import ROLLUP
+from services.metrics import timed
+from services.query import PAGE_SIZE
+from services.repository import make_repository
 
 DATA_PATH = Path("data/cyber_incidents.csv")
+COLUMNS = ["incident_id", "timestamp", "severity", "category", "status", "description"]
+
+# New incidents, status changes and deletes are journaled instead of
+# rewriting the whole CSV on every call.
+STORE = CSVStore(
+    DATA_PATH,
+    key="incident_id",
+    columns=COLUMNS,
+    dtypes=CYBER_INCIDENTS.read_dtypes(),
+    snapshot=ColumnSnapshot(DATA_PATH.with_suffix(".snapshot"), CYBER_INCIDENTS)
+)
+
+# STORAGE_BACKEND picks where the rows live: the CSV store above, or the
+# cyber_incidents table in SQLite (imported from the CSV on first use)
+REPOSITORY = make_repository(STORE, CYBER_INCIDENTS, "cyber_incidents", "timestamp")
+
+
+def _matching(incident_ids):
+    # Only incidents that exist are written; returns their ids and rows
+    rows = REPOSITORY.rows(incident_ids)
+    return rows["incident_id"].unique().tolist(), rows
+
+
+def _sources(write):
+    # A repository write's (before, after) identities, as persisted with derived state
+    return [REPOSITORY.source_identity(identity) for identity in write]
+
+
+def _current(state, rebuild=False):
+    # Derived state built from other data (edited outside the services,
+    # compacted onto different rows, another STORAGE_BACKEND) is rebuilt
+    if rebuild or state.source() != REPOSITORY.source_identity(REPOSITORY.identity()):
+        df, identity = REPOSITORY.frame_with_identity()
+        state.backfill(df, REPOSITORY.source_identity(identity))
+    return state
 
 
 class CyberIncidentService:
 
     @staticmethod
+    @timed("cyber.load_frame", rows=len)
+    def load_frame():
+        """
+        Returns all incidents as a DataFrame typed by CYBER_INCIDENTS.
+        Dashboards should use this instead of converting load_all() back.
+        Parsed frames are shared through the process-wide dataset cache.
+        """
+        return REPOSITORY.frame()
+
+    @staticmethod
+    def data_version():
+        # Changes with every write; used to key derived caches (charts)
+        return REPOSITORY.identity()
+
+    @staticmethod
+    def daily_rollup(rebuild=False):
+        """
+        The persisted daily rollup, rebuilt first if it doesn't match the
+        stored incidents.
+        """
+        return _current(ROLLUP, rebuild)
+
+    @staticmethod
+    def rate_detector(rebuild=False):
+        """
+        The persisted incident rate detector, rebuilt first if it doesn't
+        match the stored incidents.
+        """
+        return _current(DETECTOR, rebuild)
+
+    @staticmethod
+    @timed("cyber.load_all", rows=len)
     def load_all():
-        if not DATA_PATH.exists():
-            return []
-
-        df = pd.read_csv(DATA_PATH)
-        incidents = []
-
-        if df.empty:
-            return []
-        
-        incidents = []
-
-        for _, row in df.iterrows():
-            incident = CyberIncident (
-                incident_id=row["incident_id"],
-                timestamp=pd.to_datetime(row["timestamp"]),
-                severity=row["severity"],
-                category=row["category"],
-                status=row["status"],
-                description=row["description"]
-            )
-            incidents.append(incident)
-        return incidents
+        return CyberIncident.from_frame(CyberIncidentService.load_frame())
+
+    @staticmethod
+    @timed("cyber.query", rows=lambda page: len(page["rows"]))
+    def query(severity=None, status=None, category=None, start=None, end=None,
+              sort="incident_id", descending=False, after=None, limit=PAGE_SIZE):
+        """
+        One page of incidents matching the filters plus the total count.
+        Pass the returned ``next_cursor`` as ``after`` for the next page.
+        """
+        return REPOSITORY.query(
+            {"severity": severity, "status": status, "category": category},
+            start=start,
+            end=end,
+            sort=sort,
+            descending=descending,
+            after=after,
+            limit=limit
+        )
 
     @staticmethod
     def add_incident(incident: CyberIncident):
-        df = pd.read_csv(DATA_PATH) if DATA_PATH.exists() else pd.DataFrame()
-        df = pd.concat([df, pd.DataFrame([incident.to_dict()])], ignore_index=True)
-        df.to_csv(DATA_PATH, index=False)
+        CyberIncidentService.add_incidents([incident])
 
     @staticmethod
     def update_incident_status(incident_id, new_status):
-        if not DATA_PATH.exists():
-            return
-
-        df = pd.read_csv(DATA_PATH)
-        df.loc[df["incident_id"] == incident_id, "status"] = new_status
-        df.to_csv(DATA_PATH, index=False)
+        CyberIncidentService.update_incident_statuses([incident_id], new_status)
 
     @staticmethod
     def delete_incident(incident_id):
-        if not DATA_PATH.exists():
-            return
+        CyberIncidentService.delete_incidents([incident_id])
+
+    # -------------------------------
+    # BULK OPERATIONS
+    # -------------------------------
+    # Each batch is a single write to the repository (one journal append
+    # or one transaction); the return value is the number of incidents
+    # affected. The daily rollup is updated with the same delta and new
+    # incidents feed the rate detector; a delete, which the detector can't
+    # take back, leaves it to be rebuilt on the next read.
+    @staticmethod
+    @timed("cyber.add_incidents", rows=int)
+    def add_incidents(incidents):
+        records = [incident.to_dict() for incident in incidents]
+        sources = _sources(REPOSITORY.append(records))
+        added = pd.DataFrame(records, columns=COLUMNS)
+        ROLLUP.apply(*sources, added=added)
+        DETECTOR.apply(*sources, added=added)
+        return len(records)
 
-        df = pd.read_csv(DATA_PATH)
-        df = df[df["incident_id"] != incident_id]
-        df.to_csv(DATA_PATH, index=False)
+    @staticmethod
+    @timed("cyber.update_incident_statuses", rows=int)
+    def update_incident_statuses(incident_ids, new_status):
+        ids, rows = _matching(incident_ids)
+        sources = _sources(REPOSITORY.patch_many(ids, status=new_status))
+        ROLLUP.apply(*sources, added=rows.assign(status=new_status), removed=rows)
+        DETECTOR.apply(*sources)  # counts don't depend on status
+        return len(rows)
+
+    @staticmethod
+    @timed("cyber.delete_incidents", rows=int)
+    def delete_incidents(incident_ids):
+        ids, rows = _matching(incident_ids)
+        sources = _sources(REPOSITORY.delete_many(ids))
+        ROLLUP.apply(*sources, removed=rows)
+        return len(rows)
+
+    @staticmethod
+    @timed("cyber.search", rows=len)
+    def search(text, limit=20, prefix=True, window=None):
+        """
+        Ranked full-text search over incident descriptions (best match first).
+        ``"quoted words"`` match as a phrase; other words also match as
+        prefixes unless ``prefix`` is False. By default every match is
+        ranked; with ``window`` (e.g. ``db.search.RANK_WINDOW``) only the
+        newest ``window`` matches are, which keeps broad queries fast but
+        can miss an older, better match.
+        """
+        return REPOSITORY.search(text, limit, prefix, window)
+
+    @staticmethod
+    @timed("cyber.compact")
+    def compact():
+        # Same incidents under a new identity
+        sources = _sources(REPOSITORY.compact())
+        ROLLUP.apply(*sources)
+        DETECTOR.apply(*sources)
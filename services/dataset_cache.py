@@ -0,0 +1,151 @@
+import os
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+
+from models.schema import with_categories
+from services.metrics import METRICS
+
+SAMPLE_ROWS = 1000
+
+
+def _estimate_bytes(df: pd.DataFrame) -> int:
+    # memory_usage(deep=True) walks every Python string; for the LRU bound
+    # an estimate from a sample of each object column is enough.
+    total = int(df.memory_usage(deep=False, index=False).sum())
+    for column in df.columns:
+        series = df[column]
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            series = pd.Series(series.cat.categories)
+        if series.dtype.kind not in "OT" or series.empty:
+            continue
+        sample = series.iloc[:SAMPLE_ROWS]
+        per_row = sample.memory_usage(deep=True, index=False) / len(sample)
+        total += int(per_row * len(series))
+    return total
+
+
+def _append(df: pd.DataFrame, rows: pd.DataFrame) -> pd.DataFrame:
+    # concat would turn categoricals with different categories into object
+    rows = rows.reindex(columns=df.columns)
+    for column in df.columns:
+        if isinstance(df[column].dtype, pd.CategoricalDtype):
+            df = df.assign(**{column: with_categories(df[column], rows[column])})
+            rows[column] = pd.Categorical(rows[column], categories=df[column].cat.categories)
+        elif pd.api.types.is_datetime64_any_dtype(df[column]) and rows[column].dtype != df[column].dtype:
+            # datetime objects come in as [us]; keep the frame's unit
+            rows[column] = rows[column].astype(df[column].dtype)
+    return pd.concat([df, rows], ignore_index=True)
+
+
+class DatasetCache:
+    """
+    Process-wide cache of parsed DataFrames.
+
+    Entries are keyed by dataset name and validated against an identity
+    token (file mtime/size plus a write counter), so a write through the
+    services or an edit by another process is picked up on the next read.
+    Least recently used datasets are evicted past ``max_bytes``.
+    """
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()  # name -> (identity, df, nbytes)
+        self._lock = threading.Lock()
+
+    def get(self, name, identity, loader) -> pd.DataFrame:
+        """
+        The cached frame if it is at ``identity``, else ``loader()``.
+        """
+        return self.get_with_identity(name, identity, lambda: (loader(), identity))[0]
+
+    def get_with_identity(self, name, identity, loader):
+        """
+        ``get`` for a loader returning (df, identity the data was read at).
+        The entry is stored under the identity the loader reports, which
+        is safer to ``extend`` from when a write races the read, and
+        returned with the frame: (df, identity).
+        """
+        name = str(name)
+
+        with self._lock:
+            entry = self._entries.get(name)
+            if entry is not None and entry[0] == identity:
+                self._entries.move_to_end(name)
+                self.hits += 1
+                return entry[1].copy(deep=False), entry[0]
+            self.misses += 1
+
+        df, identity = loader()
+        nbytes = _estimate_bytes(df)
+
+        with self._lock:
+            self._entries[name] = (identity, df, nbytes)
+            self._entries.move_to_end(name)
+            self._evict()
+
+        return df.copy(deep=False), identity
+
+    def extend(self, name, before, after, rows):
+        """
+        ``transform`` that appends ``rows()`` (typed like the cached frame).
+        """
+        return self.transform(name, before, after, lambda df: _append(df, rows()))
+
+    def transform(self, name, before, after, fn):
+        """
+        Moves a cached frame from identity ``before`` to ``after`` by
+        applying the write to it, ``fn(df) -> new df``, instead of
+        reloading the dataset. ``fn`` must not modify ``df`` in place.
+        A no-op unless the entry is at ``before``.
+        """
+        name = str(name)
+        with self._lock:
+            entry = self._entries.get(name)
+            if entry is None or before is None or entry[0] != before:
+                return False
+
+        df = fn(entry[1])
+
+        with self._lock:
+            # Another writer may have moved or dropped the entry meanwhile
+            current = self._entries.get(name)
+            if current is None or current[0] != before:
+                return False
+            self._entries[name] = (after, df, _estimate_bytes(df))
+            self._entries.move_to_end(name)
+            self._evict()
+        return True
+
+    def invalidate(self, name=None):
+        with self._lock:
+            if name is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(str(name), None)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "entries": len(self._entries),
+                "bytes": sum(entry[2] for entry in self._entries.values()),
+                "max_bytes": self.max_bytes
+            }
+
+    def _evict(self):
+        total = sum(entry[2] for entry in self._entries.values())
+        # Always keep the newest entry, even if it alone exceeds the bound
+        while total > self.max_bytes and len(self._entries) > 1:
+            _, (_, _, nbytes) = self._entries.popitem(last=False)
+            total -= nbytes
+
+
+DATASETS = DatasetCache(
+    max_bytes=int(os.getenv("DATASET_CACHE_MB", "512")) * 1024 * 1024
+)
+METRICS.register_cache("datasets", DATASETS.stats)
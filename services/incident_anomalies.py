@@ -0,0 +1,235 @@
+import json
+import math
+import os
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+import pandas as pd
+
+from services.csv_store import FileLock
+
+DETECTOR_PATH = Path("data/cyber_incident_detector.json")
+
+# Smoothing for the daily-rate baseline (~2 weeks of memory) and for the
+# short-term level used to call a trend
+ALPHA = 0.1
+FAST_ALPHA = 0.3
+WARMUP_DAYS = 7          # no alerts until a series has this many closed days
+Z_THRESHOLD = 3.0        # single-day spike
+CUSUM_SLACK = 0.5        # CUSUM drift allowance, in standard deviations
+CUSUM_LIMIT = 5.0        # sustained shift
+TREND_RATIO = 0.15       # fast level vs baseline needed to call a trend
+MAX_ALERTS = 200
+MAX_GAP_DAYS = 366
+
+
+def _series_keys(severity, category):
+    return ("all", f"severity:{severity}", f"category:{category}")
+
+
+def _new_series(day):
+    return {
+        "day": day, "count": 0, "alerted": False,
+        "mean": 0.0, "var": 0.0, "fast": 0.0, "cusum": 0.0, "days": 0
+    }
+
+
+def _std(state):
+    # Counts are at least Poisson-noisy, so the variance never drops below the mean
+    return math.sqrt(max(state["var"], state["mean"], 1.0))
+
+
+class IncidentRateDetector:
+    """
+    Online spike and shift detection on daily incident counts, kept per
+    severity, per category and overall.
+
+    Each series holds the open day's count plus an EWMA mean/variance
+    of the closed days, so recording an incident is O(1). The open day is
+    checked as it fills, which lets a spike alert before the day ends. A
+    closed day feeds the baseline and a one-sided CUSUM that catches
+    sustained rises a single-day z-score misses. State and alerts persist
+    in a JSON file between runs, with the source identity of the incident
+    data they were built from (see ``Repository.source_identity``); the
+    service rebuilds a state whose source no longer matches.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.lock = FileLock(self.path.with_suffix(".lock"))
+
+    def load(self):
+        if not self.path.exists():
+            return {"series": {}, "alerts": [], "source": None}
+        with open(self.path, "r") as file:
+            return json.load(file)
+
+    def source(self):
+        return self.load().get("source")
+
+    def _save(self, state):
+        tmp_path = self.path.with_suffix(".json.tmp")
+        with open(tmp_path, "w") as file:
+            json.dump(state, file)
+        os.replace(tmp_path, self.path)
+
+    # -------------------------------
+    # UPDATE
+    # -------------------------------
+    def apply(self, before, after, added: pd.DataFrame = None):
+        """
+        Records the incidents in ``added`` (timestamp, severity, category)
+        for a write that moved the data from source identity ``before`` to
+        ``after``. Returns False, leaving the state to be rebuilt, if it
+        wasn't at ``before``.
+        """
+        with self.lock.acquire():
+            state = self.load()
+            if before is None or state.get("source") != before:
+                return False
+            if added is not None and len(added):
+                _observe_frame(state, added)
+            state["source"] = after
+            self._save(state)
+        return True
+
+    def backfill(self, df: pd.DataFrame, source):
+        state = {"series": {}, "alerts": [], "source": source}
+        _observe_frame(state, df)
+        with self.lock.acquire():
+            self._save(state)
+        return state
+
+    # -------------------------------
+    # READ
+    # -------------------------------
+    def alerts(self, since=None, state=None):
+        """
+        Alerts newest first, optionally only those for days >= ``since``.
+        """
+        state = state or self.load()
+        alerts = state["alerts"]
+        if since is not None:
+            alerts = [alert for alert in alerts if alert["date"] >= str(since)]
+        return sorted(alerts, key=lambda alert: alert["date"], reverse=True)
+
+    def level(self, series="all", state=None):
+        """
+        Baseline daily rate, short-term rate and days seen for ``series``.
+        """
+        state = state or self.load()
+        current = state["series"].get(series)
+        if current is None:
+            return None
+        return {"baseline": current["mean"], "recent": current["fast"], "days": current["days"], "day": current["day"]}
+
+
+def daily_state(trend_df: pd.DataFrame):
+    """
+    Detector state for the overall series of a (date, count) frame, such
+    as ``incidents_over_time`` output; nothing is persisted.
+    """
+    state = {"series": {}, "alerts": []}
+    for day, count in zip(pd.to_datetime(trend_df["date"]), trend_df["count"]):
+        _add(state, "all", day.date().isoformat(), int(count))
+    return state
+
+
+def _observe_frame(state, df):
+    timestamps = pd.to_datetime(df["timestamp"], errors="coerce", format="mixed")
+    keys = [
+        timestamps.dt.normalize().rename("day"),
+        df["severity"].astype(object),
+        df["category"].astype(object),
+    ]
+    # Same-day incidents collapse to one add per series; days are replayed in order
+    counts = df.groupby(keys, sort=True, dropna=True, observed=True).size()
+    for (day, severity, category), n in counts.items():
+        for key in _series_keys(severity, category):
+            _add(state, key, day.date().isoformat(), int(n))
+
+
+def _add(state, key, day, n):
+    series = state["series"].get(key)
+    if series is None:
+        series = state["series"][key] = _new_series(day)
+
+    if day < series["day"]:
+        return  # late arrival for a day already closed; baselines are not rewritten
+    if day > series["day"]:
+        _advance(state, key, series, day)
+
+    series["count"] += n
+    if series["days"] >= WARMUP_DAYS and not series["alerted"]:
+        z = (series["count"] - series["mean"]) / _std(series)
+        if z >= Z_THRESHOLD:
+            series["alerted"] = True
+            _alert(state, key, series, "spike", z)
+
+
+def _advance(state, key, series, day):
+    target = date.fromisoformat(day)
+    current = date.fromisoformat(series["day"])
+    gap = (target - current).days
+    for offset in range(min(gap, MAX_GAP_DAYS)):
+        _close(state, key, series)
+        series["day"] = (current + timedelta(days=offset + 1)).isoformat()
+        series["count"], series["alerted"] = 0, False
+    series["day"] = day
+
+
+def _close(state, key, series):
+    count, std = series["count"], _std(series)
+    if series["days"] >= WARMUP_DAYS:
+        z = (count - series["mean"]) / std
+        series["cusum"] = max(0.0, series["cusum"] + z - CUSUM_SLACK)
+        if z >= Z_THRESHOLD:
+            # The spike explains the excess; don't also report it as a shift
+            if not series["alerted"]:
+                _alert(state, key, series, "spike", z)
+            series["cusum"] = 0.0
+        elif series["cusum"] >= CUSUM_LIMIT:
+            _alert(state, key, series, "shift", z)
+            series["cusum"] = 0.0
+
+    # Clipped so one spike doesn't inflate the variance and mask what follows
+    diff = max(min(count - series["mean"], Z_THRESHOLD * std), -Z_THRESHOLD * std)
+    if series["days"] == 0:
+        series["mean"], series["fast"] = float(count), float(count)
+    else:
+        series["mean"] += ALPHA * diff
+        series["var"] = (1 - ALPHA) * (series["var"] + ALPHA * diff * diff)
+        series["fast"] += FAST_ALPHA * (count - series["fast"])
+    series["days"] += 1
+
+
+def _alert(state, key, series, kind, z):
+    state["alerts"].append({
+        "series": key,
+        "kind": kind,
+        "date": series["day"],
+        "count": series["count"],
+        "expected": round(series["mean"], 2),
+        "z": round(z, 2),
+        "detected_at": datetime.now().isoformat(timespec="seconds")
+    })
+    del state["alerts"][:-MAX_ALERTS]
+
+
+DETECTOR = IncidentRateDetector(DETECTOR_PATH)
+
+
+if __name__ == "__main__":
+    # python -m services.incident_anomalies [--backfill] [--since YYYY-MM-DD]
+    # Prints alerts as JSON lines for alerting jobs.
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Incident rate alerts from the detector state.")
+    parser.add_argument("--backfill", action="store_true", help="rebuild the state from the incident data")
+    parser.add_argument("--since", help="only alerts for days on or after this date")
+    args = parser.parse_args()
+
+    from services.cyber_services import CyberIncidentService
+
+    for alert in CyberIncidentService.rate_detector(rebuild=args.backfill).alerts(since=args.since):
+        print(json.dumps(alert))
@@ -0,0 +1,238 @@
+import json
+import os
+import time
+import zlib
+from pathlib import Path
+
+import pandas as pd
+
+from models.cyber_incident import CyberIncident
+from models.schema import DatasetSchema
+from services.csv_store import FileLock, iter_csv_chunks, iter_jsonl_chunks
+from services.cyber_services import COLUMNS, CyberIncidentService
+from services.metrics import timed
+
+CHECKPOINT_PATH = Path("data/cyber_incident_feed.json")
+BATCH_ROWS = 20_000
+POLL_INTERVAL = 1.0
+FINGERPRINT_BYTES = 1024
+
+FORMATS = {".csv": "csv", ".jsonl": "jsonl", ".ndjson": "jsonl", ".json": "jsonl"}
+# Rotated copies that were compressed are never tailed
+SKIP_SUFFIXES = {".gz", ".bz2", ".xz", ".zst", ".zip", ".tmp"}
+REQUIRED = ["timestamp", "severity", "category"]
+
+
+def feed_format(path: Path):
+    """
+    "csv" or "jsonl" from the file name, looking past rotation suffixes
+    (feed.csv.1, feed.jsonl-20240101); None for anything else.
+    """
+    suffixes = [suffix.lower() for suffix in path.suffixes]
+    if SKIP_SUFFIXES.intersection(suffixes):
+        return None
+    for suffix in suffixes:
+        if suffix in FORMATS:
+            return FORMATS[suffix]
+    return None
+
+
+def _fingerprint(path, length):
+    with open(path, "rb") as file:
+        return zlib.crc32(file.read(length))
+
+
+class IncidentFeed:
+    """
+    Tails an append-only incident feed (one CSV / JSON-lines file, or a
+    drop directory of them) and writes new records through
+    ``CyberIncidentService.add_incidents``, so the journal, the cached
+    frame, the daily rollup and the rate detector all update by delta.
+
+    Progress is a byte offset per file, keyed by inode rather than name:
+    a rotated file keeps its offset under its new name and is drained
+    before the file that replaced it, and a truncated file starts over.
+    A record still being written (no trailing newline, or an open CSV
+    quote) is left for the next poll. The checkpoint is saved after each
+    batch, so a crash can at worst replay the last batch.
+    """
+
+    def __init__(self, source, checkpoint_path=CHECKPOINT_PATH, batch_rows=BATCH_ROWS):
+        self.source = Path(source)
+        self.checkpoint_path = Path(checkpoint_path)
+        self.batch_rows = batch_rows
+        # Held for a whole poll, so two tailers never ingest the same bytes
+        self.lock = FileLock(self.checkpoint_path.with_suffix(".lock"))
+        self._next_id = None
+
+    # -------------------------------
+    # CHECKPOINTS
+    # -------------------------------
+    def _load(self):
+        if not self.checkpoint_path.exists():
+            return {}
+        with open(self.checkpoint_path, "r") as file:
+            return json.load(file).get(str(self.source), {})
+
+    def _save(self, files):
+        data = {}
+        if self.checkpoint_path.exists():
+            with open(self.checkpoint_path, "r") as file:
+                data = json.load(file)
+        data[str(self.source)] = files
+        tmp_path = self.checkpoint_path.with_suffix(".json.tmp")
+        self.checkpoint_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(tmp_path, "w") as file:
+            json.dump(data, file)
+        os.replace(tmp_path, self.checkpoint_path)
+
+    # -------------------------------
+    # FILES
+    # -------------------------------
+    def _candidates(self, files):
+        """
+        Feed files to read, oldest first, as (path, stat, inode key).
+        """
+        if self.source.is_dir():
+            paths = [path for path in self.source.iterdir() if path.is_file() and feed_format(path)]
+        else:
+            # The live file plus rotated siblings we were part way through
+            paths = [
+                path for path in self.source.parent.glob(self.source.name + "*")
+                if path.is_file() and feed_format(path)
+            ]
+
+        found = []
+        for path in paths:
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue  # rotated away between listing and stat
+            key = f"{stat.st_dev}:{stat.st_ino}"
+            if path == self.source or self.source.is_dir() or key in files:
+                found.append((path, stat, key))
+        return sorted(found, key=lambda item: (item[1].st_mtime_ns, str(item[0])))
+
+    def _start_offset(self, path, stat, checkpoint):
+        if checkpoint is None:
+            return 0
+        offset = checkpoint["offset"]
+        if stat.st_size < offset:
+            return 0  # truncated in place (copytruncate)
+        length = min(offset, FINGERPRINT_BYTES)
+        if _fingerprint(path, length) != checkpoint["fingerprint"]:
+            return 0  # inode reused by a different file
+        return offset
+
+    # -------------------------------
+    # INGEST
+    # -------------------------------
+    def _assign_ids(self, ids: pd.Series):
+        missing = ids.isna()
+        if self._next_id is not None and not missing.all():
+            self._next_id = max(self._next_id, int(ids.max()) + 1)
+        if missing.any():
+            if self._next_id is None:
+                known = pd.concat([CyberIncidentService.load_frame()["incident_id"], ids.dropna()])
+                self._next_id = int(known.max()) + 1 if len(known) else 1
+            count = int(missing.sum())
+            ids = ids.copy()
+            ids[missing] = range(self._next_id, self._next_id + count)
+            self._next_id += count
+        return ids.astype("int64")
+
+    def _records(self, chunk: pd.DataFrame):
+        chunk = DatasetSchema.normalize_columns(chunk).reindex(columns=COLUMNS)
+        chunk["timestamp"] = pd.to_datetime(chunk["timestamp"], errors="coerce", format="mixed")
+        valid = chunk[REQUIRED].notna().all(axis=1)
+        chunk = chunk[valid].copy()
+        chunk["incident_id"] = self._assign_ids(pd.to_numeric(chunk["incident_id"], errors="coerce"))
+        # Ids already stored (a replayed batch) or repeated are skipped,
+        # since the repository rejects the whole batch otherwise
+        ids = chunk["incident_id"]
+        taken = ids.duplicated() | ids.isin(CyberIncidentService.load_frame()["incident_id"])
+        chunk = chunk[~taken].copy()
+        chunk["status"] = chunk["status"].fillna("Open")
+        chunk["description"] = chunk["description"].fillna("")
+        return chunk, int((~valid).sum()) + int(taken.sum())
+
+    def _read(self, path, offset, final):
+        if feed_format(path) == "csv":
+            return iter_csv_chunks(path, offset, self.batch_rows, final=final)
+        return iter_jsonl_chunks(path, offset, self.batch_rows, final=final)
+
+    @timed("cyber.feed_poll", rows=lambda stats: stats["records"])
+    def poll(self):
+        """
+        Ingests everything appended since the last poll. Returns counts of
+        records written, rows rejected (no timestamp, severity or category,
+        or an incident id that is already taken) and files read.
+        """
+        stats = {"records": 0, "rejected": 0, "files": 0}
+        with self.lock.acquire():
+            files = self._load()
+            seen = {}
+            for path, stat, key in self._candidates(files):
+                offset = self._start_offset(path, stat, files.get(key))
+                seen[key] = files.get(key) if offset else None
+                if offset >= stat.st_size:
+                    continue
+
+                # Only the live file can still receive a partial record
+                final = path != self.source and not self.source.is_dir()
+                stats["files"] += 1
+                for chunk, end_offset in self._read(path, offset, final):
+                    records, rejected = self._records(chunk)
+                    if len(records):
+                        CyberIncidentService.add_incidents(CyberIncident.from_frame(records))
+                    stats["records"] += len(records)
+                    stats["rejected"] += rejected
+                    seen[key] = {
+                        "path": str(path),
+                        "offset": end_offset,
+                        "fingerprint": _fingerprint(path, min(end_offset, FINGERPRINT_BYTES))
+                    }
+                    self._save({k: v for k, v in {**files, **seen}.items() if v is not None})
+
+            # Files that are gone no longer need an offset
+            self._save({k: v for k, v in seen.items() if v is not None})
+        return stats
+
+    def follow(self, interval=POLL_INTERVAL, stop=None, on_poll=None):
+        """
+        Polls until ``stop()`` is true, sleeping only when a poll found
+        nothing new, so a backlog is drained at full speed.
+        """
+        while stop is None or not stop():
+            stats = self.poll()
+            if on_poll is not None:
+                on_poll(stats)
+            if not stats["records"]:
+                time.sleep(interval)
+
+
+if __name__ == "__main__":
+    # python -m services.incident_feed SOURCE [--follow] [--interval SECONDS]
+    # SOURCE is a CSV / JSON-lines feed file or a drop directory of them.
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Ingest new incidents from a feed file or directory.")
+    parser.add_argument("source")
+    parser.add_argument("--follow", action="store_true", help="keep polling for new records")
+    parser.add_argument("--interval", type=float, default=POLL_INTERVAL, help="seconds between idle polls")
+    parser.add_argument("--batch-rows", type=int, default=BATCH_ROWS)
+    args = parser.parse_args()
+
+    feed = IncidentFeed(args.source, batch_rows=args.batch_rows)
+
+    def report(stats):
+        if stats["records"] or stats["rejected"]:
+            print(json.dumps({"time": time.time(), **stats}), flush=True)
+
+    if args.follow:
+        try:
+            feed.follow(args.interval, on_poll=report)
+        except KeyboardInterrupt:
+            pass
+    else:
+        report(feed.poll())
@@ -0,0 +1,136 @@
+import json
+import os
+from pathlib import Path
+
+import pandas as pd
+
+from services.csv_store import FileLock
+
+ROLLUP_PATH = Path("data/cyber_incidents_daily.csv")
+DIMENSIONS = ["date", "severity", "status", "category"]
+
+
+def _daily_counts(df: pd.DataFrame) -> pd.Series:
+    timestamps = pd.to_datetime(df["timestamp"], errors="coerce", format="mixed")
+    keys = [
+        timestamps.dt.strftime("%Y-%m-%d").rename("date"),
+        df["severity"].astype(object),
+        df["status"].astype(object),
+        df["category"].astype(object),
+    ]
+    return df.groupby(keys, dropna=False, observed=True).size().rename("count")
+
+
+class IncidentRollup:
+    """
+    Persisted incident counts per day x severity x status x category.
+
+    The incident service applies a delta for every create, status change
+    and delete, so trend views read O(days) rows instead of regrouping
+    every incident. ``backfill`` rebuilds it from the raw data.
+
+    A meta file next to it records the source identity of the incident
+    data the counts match (see ``Repository.source_identity``). A delta
+    is only applied on top of the identity the write started from, and a
+    rollup whose source doesn't match the data is rebuilt by the service
+    instead of being trusted.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.meta_path = self.path.with_suffix(".json")
+        self.lock = FileLock(self.path.with_suffix(".lock"))
+
+    def source(self):
+        """
+        Source identity the counts were built or last updated from; None
+        if unknown.
+        """
+        try:
+            with open(self.meta_path, "r") as file:
+                meta = json.load(file)
+            stat = self.path.stat()
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+        # A rollup file replaced without its meta doesn't match either
+        if meta["rollup"] != [stat.st_mtime_ns, stat.st_size]:
+            return None
+        return meta["source"]
+
+    def load(self) -> pd.DataFrame:
+        if not self.path.exists():
+            return pd.DataFrame(columns=DIMENSIONS + ["count"])
+        return pd.read_csv(self.path, dtype={"date": str})
+
+    def _load_counts(self):
+        df = self.load()
+        return df.set_index(DIMENSIONS)["count"] if not df.empty else None
+
+    def _save(self, counts, source):
+        if counts is not None:
+            counts = counts[counts > 0].astype("int64").sort_index()
+            tmp_path = self.path.with_suffix(".csv.tmp")
+            counts.reset_index().to_csv(tmp_path, index=False)
+            os.replace(tmp_path, self.path)
+
+        stat = self.path.stat()
+        tmp_path = self.meta_path.with_suffix(".json.tmp")
+        with open(tmp_path, "w") as file:
+            json.dump({"source": source, "rollup": [stat.st_mtime_ns, stat.st_size]}, file)
+        os.replace(tmp_path, self.meta_path)
+
+    def apply(self, before, after, added=None, removed=None):
+        """
+        Adds the incidents in ``added`` and subtracts those in ``removed``
+        for a write that moved the data from source identity ``before``
+        to ``after``. Returns False, leaving the rollup to be rebuilt, if
+        it wasn't at ``before``.
+        """
+        deltas = []
+        if added is not None and len(added):
+            deltas.append(_daily_counts(added))
+        if removed is not None and len(removed):
+            deltas.append(-_daily_counts(removed))
+
+        with self.lock.acquire():
+            if before is None or self.source() != before:
+                return False
+            merged = None
+            if deltas:
+                current = self._load_counts()
+                if current is not None:
+                    deltas.insert(0, current)
+                merged = pd.concat(deltas).groupby(level=DIMENSIONS, dropna=False).sum()
+            self._save(merged, after)
+        return True
+
+    def backfill(self, df: pd.DataFrame, source):
+        with self.lock.acquire():
+            self._save(_daily_counts(df) if not df.empty else pd.Series(dtype="int64"), source)
+
+    def trend(self, severity=None, status=None, category=None) -> pd.DataFrame:
+        """
+        Daily incident counts (``date``, ``count``), optionally filtered.
+        """
+        df = self.load()
+        for column, value in (("severity", severity), ("status", status), ("category", category)):
+            if value is not None:
+                df = df[df[column] == value]
+
+        if df.empty:
+            return pd.DataFrame()
+
+        trend = df.groupby("date", sort=True)["count"].sum().reset_index()
+        trend["date"] = pd.to_datetime(trend["date"]).dt.date
+        return trend
+
+
+ROLLUP = IncidentRollup(ROLLUP_PATH)
+
+
+if __name__ == "__main__":
+    # python -m services.incident_rollup   -> rebuild from the incident data
+    from services.cyber_services import CyberIncidentService
+
+    CyberIncidentService.daily_rollup(rebuild=True)
+    print(f"Rollup rebuilt: {len(ROLLUP.load())} rows in {ROLLUP.path}")
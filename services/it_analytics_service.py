@@ -1,5 +1,8 @@
 import pandas as pd
 from pathlib import Path
+from services.it_services import ITTicketService
+from services.metrics import timed
+from services.resolution_sketches import QUANTILES, group_keys
 
 
 class ITOperationsAnalyticsService:
@@ -7,21 +10,12 @@ class ITOperationsAnalyticsService:
 
     @staticmethod
     def load_tickets():
-        if not ITOperationsAnalyticsService.DATA_PATH.exists():
-            return pd.DataFrame()
-
-        df = pd.read_csv(ITOperationsAnalyticsService.DATA_PATH)
-
-        # 🔐 Normalize column names (CRITICAL FIX)
-        df.columns = df.columns.str.strip().str.lower()
-
-        return df
+        # Shared typed frame; column names are normalized once by IT_TICKETS
+        return ITTicketService.load_frame()
 
     @staticmethod
+    @timed("it.ticket_kpis")
     def ticket_kpis(df):
-        # Ensure correct column casing
-        df.columns = df.columns.str.lower()
-
         return {
             "Open Tickets": int((df["status"] == "Open").sum()),
             "In Progress": int((df["status"] == "In Progress").sum()),
@@ -31,25 +25,24 @@ class ITOperationsAnalyticsService:
 
 
     @staticmethod
+    @timed("it.ticket_trends", rows=len)
     def ticket_trends(df):
-        # Normalize columns 
-        df = df.copy()
-        df.columns = df.columns.str.strip().str.lower()
-
         if "created_at" not in df.columns:
             return pd.DataFrame()
 
-        # Convert to datetime
-        df["created_at"] = pd.to_datetime(df["created_at"], errors="coerce")
-        df = df.dropna(subset=["created_at"])
+        # Already datetime64 when loaded through IT_TICKETS
+        created_at = df["created_at"]
+        if not pd.api.types.is_datetime64_any_dtype(created_at):
+            created_at = pd.to_datetime(created_at, errors="coerce", format="mixed")
+        created_at = created_at.dropna()
 
-        if df.empty:
+        if created_at.empty:
             return pd.DataFrame()
 
         # Group by month
         trend = (
-            df
-            .groupby(df["created_at"].dt.to_period("M"))
+            created_at
+            .groupby(created_at.dt.to_period("M"))
             .size()
             .reset_index(name="count")
         )
@@ -58,3 +51,31 @@ class ITOperationsAnalyticsService:
         trend["date"] = trend["created_at"].astype(str)
 
         return trend[["date", "count"]]
+
+
+    @staticmethod
+    @timed("it.resolution_times", rows=len)
+    def resolution_times(df: pd.DataFrame = None, by="priority"):
+        """
+        count, mean and p50/p90/p99 of resolution_time_hours per ``by``
+        ("priority", "assigned_to" or "month").
+
+        With ``df`` the exact percentiles are computed in one groupby.
+        Without it they come from the persisted t-digests, which cover the
+        full history and are rebuilt whenever they no longer match the data.
+        """
+        columns = [by, "count", "mean", "p50", "p90", "p99"]
+        if df is None:
+            return ITTicketService.resolution_sketches().summary(by)
+
+        if df.empty or "resolution_time_hours" not in df.columns:
+            return pd.DataFrame(columns=columns)
+
+        hours = pd.to_numeric(df["resolution_time_hours"], errors="coerce").astype(float)
+        groups = hours.groupby(group_keys(df, by).rename(by), dropna=True, observed=True)
+        stats = groups.agg(["count", "mean"])
+        percentiles = groups.quantile(list(QUANTILES)).unstack()
+        percentiles.columns = ["p50", "p90", "p99"]
+        result = stats.join(percentiles).reset_index()
+        result[by] = result[by].astype(str)
+        return result[result["count"] > 0][columns].reset_index(drop=True)
@@ -1,49 +1,163 @@
 import pandas as pd
 from pathlib import Path
 from models.it_ticket import ITTicket
+from models.schema import IT_TICKETS
+from services.column_snapshot import ColumnSnapshot
+from services.csv_store import CSVStore
+from services.metrics import timed
+from services.query import PAGE_SIZE
+from services.repository import make_repository
+from services.resolution_sketches import RESOLUTION_SKETCHES
 
 DATA_PATH = Path("data/it_tickets.csv")
+COLUMNS = [
+    "ticket_id",
+    "priority",
+    "description",
+    "status",
+    "assigned_to",
+    "created_at",
+    "resolution_time_hours"
+]
+
+STORE = CSVStore(
+    DATA_PATH,
+    key="ticket_id",
+    columns=COLUMNS,
+    dtypes=IT_TICKETS.read_dtypes(),
+    snapshot=ColumnSnapshot(DATA_PATH.with_suffix(".snapshot"), IT_TICKETS)
+)
+
+# STORAGE_BACKEND picks the CSV store above or the it_tickets SQLite table
+REPOSITORY = make_repository(STORE, IT_TICKETS, "it_tickets", "created_at")
+
+
+def _matching(ticket_ids):
+    # Only tickets that exist are written; returns them and the row count
+    rows = REPOSITORY.rows(ticket_ids)
+    return rows["ticket_id"].unique().tolist(), len(rows)
+
+
+def _sources(write):
+    # A repository write's (before, after) identities, as persisted with derived state
+    return [REPOSITORY.source_identity(identity) for identity in write]
+
+
+def _current(state, rebuild=False):
+    # Derived state built from other data (edited outside the services,
+    # compacted onto different rows, another STORAGE_BACKEND) is rebuilt
+    if rebuild or state.source() != REPOSITORY.source_identity(REPOSITORY.identity()):
+        df, identity = REPOSITORY.frame_with_identity()
+        state.backfill(df, REPOSITORY.source_identity(identity))
+    return state
 
 
 class ITTicketService:
 
     @staticmethod
-    def load_all():
-        if not DATA_PATH.exists():
-            return []
+    @timed("it.load_frame", rows=len)
+    def load_frame():
+        """
+        Returns all tickets as a DataFrame typed by IT_TICKETS.
+        Dashboards should use this instead of converting load_all() back.
+        Parsed frames are shared through the process-wide dataset cache.
+        """
+        return REPOSITORY.frame()
 
-        df = pd.read_csv(DATA_PATH)
-        tickets = []
+    @staticmethod
+    def data_version():
+        # Changes with every write; used to key derived caches (charts)
+        return REPOSITORY.identity()
 
-        for _, row in df.iterrows():
-            ticket = ITTicket(
-                ticket_id=row["ticket_id"],
-                priority=row["priority"],
-                description=row["description"],
-                status=row["status"],
-                assigned_to=row["assigned_to"],
-                created_at=row["created_at"],
-                resolution_time_hours=row["resolution_time_hours"]
-            )
-            tickets.append(ticket)
+    @staticmethod
+    def resolution_sketches(rebuild=False):
+        """
+        The persisted resolution-time sketches, rebuilt first if they
+        don't match the stored tickets.
+        """
+        return _current(RESOLUTION_SKETCHES, rebuild)
 
-        return tickets
+    @staticmethod
+    @timed("it.load_all", rows=len)
+    def load_all():
+        return ITTicket.from_frame(ITTicketService.load_frame())
 
+    @staticmethod
+    @timed("it.query", rows=lambda page: len(page["rows"]))
+    def query(priority=None, status=None, assigned_to=None, start=None, end=None,
+              sort="ticket_id", descending=False, after=None, limit=PAGE_SIZE):
+        """
+        One page of tickets matching the filters plus the total count.
+        Pass the returned ``next_cursor`` as ``after`` for the next page.
+        """
+        return REPOSITORY.query(
+            {"priority": priority, "status": status, "assigned_to": assigned_to},
+            start=start,
+            end=end,
+            sort=sort,
+            descending=descending,
+            after=after,
+            limit=limit
+        )
 
     @staticmethod
     def add_ticket(ticket: ITTicket):
-        df = pd.read_csv(DATA_PATH) if DATA_PATH.exists() else pd.DataFrame()
-        df = pd.concat([df, pd.DataFrame([ticket.to_dict()])], ignore_index=True)
-        df.to_csv(DATA_PATH, index=False)
+        ITTicketService.add_tickets([ticket])
 
     @staticmethod
     def update_ticket_status(ticket_id, new_status):
-        df = pd.read_csv(DATA_PATH)
-        df.loc[df["ticket_id"] == ticket_id, "status"] = new_status
-        df.to_csv(DATA_PATH, index=False)
+        ITTicketService.update_ticket_statuses([ticket_id], new_status)
 
     @staticmethod
     def delete_ticket(ticket_id):
-        df = pd.read_csv(DATA_PATH)
-        df = df[df["ticket_id"] != ticket_id]
-        df.to_csv(DATA_PATH, index=False)
+        ITTicketService.delete_tickets([ticket_id])
+
+    # -------------------------------
+    # BULK OPERATIONS
+    # -------------------------------
+    # Each batch is a single write to the repository (one journal append
+    # or one transaction); the return value is the number of tickets
+    # affected. New tickets are merged into
+    # the resolution-time sketches.
+    @staticmethod
+    @timed("it.add_tickets", rows=int)
+    def add_tickets(tickets):
+        records = [ticket.to_record() for ticket in tickets]
+        sources = _sources(REPOSITORY.append(records))
+        RESOLUTION_SKETCHES.apply(*sources, added=pd.DataFrame(records, columns=COLUMNS))
+        return len(records)
+
+    @staticmethod
+    @timed("it.update_ticket_statuses", rows=int)
+    def update_ticket_statuses(ticket_ids, new_status):
+        ids, affected = _matching(ticket_ids)
+        sources = _sources(REPOSITORY.patch_many(ids, status=new_status))
+        RESOLUTION_SKETCHES.apply(*sources)  # resolution times are unchanged
+        return affected
+
+    @staticmethod
+    @timed("it.delete_tickets", rows=int)
+    def delete_tickets(ticket_ids):
+        ids, affected = _matching(ticket_ids)
+        sources = _sources(REPOSITORY.delete_many(ids))
+        RESOLUTION_SKETCHES.apply(*sources, removed=ids)
+        return affected
+
+    @staticmethod
+    @timed("it.search", rows=len)
+    def search(text, limit=20, prefix=True, window=None):
+        """
+        Ranked full-text search over ticket descriptions (best match first).
+        ``"quoted words"`` match as a phrase; other words also match as
+        prefixes unless ``prefix`` is False. By default every match is
+        ranked; with ``window`` (e.g. ``db.search.RANK_WINDOW``) only the
+        newest ``window`` matches are, which keeps broad queries fast but
+        can miss an older, better match.
+        """
+        return REPOSITORY.search(text, limit, prefix, window)
+
+    @staticmethod
+    @timed("it.compact")
+    def compact():
+        # Same tickets under a new identity
+        RESOLUTION_SKETCHES.apply(*_sources(REPOSITORY.compact()))
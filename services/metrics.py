@@ -0,0 +1,329 @@
+import bisect
+import cProfile
+import functools
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from pathlib import Path
+
+# In-process timing metrics for the hot paths.
+#
+# Every instrumented call records its wall time (and rows processed, where
+# that makes sense) into a histogram keyed by operation. Recording costs a
+# couple of microseconds, so it stays on in production; METRICS_ENABLED=0
+# turns it off. Snapshots are exported as Prometheus text (for the
+# node_exporter textfile collector) or appended as JSON lines.
+
+ENABLED = os.getenv("METRICS_ENABLED", "1") != "0"
+PREFIX = "platform"
+
+# Upper bounds in seconds: 100 µs up to 30 s
+BUCKETS = (
+    0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+    0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0
+)
+
+# Recent samples kept per operation for the rolling quantiles
+WINDOW = 1024
+
+
+class Histogram:
+    __slots__ = ("buckets", "count", "total", "rows", "recent")
+
+    def __init__(self):
+        self.buckets = [0] * (len(BUCKETS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.rows = 0
+        self.recent = deque(maxlen=WINDOW)
+
+    def observe(self, seconds, rows):
+        self.buckets[bisect.bisect_left(BUCKETS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        if rows:
+            self.rows += rows
+        self.recent.append(seconds)
+
+    def quantiles(self):
+        ordered = sorted(self.recent)
+        if not ordered:
+            return {}
+        last = len(ordered) - 1
+        return {f"p{int(q * 100)}": ordered[round(q * last)] for q in (0.5, 0.9, 0.99)}
+
+
+class Metrics:
+    """
+    Registry of operation histograms, event counters and cache collectors.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._histograms = {}
+        self._counters = {}
+        self._caches = {}
+
+    @staticmethod
+    def _key(name, labels):
+        return (name, tuple(sorted(labels.items())))
+
+    def observe(self, op, seconds, rows=None, **labels):
+        if not ENABLED:
+            return
+        key = self._key(op, labels)
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram()
+            histogram.observe(seconds, rows)
+
+    def increment(self, name, amount=1, **labels):
+        if not ENABLED:
+            return
+        key = self._key(name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    def register_cache(self, name, stats):
+        """
+        ``stats()`` returns a dict with ``hits`` and ``misses``; it is read
+        at export time, so the cache itself pays nothing.
+        """
+        self._caches[name] = stats
+
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
+
+    # -------------------------------
+    # EXPORT
+    # -------------------------------
+    def snapshot(self):
+        with self._lock:
+            operations = [
+                {
+                    "op": name,
+                    **dict(labels),
+                    "count": h.count,
+                    "sum_s": round(h.total, 6),
+                    "rows": h.rows,
+                    **{q: round(v, 6) for q, v in h.quantiles().items()}
+                }
+                for (name, labels), h in self._histograms.items()
+            ]
+            counters = [
+                {"name": name, **dict(labels), "value": value}
+                for (name, labels), value in self._counters.items()
+            ]
+        caches = []
+        for name, stats in self._caches.items():
+            values = stats()
+            caches.append({"cache": name, "hits": values["hits"], "misses": values["misses"]})
+        return {"time": time.time(), "operations": operations, "counters": counters, "caches": caches}
+
+    def to_jsonl(self):
+        snap = self.snapshot()
+        lines = []
+        for kind in ("operations", "counters", "caches"):
+            for record in snap[kind]:
+                lines.append(json.dumps({"time": snap["time"], "kind": kind[:-1], **record}))
+        return "\n".join(lines) + ("\n" if lines else "")
+
+    def to_prometheus(self):
+        with self._lock:
+            histograms = [(name, labels, h.buckets[:], h.count, h.total, h.rows)
+                          for (name, labels), h in self._histograms.items()]
+            counters = list(self._counters.items())
+
+        seconds, rows = f"{PREFIX}_operation_seconds", f"{PREFIX}_operation_rows_total"
+        out = [
+            f"# HELP {seconds} Wall time of instrumented operations.",
+            f"# TYPE {seconds} histogram"
+        ]
+        for name, labels, buckets, count, total, _ in histograms:
+            base = (("op", name),) + labels
+            cumulative = 0
+            for bound, n in zip((*BUCKETS, "+Inf"), buckets):
+                cumulative += n
+                out.append(f"{seconds}_bucket{_labels(base + (('le', bound),))} {cumulative}")
+            out.append(f"{seconds}_sum{_labels(base)} {total:.6f}")
+            out.append(f"{seconds}_count{_labels(base)} {count}")
+
+        out += [f"# HELP {rows} Rows processed by instrumented operations.", f"# TYPE {rows} counter"]
+        for name, labels, _, _, _, n in histograms:
+            if n:
+                out.append(f"{rows}{_labels((('op', name),) + labels)} {n}")
+
+        for name in sorted({name for (name, _), _ in counters}):
+            metric = f"{PREFIX}_{name}_total"
+            out.append(f"# TYPE {metric} counter")
+            for (counter, labels), value in counters:
+                if counter == name:
+                    out.append(f"{metric}{_labels(labels)} {value}")
+
+        if self._caches:
+            metric = f"{PREFIX}_cache_events_total"
+            out.append(f"# TYPE {metric} counter")
+            for name, stats in self._caches.items():
+                values = stats()
+                for event, field in (("hit", "hits"), ("miss", "misses")):
+                    out.append(f"{metric}{_labels((('cache', name), ('event', event)))} {values[field]}")
+        return "\n".join(out) + "\n"
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(pairs):
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}"
+
+
+METRICS = Metrics()
+
+
+# -------------------------------
+# INSTRUMENTATION HELPERS
+# -------------------------------
+@contextmanager
+def timer(op, **labels):
+    """
+    Times the block. Set ``.rows`` on the yielded object to record rows.
+    """
+    span = _Span()
+    start = time.perf_counter()
+    try:
+        yield span
+    except Exception as exc:
+        _observe_error(op, time.perf_counter() - start, exc, labels)
+        raise
+    METRICS.observe(op, time.perf_counter() - start, span.rows, **labels)
+
+
+def _observe_error(op, seconds, exc, labels):
+    # Failed calls get their own series (labelled with the exception type)
+    # so they neither vanish nor skew the latency of successful ones
+    error = type(exc).__name__
+    METRICS.observe(op, seconds, error=error, **labels)
+    METRICS.increment("operation_errors", op=op, error=error, **labels)
+
+
+class _Span:
+    __slots__ = ("rows",)
+
+    def __init__(self):
+        self.rows = None
+
+
+def timed(op, rows=None, **labels):
+    """
+    Decorator form of ``timer``. ``rows(result)`` gives the row count.
+    """
+    def decorate(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                result = fn(*args, **kwargs)
+            except Exception as exc:
+                _observe_error(op, time.perf_counter() - start, exc, labels)
+                raise
+            METRICS.observe(
+                op, time.perf_counter() - start, rows(result) if rows else None, **labels
+            )
+            return result
+        return wrapper
+    return decorate
+
+
+class Laps:
+    """
+    Sequential section timer for straight-line page code: each ``lap(name)``
+    closes the previous section and opens the next; ``done()`` closes the last.
+    """
+
+    def __init__(self, page):
+        self.page = page
+        self._section = None
+        self._start = None
+
+    def lap(self, section):
+        now = time.perf_counter()
+        if self._section is not None:
+            METRICS.observe("dashboard.section", now - self._start, page=self.page, section=self._section)
+        self._section, self._start = section, now
+
+    def done(self):
+        if self._section is not None:
+            self.lap(None)
+            self._section = None
+
+
+# -------------------------------
+# EXPORT + PROFILING
+# -------------------------------
+EXPORT_INTERVAL = float(os.getenv("METRICS_EXPORT_INTERVAL", "15"))
+PROMETHEUS_PATH = os.getenv("METRICS_PROMETHEUS_PATH")
+JSONL_PATH = os.getenv("METRICS_JSONL_PATH")
+PROFILE_PATH = os.getenv("PROFILE_RERUN")
+PROFILE_PAGE = os.getenv("PROFILE_RERUN_PAGE")
+
+_last_export = 0.0
+_export_lock = threading.Lock()
+_profiled = False
+
+
+def export(force=False):
+    """
+    Writes the configured export files at most once per EXPORT_INTERVAL.
+    """
+    global _last_export
+    if not (PROMETHEUS_PATH or JSONL_PATH):
+        return
+    now = time.monotonic()
+    with _export_lock:
+        if not force and now - _last_export < EXPORT_INTERVAL:
+            return
+        _last_export = now
+
+    if PROMETHEUS_PATH:
+        path = Path(PROMETHEUS_PATH)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(path.suffix + ".tmp")
+        tmp_path.write_text(METRICS.to_prometheus())
+        os.replace(tmp_path, path)  # scrapers never see a partial file
+    if JSONL_PATH:
+        path = Path(JSONL_PATH)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "a") as file:
+            file.write(METRICS.to_jsonl())
+
+
+@contextmanager
+def profile_once(page=None):
+    """
+    With PROFILE_RERUN=<path>, the first block run in this process is
+    captured with cProfile and dumped to <path> (a pstats file).
+    PROFILE_RERUN_PAGE restricts the capture to one page.
+    """
+    global _profiled
+    if not PROFILE_PATH or _profiled or (PROFILE_PAGE and page != PROFILE_PAGE):
+        yield
+        return
+
+    _profiled = True
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        Path(PROFILE_PATH).parent.mkdir(parents=True, exist_ok=True)
+        profiler.dump_stats(PROFILE_PATH)
@@ -0,0 +1,135 @@
+import numpy as np
+
+
+class TDigest:
+    """
+    Mergeable quantile sketch (merging t-digest).
+
+    Values are summarised as weighted centroids, small near the tails and
+    large in the middle, so p99 stays accurate with a few hundred
+    centroids no matter how many values were added. Two digests built
+    over different chunks (or in different processes) ``merge`` into the
+    digest of the combined data. Compression runs in bulk with numpy: the
+    sorted centroids are binned on the arcsine scale function and each
+    bin collapses to its weighted mean.
+    """
+
+    def __init__(self, compression=200):
+        self.compression = compression
+        self.means = np.empty(0)
+        self.weights = np.empty(0)
+        self.minimum = np.inf
+        self.maximum = -np.inf
+        self._buffer = []
+        self._buffered = 0
+
+    @property
+    def count(self):
+        self._flush()
+        return float(self.weights.sum())
+
+    @property
+    def total(self):
+        self._flush()
+        return float((self.means * self.weights).sum())
+
+    @property
+    def mean(self):
+        count = self.count
+        return self.total / count if count else float("nan")
+
+    # -------------------------------
+    # UPDATE
+    # -------------------------------
+    def update(self, values):
+        values = np.asarray(values, dtype=float).ravel()
+        values = values[~np.isnan(values)]
+        if not len(values):
+            return self
+        self.minimum = min(self.minimum, values.min())
+        self.maximum = max(self.maximum, values.max())
+        self._buffer.append(values)
+        self._buffered += len(values)
+        if self._buffered >= self.compression * 20:
+            self._flush()
+        return self
+
+    def merge(self, other):
+        other._flush()
+        if len(other.weights):
+            self.minimum = min(self.minimum, other.minimum)
+            self.maximum = max(self.maximum, other.maximum)
+            self._flush()
+            self._compress(
+                np.concatenate([self.means, other.means]),
+                np.concatenate([self.weights, other.weights])
+            )
+        return self
+
+    def _flush(self):
+        if not self._buffer:
+            return
+        values = np.concatenate(self._buffer)
+        self._buffer, self._buffered = [], 0
+        self._compress(
+            np.concatenate([self.means, values]),
+            np.concatenate([self.weights, np.ones(len(values))])
+        )
+
+    def _compress(self, means, weights):
+        order = np.argsort(means, kind="stable")
+        means, weights = means[order], weights[order]
+        total = weights.sum()
+
+        # Quantile at each centroid's midpoint, mapped onto the k1 scale;
+        # centroids falling in the same unit interval of k are merged.
+        cumulative = np.cumsum(weights) - weights / 2
+        q = np.clip(cumulative / total, 0.0, 1.0)
+        k = self.compression / (2 * np.pi) * np.arcsin(2 * q - 1)
+        bins = np.floor(k - k[0]).astype(np.int64)
+        # Keep the extreme values as their own centroids
+        bins[0], bins[-1] = -1, bins.max() + 1
+        _, bins = np.unique(bins, return_inverse=True)
+
+        merged_weights = np.bincount(bins, weights=weights)
+        self.means = np.bincount(bins, weights=means * weights) / merged_weights
+        self.weights = merged_weights
+
+    # -------------------------------
+    # QUERY
+    # -------------------------------
+    def quantile(self, q):
+        """
+        Estimated value at quantile ``q`` (0..1, scalar or array).
+        """
+        self._flush()
+        if not len(self.weights):
+            return np.full(np.shape(q), np.nan) if np.ndim(q) else float("nan")
+
+        cumulative = np.cumsum(self.weights) - self.weights / 2
+        positions = np.concatenate([[0.0], cumulative, [self.weights.sum()]])
+        values = np.concatenate([[self.minimum], self.means, [self.maximum]])
+        result = np.interp(np.asarray(q, dtype=float) * self.weights.sum(), positions, values)
+        return result if np.ndim(q) else float(result)
+
+    # -------------------------------
+    # PERSISTENCE
+    # -------------------------------
+    def to_dict(self):
+        self._flush()
+        return {
+            "compression": self.compression,
+            "min": None if not len(self.weights) else float(self.minimum),
+            "max": None if not len(self.weights) else float(self.maximum),
+            "means": self.means.round(6).tolist(),
+            "weights": self.weights.tolist()
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        digest = cls(data["compression"])
+        digest.means = np.asarray(data["means"], dtype=float)
+        digest.weights = np.asarray(data["weights"], dtype=float)
+        if data["min"] is not None:
+            digest.minimum, digest.maximum = data["min"], data["max"]
+        return digest
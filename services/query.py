@@ -0,0 +1,70 @@
+import numpy as np
+import pandas as pd
+
+PAGE_SIZE = 50
+
+
+def _as_list(value):
+    if value is None:
+        return None
+    if isinstance(value, (list, tuple, set, np.ndarray, pd.Index)):
+        return list(value)
+    return [value]
+
+
+def query_frame(df, key, filters=None, date_column=None, start=None, end=None,
+                sort=None, descending=False, after=None, limit=PAGE_SIZE):
+    """
+    Filters a typed frame and returns one keyset-paginated page.
+
+    ``filters`` maps column -> value or list of values. ``start``/``end``
+    bound ``date_column`` (end exclusive). ``after`` is the
+    ``next_cursor`` of the previous page, a (sort value, key) pair, so
+    pages stay stable while rows are being added. Returns a dict with
+    ``rows``, ``total`` (matches across all pages) and ``next_cursor``.
+    """
+    sort = sort or key
+    if sort not in df.columns:
+        raise ValueError(f"Cannot sort by {sort!r}")
+    mask = np.ones(len(df), dtype=bool)
+
+    for column, value in (filters or {}).items():
+        values = _as_list(value)
+        if values:
+            mask &= df[column].isin(values).to_numpy()
+
+    if date_column is not None:
+        if start is not None:
+            mask &= (df[date_column] >= pd.Timestamp(start)).to_numpy()
+        if end is not None:
+            mask &= (df[date_column] < pd.Timestamp(end)).to_numpy()
+
+    total = int(mask.sum())
+
+    if after is not None:
+        value, last_key = after
+        value = pd.Timestamp(value) if date_column == sort and value is not None else value
+        column, keys = df[sort], df[key]
+        if descending:
+            beyond = (column < value) | ((column == value) & (keys < last_key))
+        else:
+            beyond = (column > value) | ((column == value) & (keys > last_key))
+        mask &= beyond.fillna(False).to_numpy()
+
+    candidates = df[mask]
+    # nsmallest/nlargest keep only `limit` rows instead of sorting everything
+    order = [sort] if sort == key else [sort, key]
+    if descending:
+        page = candidates.nlargest(limit, order)
+    else:
+        page = candidates.nsmallest(limit, order)
+
+    next_cursor = None
+    if len(page) == limit and len(candidates) > limit:
+        last = page.iloc[-1]
+        value = last[sort]
+        # Timestamps as str(), the text the SQLite backend stores and returns
+        next_cursor = (str(value) if hasattr(value, "isoformat") else value, last[key])
+        next_cursor = tuple(v.item() if hasattr(v, "item") else v for v in next_cursor)
+
+    return {"rows": page.reset_index(drop=True), "total": total, "next_cursor": next_cursor}
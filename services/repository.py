@@ -0,0 +1,436 @@
+import os
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+
+import pandas as pd
+
+from db import crud, database
+from db.database import FTS_TABLES, DatabaseManager, fts_insert_trigger, get_connection
+from models.schema import with_categories
+from services.dataset_cache import DATASETS
+from services.metrics import timer
+from services.query import PAGE_SIZE, query_frame
+
+# Where CyberIncidentService and ITTicketService keep their rows:
+#   csv     the CSV base + write journal (CSVStore); the default
+#   sqlite  the tables in db/platform.db, updated in place by key
+STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "csv").lower()
+
+# Keys per statement for WHERE key IN (...); SQLite allows 999 parameters
+IN_BATCH = 500
+
+# From this many new rows, the FTS index is fed in one pass instead of by
+# the per-row insert trigger (about 5x faster for feed-sized batches)
+FTS_BULK_ROWS = 1000
+
+
+class Repository(ABC):
+    """
+    Storage for one dataset, shared by its service whatever the backend.
+
+    ``frame`` is the typed dataset served from the process-wide cache;
+    ``identity`` changes with every write and keys derived caches.
+    Writes take plain records and return the (before, after) identities,
+    so the service keeps updating rollups and sketches the same way on
+    either backend.
+    """
+
+    backend = None
+
+    def __init__(self, store, schema, table, date_column):
+        # The CSVStore names the key and columns; it is also where the
+        # SQLite backend imports its rows from on first use
+        self.store = store
+        self.schema = schema
+        self.table = table
+        self.date_column = date_column
+        self.key = store.key
+        self.columns = store.columns
+
+    @property
+    def name(self):
+        return f"{self.backend}:{self.table}"
+
+    # -------------------------------
+    # READ
+    # -------------------------------
+    @abstractmethod
+    def identity(self):
+        ...
+
+    @abstractmethod
+    def source_identity(self, identity):
+        """
+        ``identity`` as a JSON-friendly list that stays valid across
+        restarts and names the backend, for state persisted next to the
+        data (rollups, detector, sketches). None stays None.
+        """
+
+    def frame(self) -> pd.DataFrame:
+        return self.frame_with_identity()[0]
+
+    def frame_with_identity(self):
+        """
+        (frame, identity it was read at), for state derived from the frame.
+        """
+        return DATASETS.get_with_identity(self.name, self.identity(), self._timed_read)
+
+    def _timed_read(self):
+        with timer("storage.read", backend=self.backend, table=self.table) as span:
+            df, identity = self._read()
+            span.rows = len(df)
+        return df, identity
+
+    @abstractmethod
+    def _read(self):
+        """
+        (typed frame, identity it was read at).
+        """
+
+    @abstractmethod
+    def rows(self, keys) -> pd.DataFrame:
+        """
+        The stored rows whose key is in ``keys``.
+        """
+
+    @abstractmethod
+    def query(self, filters, start=None, end=None, sort=None, descending=False, after=None, limit=PAGE_SIZE):
+        """
+        One keyset-paginated page: ``rows`` (typed), ``total`` and ``next_cursor``.
+        """
+
+    @abstractmethod
+    def search(self, text, limit=20, prefix=True, window=None) -> pd.DataFrame:
+        ...
+
+    # -------------------------------
+    # WRITE
+    # -------------------------------
+    def append(self, records):
+        """
+        Stores new rows. The cached frame grows by these rows instead of
+        being reloaded. A key that is already stored, or repeated in
+        ``records``, raises ValueError on either backend and nothing is
+        written.
+        """
+        before, after = self._append(records)
+        DATASETS.extend(
+            self.name, before, after, lambda: self.schema.apply(pd.DataFrame(records, columns=self.columns))
+        )
+        return before, after
+
+    def patch_many(self, keys, **fields):
+        keys = list(keys)
+        before, after = self._patch_many(keys, fields)
+        DATASETS.transform(self.name, before, after, lambda df: self._patched(df, keys, fields))
+        return before, after
+
+    def delete_many(self, keys):
+        keys = list(keys)
+        before, after = self._delete_many(keys)
+        DATASETS.transform(self.name, before, after, lambda df: df[~df[self.key].isin(keys)].reset_index(drop=True))
+        return before, after
+
+    def _patched(self, df, keys, fields):
+        # New columns rather than in-place edits: callers may hold the old frame
+        typed = self.schema.apply(pd.DataFrame({name: [value] for name, value in fields.items()}))
+        mask = df[self.key].isin(keys).to_numpy()
+        df = df.copy(deep=False)
+        for name in fields:
+            column, value = df[name], typed[name].iloc[0]
+            if isinstance(column.dtype, pd.CategoricalDtype):
+                column = with_categories(column, [value])
+            df[name] = column.mask(mask, value)
+        return df
+
+    # Each write returns the (before, after) identities, with a None
+    # ``before`` if the cached frame can't be updated by applying it.
+    @abstractmethod
+    def _append(self, records):
+        ...
+
+    @abstractmethod
+    def _patch_many(self, keys, fields):
+        ...
+
+    @abstractmethod
+    def _delete_many(self, keys):
+        ...
+
+    @abstractmethod
+    def compact(self):
+        """
+        Same rows, stored more compactly; returns (before, after) too.
+        """
+
+
+class CSVRepository(Repository):
+    """
+    CSV base + JSON-lines journal (CSVStore). Queries filter the cached
+    frame; search syncs the journal into SQLite first.
+    """
+
+    backend = "csv"
+
+    def identity(self):
+        return self.store.identity()
+
+    def source_identity(self, identity):
+        if identity is None:
+            return None
+        # Without the in-process write counter, which restarts at 0
+        path, base, journal, _ = identity
+        return [self.backend, path, base and list(base), journal and list(journal)]
+
+    def _read(self):
+        df, identity = self.store.read(with_identity=True)
+        return self.schema.apply(df), identity
+
+    def rows(self, keys):
+        df = self.frame()
+        return df[df[self.key].isin(list(keys))]
+
+    def query(self, filters, start=None, end=None, sort=None, descending=False, after=None, limit=PAGE_SIZE):
+        return query_frame(
+            self.frame(),
+            key=self.key,
+            filters=filters,
+            date_column=self.date_column,
+            start=start,
+            end=end,
+            sort=sort,
+            descending=descending,
+            after=after,
+            limit=limit
+        )
+
+    def search(self, text, limit=20, prefix=True, window=None):
+        # Imported here: the migrator imports the services for their STORE
+        from db.migrate_csv_to_sqlite import sync_source
+        from db.search import SEARCHES
+
+        sync_source(self.table)
+        return SEARCHES[self.table](text, limit, prefix, window)
+
+    def _append(self, records):
+        keys = pd.Series([record[self.key] for record in records], dtype=object)
+        taken = keys[keys.duplicated() | keys.isin(self.frame()[self.key])]
+        if len(taken):
+            raise ValueError(f"{self.table} already has {self.key} {sorted(taken.unique().tolist())}")
+        return self.store.append(records)
+
+    def _patch_many(self, keys, fields):
+        return self.store.patch_many(keys, **fields)
+
+    def _delete_many(self, keys):
+        return self.store.delete_many(keys)
+
+    def compact(self):
+        return self.store.compact()
+
+
+@contextmanager
+def _transaction(write=False):
+    # An explicit BEGIN so every statement in the block sees one snapshot;
+    # IMMEDIATE takes the write lock up front instead of failing to upgrade
+    with get_connection() as conn:
+        if not conn.in_transaction:
+            conn.execute("BEGIN IMMEDIATE" if write else "BEGIN")
+        yield conn
+
+
+class SQLiteRepository(Repository):
+    """
+    Rows live in the SQLite table and are written in place: an update or
+    delete is one primary-key lookup per row instead of a journal the
+    next read has to fold, and filtered pages come from the secondary
+    indexes. Every write bumps the table's row in ``storage_versions`` in
+    the same transaction, which is what ``identity`` reads, so other
+    processes' writes invalidate cached frames too.
+
+    On first use the table is loaded from the CSV store once and recorded
+    in ``storage_owners``; from then on the table is the source of truth
+    and the migrator leaves it alone while the SQLite backend is the one
+    configured.
+    """
+
+    backend = "sqlite"
+
+    def __init__(self, store, schema, table, date_column):
+        super().__init__(store, schema, table, date_column)
+        self._ready = False
+        self._ready_lock = threading.Lock()
+
+    def _ensure_ready(self):
+        if self._ready:
+            return
+        with self._ready_lock:
+            if self._ready:
+                return
+            DatabaseManager.init_schema()
+            if not self._owned():
+                from db.migrate_csv_to_sqlite import sync_source
+
+                sync_source(self.table, then=self._claim)
+            self._ready = True
+
+    def _owned(self):
+        with get_connection() as conn:
+            return conn.execute(
+                "SELECT 1 FROM storage_owners WHERE source = ? AND backend = ?", (self.table, self.backend)
+            ).fetchone() is not None
+
+    def _claim(self):
+        # Runs with the table's sync lock held, so no other sync can start
+        # before the backend's writes are the source of truth
+        if self._owned():
+            return  # claimed by another process meanwhile
+        with get_connection() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO storage_owners (source, backend) VALUES (?, ?)",
+                (self.table, self.backend)
+            )
+            # A new version too: the rows may differ from the last time
+            # this backend held the table
+            conn.execute(
+                "INSERT OR IGNORE INTO storage_versions (source, version) VALUES (?, 0)",
+                (self.table,)
+            )
+            self._bump(conn)
+
+    def _version(self, conn):
+        row = conn.execute("SELECT version FROM storage_versions WHERE source = ?", (self.table,)).fetchone()
+        return ("sqlite", os.path.abspath(database.DB_PATH), self.table, row[0])
+
+    def _bump(self, conn):
+        conn.execute("UPDATE storage_versions SET version = version + 1 WHERE source = ?", (self.table,))
+        return self._version(conn)
+
+    # -------------------------------
+    # READ
+    # -------------------------------
+    def identity(self):
+        self._ensure_ready()
+        with get_connection() as conn:
+            return self._version(conn)
+
+    def source_identity(self, identity):
+        # Already stored in the database, so it survives restarts
+        return None if identity is None else list(identity)
+
+    def _read(self):
+        self._ensure_ready()
+        with _transaction() as conn:
+            identity = self._version(conn)
+            df = pd.read_sql_query(f"SELECT {', '.join(self.columns)} FROM {self.table}", conn)
+        return self.schema.apply(df), identity
+
+    def rows(self, keys):
+        self._ensure_ready()
+        keys = [crud.sql_value(key) for key in dict.fromkeys(keys)]
+        found = []
+        with get_connection() as conn:
+            for start in range(0, len(keys), IN_BATCH):
+                batch = keys[start:start + IN_BATCH]
+                found.extend(conn.execute(
+                    f"SELECT {', '.join(self.columns)} FROM {self.table} "
+                    f"WHERE {self.key} IN ({', '.join('?' * len(batch))})",
+                    batch
+                ).fetchall())
+        return self.schema.apply(pd.DataFrame(found, columns=self.columns))
+
+    def query(self, filters, start=None, end=None, sort=None, descending=False, after=None, limit=PAGE_SIZE):
+        self._ensure_ready()
+        page = crud.QUERIES[self.table](
+            **filters, start=start, end=end, sort=sort or self.key,
+            descending=descending, after=after, limit=limit
+        )
+        rows = pd.DataFrame(page["rows"], columns=page["columns"]).reindex(columns=self.columns)
+        return {"rows": self.schema.apply(rows), "total": page["total"], "next_cursor": page["next_cursor"]}
+
+    def search(self, text, limit=20, prefix=True, window=None):
+        from db.search import SEARCHES
+
+        self._ensure_ready()
+        return SEARCHES[self.table](text, limit, prefix, window)
+
+    # -------------------------------
+    # WRITE
+    # -------------------------------
+    def _append(self, records):
+        self._ensure_ready()
+        rows = list(crud.record_rows(records, self.columns))
+        position = self.columns.index(self.key)
+        if not rows:
+            return None, None
+
+        bulk = len(rows) >= FTS_BULK_ROWS and self.table in dict(FTS_TABLES)
+        try:
+            with _transaction(write=True) as conn:
+                before = self._version(conn)
+                if bulk:
+                    conn.execute(f"DROP TRIGGER IF EXISTS {self.table}_fts_ai")
+                conn.executemany(
+                    f"INSERT INTO {self.table} ({', '.join(self.columns)}) "
+                    f"VALUES ({', '.join('?' * len(self.columns))})",
+                    rows
+                )
+                if bulk:
+                    description = self.columns.index("description")
+                    conn.executemany(
+                        f"INSERT INTO {self.table}_fts (rowid, description) VALUES (?, ?)",
+                        ((row[position], row[description]) for row in rows)
+                    )
+                    conn.execute(fts_insert_trigger(self.table, self.key))
+                after = self._bump(conn)
+        except sqlite3.IntegrityError as exc:
+            # Rolled back with the transaction, trigger drop included
+            raise ValueError(f"{self.table}: {exc}") from exc
+        return before, after
+
+    def _patch_many(self, keys, fields):
+        unknown = set(fields).difference(self.columns)
+        if unknown:
+            raise ValueError(f"Unknown {self.table} columns: {sorted(unknown)}")
+        self._ensure_ready()
+        assignments = ", ".join(f"{name} = ?" for name in fields)
+        values = [crud.sql_value(value) for value in fields.values()]
+        with _transaction(write=True) as conn:
+            before = self._version(conn)
+            conn.executemany(
+                f"UPDATE {self.table} SET {assignments} WHERE {self.key} = ?",
+                ([*values, crud.sql_value(key)] for key in keys)
+            )
+            return before, self._bump(conn)
+
+    def _delete_many(self, keys):
+        self._ensure_ready()
+        with _transaction(write=True) as conn:
+            before = self._version(conn)
+            conn.executemany(
+                f"DELETE FROM {self.table} WHERE {self.key} = ?",
+                ((crud.sql_value(key),) for key in keys)
+            )
+            return before, self._bump(conn)
+
+    def compact(self):
+        # Merge the FTS segments and fold the WAL back into the database
+        # file; the rows and their version are unchanged
+        identity = self.identity()
+        with get_connection() as conn:
+            conn.execute(f"INSERT INTO {self.table}_fts ({self.table}_fts) VALUES ('optimize')")
+        with get_connection() as conn:
+            conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        return identity, identity
+
+
+BACKENDS = {"csv": CSVRepository, "sqlite": SQLiteRepository}
+
+
+def make_repository(store, schema, table, date_column, backend=None):
+    backend = backend or STORAGE_BACKEND
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown STORAGE_BACKEND {backend!r}; expected one of {sorted(BACKENDS)}")
+    return BACKENDS[backend](store, schema, table, date_column)
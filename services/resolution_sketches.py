@@ -0,0 +1,146 @@
+import json
+import os
+from pathlib import Path
+
+import pandas as pd
+
+from services.csv_store import FileLock
+from services.quantile_sketch import TDigest
+
+SKETCHES_PATH = Path("data/it_ticket_resolution_sketches.json")
+DIMENSIONS = ["priority", "assigned_to", "month"]
+QUANTILES = (0.5, 0.9, 0.99)
+CHUNK_ROWS = 100_000
+
+
+def group_keys(df: pd.DataFrame, dimension):
+    if dimension == "month":
+        # Periods group far faster than strftime strings; str() gives "2024-01"
+        created_at = pd.to_datetime(df["created_at"], errors="coerce", format="mixed")
+        return created_at.dt.to_period("M")
+    return df[dimension].astype(object)
+
+
+def _sketch_frame(df: pd.DataFrame, compression):
+    values = pd.to_numeric(df["resolution_time_hours"], errors="coerce")
+    sketches = {"all": {"all": TDigest(compression).update(values.to_numpy())}}
+    for dimension in DIMENSIONS:
+        groups = values.groupby(group_keys(df, dimension), dropna=True)
+        sketches[dimension] = {
+            str(key): TDigest(compression).update(group.to_numpy()) for key, group in groups
+        }
+    return sketches
+
+
+def _merge_into(target, source):
+    for dimension, sketches in source.items():
+        existing = target.setdefault(dimension, {})
+        for key, sketch in sketches.items():
+            if key in existing:
+                existing[key].merge(sketch)
+            else:
+                existing[key] = sketch
+
+
+class ResolutionSketches:
+    """
+    Persisted t-digests of resolution_time_hours per priority, assignee
+    and creation month (plus one over all tickets).
+
+    New tickets are merged in as they are written, so percentiles over
+    the full history never need a rescan. Digests cannot forget values,
+    so a delete leaves the sketches at their old source and they are
+    rebuilt on the next read. The file records the source identity of the
+    ticket data it was built from (see ``Repository.source_identity``);
+    the service rebuilds sketches whose source no longer matches.
+    """
+
+    def __init__(self, path, compression=200):
+        self.path = Path(path)
+        self.compression = compression
+        self.lock = FileLock(self.path.with_suffix(".lock"))
+
+    def _read(self):
+        if not self.path.exists():
+            return {"sketches": {}, "source": None}
+        with open(self.path, "r") as file:
+            return json.load(file)
+
+    def source(self):
+        return self._read().get("source")
+
+    def _load(self):
+        data = self._read()
+        sketches = {
+            dimension: {key: TDigest.from_dict(sketch) for key, sketch in group.items()}
+            for dimension, group in data["sketches"].items()
+        }
+        return sketches, data.get("source")
+
+    def _save(self, sketches, source):
+        data = {
+            "source": source,
+            "sketches": {
+                dimension: {key: sketch.to_dict() for key, sketch in group.items()}
+                for dimension, group in sketches.items()
+            }
+        }
+        tmp_path = self.path.with_suffix(".json.tmp")
+        with open(tmp_path, "w") as file:
+            json.dump(data, file)
+        os.replace(tmp_path, self.path)
+
+    def apply(self, before, after, added=None, removed=None):
+        """
+        Merges the tickets in ``added``. Applies only if the sketches are at
+        source identity ``before``, and moves them to ``after``; returns
+        False otherwise, leaving them to be rebuilt. So does a non-empty
+        ``removed``: the digests can't take those tickets back out.
+        """
+        with self.lock.acquire():
+            sketches, source = self._load()
+            if before is None or source != before or (removed is not None and len(removed)):
+                return False
+            if added is not None and len(added):
+                _merge_into(sketches, _sketch_frame(added, self.compression))
+            self._save(sketches, after)
+        return True
+
+    def backfill(self, df: pd.DataFrame, source, chunk_rows=CHUNK_ROWS):
+        # Built chunk by chunk and merged, the same way separate workers'
+        # sketches would be combined
+        sketches = {}
+        for start in range(0, len(df), chunk_rows):
+            _merge_into(sketches, _sketch_frame(df.iloc[start:start + chunk_rows], self.compression))
+        with self.lock.acquire():
+            self._save(sketches, source)
+
+    def summary(self, by="priority") -> pd.DataFrame:
+        """
+        count, mean and p50/p90/p99 per value of ``by`` ("priority",
+        "assigned_to", "month" or "all").
+        """
+        sketches = self._load()[0]
+        rows = []
+        for key, sketch in sorted(sketches.get(by, {}).items()):
+            if not sketch.count:
+                continue
+            percentiles = sketch.quantile(QUANTILES)
+            rows.append({
+                by: key,
+                "count": int(sketch.count),
+                "mean": sketch.mean,
+                **{f"p{int(q * 100)}": value for q, value in zip(QUANTILES, percentiles)}
+            })
+        return pd.DataFrame(rows, columns=[by, "count", "mean", "p50", "p90", "p99"])
+
+
+RESOLUTION_SKETCHES = ResolutionSketches(SKETCHES_PATH)
+
+
+if __name__ == "__main__":
+    # python -m services.resolution_sketches   -> rebuild from the ticket data
+    from services.it_services import ITTicketService
+
+    ITTicketService.resolution_sketches(rebuild=True)
+    print(RESOLUTION_SKETCHES.summary("priority").to_string(index=False))
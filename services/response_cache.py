@@ -0,0 +1,138 @@
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+
+class ResponseCache:
+    """
+    Persistent key -> text cache in a small SQLite file.
+
+    Entries expire after ``ttl`` seconds and the least recently used ones
+    are evicted once the stored text exceeds ``max_bytes``.
+    """
+
+    def __init__(self, path, ttl, max_bytes):
+        self.path = Path(path)
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._conn = None
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(*parts) -> str:
+        return hashlib.sha256(json.dumps(parts, default=str).encode("utf-8")).hexdigest()
+
+    def _connect(self):
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(self.path, timeout=5.0, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS responses (
+                    key TEXT PRIMARY KEY,
+                    value TEXT,
+                    created REAL,
+                    accessed REAL,
+                    size INTEGER
+                )
+            """)
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_accessed ON responses (accessed)")
+        return self._conn
+
+    def get(self, key):
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            row = conn.execute("SELECT value, created FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            if now - row[1] > self.ttl:
+                conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                conn.commit()
+                self.misses += 1
+                return None
+            conn.execute("UPDATE responses SET accessed = ? WHERE key = ?", (now, key))
+            conn.commit()
+            self.hits += 1
+            return row[0]
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses}
+
+    def set(self, key, value):
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            conn.execute(
+                "INSERT OR REPLACE INTO responses (key, value, created, accessed, size) VALUES (?, ?, ?, ?, ?)",
+                (key, value, now, now, len(value.encode("utf-8")))
+            )
+            self._evict(conn, now)
+            conn.commit()
+
+    def _evict(self, conn, now):
+        conn.execute("DELETE FROM responses WHERE created < ?", (now - self.ttl,))
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for key, size in conn.execute("SELECT key, size FROM responses ORDER BY accessed").fetchall():
+            conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+            total -= size
+            if total <= self.max_bytes:
+                break
+
+
+class SingleFlight:
+    """
+    Collapses concurrent calls with the same key into one execution.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def follow(self, key, timeout=None):
+        """
+        Waits for the running call with ``key`` and returns (True, its
+        result), re-raising its error; TimeoutError after ``timeout``.
+        Returns (False, None) if none is running: the caller is then the
+        leader, runs the call itself and must ``finish`` it.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            if call is None:
+                self._calls[key] = {"done": threading.Event(), "result": None, "error": None}
+                return False, None
+
+        if not call["done"].wait(timeout):
+            raise TimeoutError(f"call {key!r} still running after {timeout}s")
+        if call["error"] is not None:
+            raise call["error"]
+        return True, call["result"]
+
+    def finish(self, key, result=None, error=None):
+        with self._lock:
+            call = self._calls.pop(key)
+        call["result"], call["error"] = result, error
+        call["done"].set()
+
+    def do(self, key, fn):
+        followed, result = self.follow(key)
+        if followed:
+            return result
+
+        error = None
+        try:
+            result = fn()
+            return result
+        except Exception as exc:
+            error = exc
+            raise
+        finally:
+            self.finish(key, result, error)
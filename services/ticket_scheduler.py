@@ -0,0 +1,202 @@
+import heapq
+import itertools
+
+import pandas as pd
+
+# Weight of one expected hour of work, by ticket priority
+PRIORITY_WEIGHTS = {"Critical": 4.0, "High": 3.0, "Medium": 2.0, "Low": 1.0}
+OPEN_STATUSES = ("Open", "In Progress", "Waiting for User")
+DEFAULT_HOURS = 24.0
+
+
+def learn_expected_hours(df: pd.DataFrame):
+    """
+    Median resolution_time_hours per (priority, assignee), with per-priority
+    and overall medians as fallbacks for pairs that have no history.
+    """
+    hours = pd.to_numeric(df["resolution_time_hours"], errors="coerce")
+    priority = df["priority"].astype(object)
+    assignee = df["assigned_to"].astype(object)
+    by_pair = hours.groupby([priority, assignee]).median().dropna()
+    by_priority = hours.groupby(priority).median().dropna()
+    overall = hours.median()
+    return {
+        "pair": {key: float(value) for key, value in by_pair.items()},
+        "priority": {key: float(value) for key, value in by_priority.items()},
+        "overall": DEFAULT_HOURS if pd.isna(overall) else float(overall),
+    }
+
+
+class TicketScheduler:
+    """
+    Least-loaded assignment of tickets to support staff.
+
+    An assignee's load is the sum of priority weight x expected hours over
+    the tickets they hold, where the expected hours are learned per
+    (priority, assignee). The best assignee for a ticket depends on its
+    priority, so there is one min-heap per priority keyed by
+    ``load + cost of that ticket``. A load change pushes one fresh entry per
+    priority and stale entries are skipped on pop, so each decision is
+    O(log n) in the number of assignees.
+    """
+
+    def __init__(self, assignees, expected_hours=None):
+        self.expected = expected_hours or {"pair": {}, "priority": {}, "overall": DEFAULT_HOURS}
+        self.load = {assignee: 0.0 for assignee in assignees}
+        self.assignments = {}  # ticket_id -> (assignee, priority, cost)
+        self._version = {assignee: 0 for assignee in assignees}
+        self._counter = itertools.count()
+        self._heaps = {priority: [] for priority in PRIORITY_WEIGHTS}
+        for assignee in assignees:
+            self._push(assignee)
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame):
+        """
+        Scheduler with the learned expected hours and every open ticket in
+        ``df`` held by its current assignee.
+        """
+        assignees = sorted(df["assigned_to"].dropna().astype(str).unique())
+        scheduler = cls(assignees, learn_expected_hours(df))
+        open_tickets = df[df["status"].isin(OPEN_STATUSES) & df["assigned_to"].notna()]
+        for ticket_id, priority, assignee in zip(
+            open_tickets["ticket_id"], open_tickets["priority"].astype(str), open_tickets["assigned_to"].astype(str)
+        ):
+            scheduler.hold(ticket_id, priority, assignee)
+        return scheduler
+
+    # -------------------------------
+    # COSTS
+    # -------------------------------
+    def cost(self, priority, assignee):
+        hours = self.expected["pair"].get(
+            (priority, assignee),
+            self.expected["priority"].get(priority, self.expected["overall"])
+        )
+        return PRIORITY_WEIGHTS.get(priority, 1.0) * hours
+
+    def _push(self, assignee):
+        load, version = self.load[assignee], self._version[assignee]
+        for priority, heap in self._heaps.items():
+            heapq.heappush(
+                heap, (load + self.cost(priority, assignee), next(self._counter), version, assignee)
+            )
+            # Stale entries pile up on busy heaps; rebuild once they dominate
+            if len(heap) > 8 * len(self.load) + 64:
+                self._rebuild(priority)
+
+    def _rebuild(self, priority):
+        self._heaps[priority] = [
+            (self.load[a] + self.cost(priority, a), next(self._counter), self._version[a], a)
+            for a in self.load
+        ]
+        heapq.heapify(self._heaps[priority])
+
+    def _set_load(self, assignee, load):
+        self.load[assignee] = load
+        self._version[assignee] += 1
+        self._push(assignee)
+
+    # -------------------------------
+    # DECISIONS
+    # -------------------------------
+    def best(self, priority):
+        """
+        The assignee who would finish a new ``priority`` ticket with the
+        lowest resulting load.
+        """
+        heap = self._heaps.get(priority)
+        if heap is None:
+            self._heaps[priority] = []
+            self._rebuild(priority)
+            heap = self._heaps[priority]
+        while heap:
+            _, _, version, assignee = heap[0]
+            if version == self._version[assignee]:
+                return assignee
+            heapq.heappop(heap)
+        return None
+
+    def hold(self, ticket_id, priority, assignee):
+        """
+        Records an existing assignment without making a decision.
+        """
+        if assignee not in self.load:
+            self.load[assignee], self._version[assignee] = 0.0, 0
+        self.release(ticket_id)
+        cost = self.cost(priority, assignee)
+        self.assignments[ticket_id] = (assignee, priority, cost)
+        self._set_load(assignee, self.load[assignee] + cost)
+
+    def assign(self, ticket_id, priority):
+        """
+        Assigns a ticket to the best assignee and returns who that is.
+        """
+        assignee = self.best(priority)
+        if assignee is not None:
+            self.hold(ticket_id, priority, assignee)
+        return assignee
+
+    def release(self, ticket_id):
+        """
+        Drops a ticket (resolved, closed or about to be moved).
+        """
+        held = self.assignments.pop(ticket_id, None)
+        if held is not None:
+            assignee, _, cost = held
+            self._set_load(assignee, max(self.load[assignee] - cost, 0.0))
+        return held
+
+    def rebalance(self, ticket_id):
+        """
+        Moves one held ticket to the best assignee if that lowers its
+        finishing load. Returns the (possibly unchanged) assignee.
+        """
+        held = self.release(ticket_id)
+        if held is None:
+            return None
+        current, priority, cost = held
+        candidate = self.best(priority)
+        if candidate is None or self.load[candidate] + self.cost(priority, candidate) >= self.load[current] + cost:
+            candidate = current
+        self.hold(ticket_id, priority, candidate)
+        return candidate
+
+    # -------------------------------
+    # BATCH
+    # -------------------------------
+    def plan(self, tickets):
+        """
+        Re-plans a backlog of (ticket_id, priority) pairs from scratch:
+        the held tickets are released and everything is assigned
+        heaviest-first (the LPT heuristic), which keeps peak loads close
+        to even. Returns {ticket_id: assignee}.
+        """
+        for ticket_id, _ in tickets:
+            self.release(ticket_id)
+        order = sorted(
+            tickets,
+            key=lambda ticket: PRIORITY_WEIGHTS.get(ticket[1], 1.0)
+            * self.expected["priority"].get(ticket[1], self.expected["overall"]),
+            reverse=True
+        )
+        return {ticket_id: self.assign(ticket_id, priority) for ticket_id, priority in order}
+
+    def rebalance_all(self):
+        """
+        ``rebalance`` on every held ticket, most-loaded assignees first.
+        Usually reaches the same peak as ``plan`` with far fewer moves.
+        Returns {ticket_id: assignee} for the tickets that moved.
+        """
+        start = dict(self.load)
+        order = sorted(self.assignments, key=lambda ticket_id: -start[self.assignments[ticket_id][0]])
+        moved = {}
+        for ticket_id in order:
+            before = self.assignments[ticket_id][0]
+            after = self.rebalance(ticket_id)
+            if after != before:
+                moved[ticket_id] = after
+        return moved
+
+    def loads(self):
+        return dict(sorted(self.load.items(), key=lambda item: item[1]))
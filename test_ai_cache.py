@@ -0,0 +1,128 @@
+import json
+import os
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+requests_seen = []
+
+
+class StubOpenAI(BaseHTTPRequestHandler):
+    # Minimal stand-in for POST /v1/chat/completions
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        requests_seen.append(body)
+        prompt = body["messages"][-1]["content"]
+        time.sleep(3 if prompt == "slow" else 0.2)
+
+        if body.get("stream"):
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Connection", "close")
+            self.end_headers()
+            try:
+                for word in ["Stub ", "streamed ", "summary"]:
+                    if prompt == "trickle":
+                        time.sleep(0.8)  # every read within READ_TIMEOUT, the total past the deadline
+                    chunk = {
+                        "id": "stub", "object": "chat.completion.chunk", "created": 0, "model": body["model"],
+                        "choices": [{"index": 0, "delta": {"content": word}, "finish_reason": None}]
+                    }
+                    self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+                    self.wfile.flush()
+                self.wfile.write(b"data: [DONE]\n\n")
+            except BrokenPipeError:
+                pass  # client hit its deadline (trickle test)
+            self.close_connection = True
+            return
+
+        payload = json.dumps({
+            "id": "stub",
+            "object": "chat.completion",
+            "created": 0,
+            "model": body["model"],
+            "choices": [{
+                "index": 0,
+                "finish_reason": "stop",
+                "message": {"role": "assistant", "content": "Stub summary: " + body["messages"][-1]["content"]}
+            }]
+        }).encode("utf-8")
+        try:
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            if prompt == "trickle":
+                for start in range(0, len(payload), len(payload) // 4):
+                    self.wfile.write(payload[start:start + len(payload) // 4])
+                    self.wfile.flush()
+                    time.sleep(0.8)
+            else:
+                self.wfile.write(payload)
+        except BrokenPipeError:
+            pass  # client already gave up (timeout test)
+
+    def log_message(self, *args):
+        pass
+
+
+server = ThreadingHTTPServer(("127.0.0.1", 0), StubOpenAI)
+threading.Thread(target=server.serve_forever, daemon=True).start()
+
+os.environ["OPENAI_API_KEY"] = "test-key"
+os.environ["OPENAI_BASE_URL"] = f"http://127.0.0.1:{server.server_port}/v1"
+os.environ["AI_CACHE_PATH"] = os.path.join(tempfile.mkdtemp(), "cache.db")
+os.environ["AI_READ_TIMEOUT"] = "1"
+os.environ["AI_DEADLINE_SECONDS"] = "2"
+
+from services.ai_openai_service import OpenAIAssistant, CALL_METRICS
+
+print(OpenAIAssistant.generate("risk summary", data_fingerprint=1))  # Stub summary: risk summary
+print(OpenAIAssistant.generate("risk summary", data_fingerprint=1))  # served from cache
+print(len(requests_seen))  # 1
+
+threads = [
+    threading.Thread(target=OpenAIAssistant.generate, args=("trend summary", 1))
+    for _ in range(5)
+]
+for t in threads:
+    t.start()
+for t in threads:
+    t.join()
+print(len(requests_seen))  # 2 (five concurrent callers, one request)
+
+OpenAIAssistant.generate("risk summary", data_fingerprint=2)
+print(len(requests_seen))  # 3 (data changed)
+
+print(list(OpenAIAssistant.stream("stream please")))  # ['Stub ', 'streamed ', 'summary']
+print(list(OpenAIAssistant.stream("stream please")))  # ['Stub streamed summary'] (cached)
+print(CALL_METRICS[-1]["ttft"] is not None)  # True
+
+print(OpenAIAssistant.generate("slow").startswith("AI Assistant (Simulated)"))  # True
+print(list(OpenAIAssistant.stream("slow"))[0].startswith("AI Assistant (Simulated)"))  # True
+print(CALL_METRICS[-1]["outcome"])  # fallback
+
+start = time.perf_counter()
+print(list(OpenAIAssistant.stream("trickle")))  # ['Stub ', 'streamed ']
+print(CALL_METRICS[-1]["outcome"], time.perf_counter() - start < 2.5)  # deadline True
+
+start = time.perf_counter()
+print(OpenAIAssistant.generate("trickle").startswith("AI Assistant (Simulated)"))  # True
+print(CALL_METRICS[-1]["outcome"], time.perf_counter() - start < 2.5)  # deadline True
+
+# Concurrent streams of one question share a request and all get its text
+seen, results = len(requests_seen), []
+threads = [
+    threading.Thread(target=lambda: results.append("".join(OpenAIAssistant.stream("shared stream", 1))))
+    for _ in range(5)
+]
+for t in threads:
+    t.start()
+for t in threads:
+    t.join()
+print(len(requests_seen) - seen, set(results))  # 1 {'Stub streamed summary'}
+
+server.shutdown()
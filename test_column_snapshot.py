@@ -0,0 +1,39 @@
+import tempfile
+import threading
+from pathlib import Path
+
+from models.schema import CYBER_INCIDENTS
+from services.column_snapshot import ColumnSnapshot, _filenames
+from services.csv_store import CSVStore
+
+tmp = Path(tempfile.mkdtemp())
+path = tmp / "incidents.csv"
+path.write_text(
+    "incident_id,timestamp,severity,category,status,description\n"
+    + "".join(f"{i},2024-01-01 09:00:00,High,Phishing,Open,Incident {i} ✓\n" for i in range(1, 2001))
+)
+snapshot = ColumnSnapshot(tmp / "incidents.snapshot", CYBER_INCIDENTS)
+store = CSVStore(path, "incident_id", CYBER_INCIDENTS.columns, CYBER_INCIDENTS.read_dtypes(), snapshot)
+
+builds = []
+write_locked = snapshot._write_locked
+snapshot._write_locked = lambda df, source: builds.append(len(df)) or write_locked(df, source)
+
+# Eight sessions miss the cold snapshot at once while a writer compacts
+frames = []
+threads = [threading.Thread(target=lambda: frames.append(store.read())) for _ in range(8)]
+store.append([{"incident_id": 2001, "timestamp": "2024-01-02 09:00:00", "severity": "Low",
+               "category": "Malware", "status": "Open", "description": "Added"}])
+threads.append(threading.Thread(target=store.compact))
+for t in threads:
+    t.start()
+for t in threads:
+    t.join()
+
+print(len(builds) <= 2, sorted({len(frame) for frame in frames}) in ([2000], [2001], [2000, 2001]))  # True True
+
+# Only the published snapshot's files are left, and it matches the CSV
+meta = snapshot._load_meta()
+on_disk = {file.name for file in snapshot.directory.glob("*.npy")}
+print(on_disk == set(_filenames(meta["columns"])), snapshot.is_fresh(path))  # True True
+print(len(store.read()), store.read()["description"].iloc[0])  # 2001 Incident 1 ✓
@@ -0,0 +1,31 @@
+import tempfile
+import threading
+from pathlib import Path
+
+from services.csv_store import CSVStore
+
+tmp = Path(tempfile.mkdtemp())
+path = tmp / "incidents.csv"
+path.write_text("incident_id,status\n1,Open\n2,Open\n")
+
+store = CSVStore(path, key="incident_id", columns=["incident_id", "status"])
+
+store.append([{"incident_id": 3, "status": "Open"}])
+store.patch(1, status="Closed")
+store.delete(2)
+store.append([{"incident_id": 2, "status": "New"}])
+print(store.read().to_dict("records"))  # 1 Closed, 3 Open, 2 New
+
+threads = [
+    threading.Thread(target=store.append, args=([{"incident_id": 100 + i, "status": "Open"}],))
+    for i in range(20)
+]
+for t in threads:
+    t.start()
+for t in threads:
+    t.join()
+print(len(store.read()))  # 23
+
+store.compact()
+print(store.journal_path.read_text().count("\n"), store.epoch() is not None)  # 1 True: only the epoch marker
+print(len(store.read()))  # 23
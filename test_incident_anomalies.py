@@ -0,0 +1,39 @@
+import os
+import tempfile
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+from models.cyber_incident import CyberIncident
+from services.cyber_analytics import CyberAnalyticsService
+from services.cyber_services import CyberIncidentService
+
+os.chdir(tempfile.mkdtemp())
+Path("data").mkdir()
+HEADER = "incident_id,timestamp,severity,category,status,description\n"
+
+
+def history(spike):
+    # 30 quiet days of 5 incidents, then 40 on the last day if ``spike``
+    rows, incident_id = [], 1
+    for day in range(31):
+        for _ in range(40 if spike and day == 30 else 5):
+            stamp = date(2024, 1, 1) + timedelta(days=day)
+            rows.append(f"{incident_id},{stamp} 09:00:00,High,Phishing,Open,Incident {incident_id}\n")
+            incident_id += 1
+    Path("data/cyber_incidents.csv").write_text(HEADER + "".join(rows))
+
+
+history(spike=True)
+alerts = CyberAnalyticsService.rate_alerts()
+print(sorted({(alert["kind"], alert["date"]) for alert in alerts}))  # [('spike', '2024-01-31')]
+
+# New incidents go into the persisted state by delta
+CyberIncidentService.add_incident(
+    CyberIncident(1000, datetime(2024, 2, 1, 9), "High", "Phishing", "Open", "Next day")
+)
+print(CyberIncidentService.rate_detector().level()["day"])  # 2024-02-01
+
+# The spike is edited out of the data behind the services' back
+history(spike=False)
+print(CyberAnalyticsService.rate_alerts())  # []
+print(CyberAnalyticsService.interpret_trends())  # stable at about 5.0/day
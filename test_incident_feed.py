@@ -0,0 +1,53 @@
+import json
+import os
+import tempfile
+from pathlib import Path
+
+from pandas.testing import assert_frame_equal
+
+from services.cyber_services import CyberIncidentService
+from services.dataset_cache import DATASETS
+from services.incident_feed import IncidentFeed
+
+os.chdir(tempfile.mkdtemp())
+Path("data").mkdir()
+Path("data/cyber_incidents.csv").write_text(
+    "incident_id,timestamp,severity,category,status,description\n"
+    "1,2024-01-01 09:00:00,High,Phishing,Open,Seed incident\n"
+)
+
+
+def line(incident_id, category="Malware"):
+    return json.dumps({
+        "incident_id": incident_id, "timestamp": "2024-01-02 10:00:00",
+        "severity": "Low", "category": category, "description": f"Feed incident {incident_id}"
+    }) + "\n"
+
+
+feed = IncidentFeed("feed/incidents.jsonl", checkpoint_path="feed/checkpoint.json")
+Path("feed").mkdir()
+live = Path("feed/incidents.jsonl")
+
+CyberIncidentService.load_frame()  # cached, so the feed extends it in place
+with open(live, "w") as file:
+    file.write(line(2) + line(3) + line(4)[:20])  # last record still being written
+print(feed.poll()["records"])  # 2
+
+with open(live, "a") as file:
+    file.write(line(4)[20:] + line(5, category="Botnet"))
+print(feed.poll()["records"])  # 2
+
+# Rotation: the old file gets one late record, a new live file starts
+live.rename("feed/incidents.jsonl.1")
+with open("feed/incidents.jsonl.1", "a") as file:
+    file.write(line(6))
+with open(live, "w") as file:
+    file.write(line(7) + line(8))
+print(feed.poll()["records"])  # 3 (rotated file drained first)
+print(feed.poll()["records"])  # 0
+
+cached = CyberIncidentService.load_frame()
+print(cached["incident_id"].tolist())  # [1, 2, 3, 4, 5, 6, 7, 8]
+DATASETS.invalidate()
+assert_frame_equal(cached, CyberIncidentService.load_frame())
+print("cached frame matches a reload")
@@ -0,0 +1,43 @@
+import os
+import tempfile
+from datetime import datetime
+from pathlib import Path
+
+from models.cyber_incident import CyberIncident
+from services.cyber_analytics import CyberAnalyticsService
+from services.cyber_services import CyberIncidentService
+from services.incident_rollup import ROLLUP, _daily_counts
+
+os.chdir(tempfile.mkdtemp())
+Path("data").mkdir()
+Path("data/cyber_incidents.csv").write_text(
+    "incident_id,timestamp,severity,category,status,description\n"
+    + "".join(f"{i},2024-01-0{1 + i % 3} 09:00:00,High,Phishing,Open,Seed {i}\n" for i in range(1, 11))
+)
+
+
+def matches_frame():
+    counts = ROLLUP.load().set_index(["date", "severity", "status", "category"])["count"].sort_index()
+    expected = _daily_counts(CyberIncidentService.load_frame()).sort_index()
+    return counts.to_dict() == expected.to_dict()
+
+
+print(CyberAnalyticsService.incidents_over_time()["count"].sum())  # 10 (built on first use)
+
+CyberIncidentService.add_incident(
+    CyberIncident(11, datetime(2024, 1, 2, 12), "Low", "Malware", "Open", "Added")
+)
+CyberIncidentService.update_incident_status(1, "Closed")
+CyberIncidentService.delete_incident(2)
+print(ROLLUP.load()["count"].sum(), matches_frame())  # 10 True (updated by delta)
+
+CyberIncidentService.compact()
+print(ROLLUP.load()["count"].sum(), matches_frame())  # 10 True (same rows, new identity)
+
+# Edited outside the services: the rollup no longer matches and is rebuilt
+Path("data/cyber_incidents.csv").write_text(
+    "incident_id,timestamp,severity,category,status,description\n"
+    "1,2024-01-01 09:00:00,High,Phishing,Open,Kept\n"
+    "3,2024-01-03 09:00:00,Low,Malware,Open,Kept\n"
+)
+print(CyberAnalyticsService.incidents_over_time()["count"].sum(), matches_frame())  # 2 True
@@ -0,0 +1,28 @@
+from services.metrics import METRICS, timed, timer
+
+
+@timed("test.lookup", rows=len)
+def lookup(keys):
+    if not keys:
+        raise KeyError("nothing to look up")
+    return keys
+
+
+lookup([1, 2, 3])
+for _ in range(2):
+    try:
+        lookup([])
+    except KeyError:
+        pass
+try:
+    with timer("test.block"):
+        raise TimeoutError
+except TimeoutError:
+    pass
+
+snapshot = METRICS.snapshot()
+print(sorted((op["op"], op.get("error", ""), op["count"]) for op in snapshot["operations"]))
+# [('test.block', 'TimeoutError', 1), ('test.lookup', '', 1), ('test.lookup', 'KeyError', 2)]
+print(sorted((c["op"], c["error"], c["value"]) for c in snapshot["counters"] if c["name"] == "operation_errors"))
+# [('test.block', 'TimeoutError', 1), ('test.lookup', 'KeyError', 2)]
+print('platform_operation_errors_total{error="KeyError",op="test.lookup"} 2' in METRICS.to_prometheus())  # True
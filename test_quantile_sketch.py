@@ -0,0 +1,18 @@
+import numpy as np
+
+from services.quantile_sketch import TDigest
+
+rng = np.random.default_rng(0)
+hours = rng.gamma(2.0, 15.0, 1_000_000)
+
+# Built in four chunks and merged, as separate workers would
+digest = TDigest()
+for chunk in np.array_split(hours, 4):
+    digest.merge(TDigest().update(chunk))
+
+print(digest.count)  # 1000000.0
+print(np.round(digest.quantile([0.5, 0.9, 0.99]), 1))  # close to the exact values below
+print(np.round(np.quantile(hours, [0.5, 0.9, 0.99]), 1))
+
+restored = TDigest.from_dict(digest.to_dict())
+print(round(restored.quantile(0.99), 1) == round(digest.quantile(0.99), 1))  # True
@@ -0,0 +1,36 @@
+import os
+import tempfile
+from datetime import datetime
+from pathlib import Path
+
+from models.it_ticket import ITTicket
+from services.it_analytics_service import ITOperationsAnalyticsService
+from services.it_services import ITTicketService
+
+os.chdir(tempfile.mkdtemp())
+Path("data").mkdir()
+# 100 High tickets taking 1..100 hours, plus two 1000-hour outliers
+Path("data/it_tickets.csv").write_text(
+    "ticket_id,priority,description,status,assigned_to,created_at,resolution_time_hours\n"
+    + "".join(f"{i},High,Ticket {i},Resolved,IT_Support_A,2024-01-05 09:00:00,{i}\n" for i in range(1, 101))
+    + "101,High,Outlier,Resolved,IT_Support_B,2024-01-06 09:00:00,1000\n"
+    + "102,High,Outlier,Resolved,IT_Support_B,2024-01-06 09:00:00,1000\n"
+)
+
+
+def high():
+    row = ITOperationsAnalyticsService.resolution_times().set_index("priority").loc["High"]
+    return int(row["count"]), round(row["p99"])
+
+
+print(high())  # (102, 1000)
+
+ITTicketService.add_ticket(ITTicket(103, "High", "Added", "Resolved", "IT_Support_A", datetime(2024, 1, 7), 50))
+print(high())  # (103, 1000) (merged by delta)
+
+# Digests can't forget values: the delete leaves them to be rebuilt
+ITTicketService.delete_tickets([101, 102])
+print(high())  # (101, 99)
+
+exact = ITOperationsAnalyticsService.resolution_times(ITTicketService.load_frame()).set_index("priority").loc["High"]
+print(int(exact["count"]), round(exact["p99"]))  # 101 99
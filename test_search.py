@@ -0,0 +1,37 @@
+import os
+import tempfile
+from datetime import datetime
+from pathlib import Path
+
+from models.cyber_incident import CyberIncident
+from services.cyber_services import CyberIncidentService
+
+os.chdir(tempfile.mkdtemp())
+Path("data").mkdir()
+Path("data/cyber_incidents.csv").write_text(
+    "incident_id,timestamp,severity,category,status,description\n"
+    "1,2024-01-01 09:00:00,High,Phishing,Open,Phishing phishing phishing campaign\n"
+    "2,2024-01-02 09:00:00,Low,Malware,Open,Malware on a laptop after a phishing mail\n"
+    "3,2024-01-03 09:00:00,Low,Malware,Open,Ransomware note found on the file server\n"
+    "4,2024-01-04 09:00:00,Low,Phishing,Open,Reported phishing link in a long newsletter about many other things\n"
+)
+
+
+def ids(frame):
+    return frame["incident_id"].tolist()
+
+
+print(ids(CyberIncidentService.search("phish")))  # [1, 2, 4] (prefix, best first)
+print(ids(CyberIncidentService.search("phish", prefix=False)))  # []
+print(ids(CyberIncidentService.search('"file server"')))  # [3]
+print(ids(CyberIncidentService.search("laptop (phishing")))  # [2] (punctuation is dropped)
+print(len(CyberIncidentService.search("!!!")))  # 0
+
+# The best match is the oldest: a window of the newest two leaves it out
+print(ids(CyberIncidentService.search("phishing", window=2)))  # [2, 4]
+
+# Writes made through the service are searchable straight away
+CyberIncidentService.add_incident(
+    CyberIncident(5, datetime(2024, 1, 5, 9), "High", "Phishing", "Open", "Spear phishing of the finance team")
+)
+print(ids(CyberIncidentService.search("spear")))  # [5]
@@ -0,0 +1,77 @@
+import os
+import tempfile
+from pathlib import Path
+
+from pandas.testing import assert_frame_equal
+
+from models.schema import CYBER_INCIDENTS
+from services.cyber_services import STORE
+from services.repository import make_repository
+
+os.chdir(tempfile.mkdtemp())
+Path("data").mkdir()
+Path("data/cyber_incidents.csv").write_text(
+    "incident_id,timestamp,severity,category,status,description\n"
+    + "".join(
+        f"{i},2024-01-{1 + i % 28:02d} 09:00:00,{['Low', 'High', 'Critical'][i % 3]},Phishing,Open,Seed incident {i}\n"
+        for i in range(1, 31)
+    )
+)
+
+csv = make_repository(STORE, CYBER_INCIDENTS, "cyber_incidents", "timestamp", backend="csv")
+sqlite = make_repository(STORE, CYBER_INCIDENTS, "cyber_incidents", "timestamp", backend="sqlite")
+sqlite.frame()  # imported from the CSV before either is written to
+
+added = [
+    {"incident_id": 31, "timestamp": "2024-02-01 10:00:00", "severity": "Critical",
+     "category": "Malware", "status": "Open", "description": "Ransomware on a file server"},
+    {"incident_id": 32, "timestamp": "2024-02-02 11:00:00", "severity": "Low",
+     "category": "Malware", "status": "Open", "description": "Adware on a laptop"},
+]
+for repository in (csv, sqlite):
+    repository.append(added)
+    repository.patch_many([1, 2, 31], status="Resolved")
+    repository.delete_many([3, 32])
+    try:
+        repository.append([{**added[0], "description": "Overwrite attempt"}])
+    except ValueError:
+        print(repository.backend, "rejected a taken id")  # csv rejected a taken id / sqlite rejected a taken id
+    repository.compact()
+
+
+def ordered(df):
+    return df.sort_values("incident_id").reset_index(drop=True)
+
+
+assert_frame_equal(ordered(csv.frame()), ordered(sqlite.frame()))
+print(len(csv.frame()), sqlite.frame().set_index("incident_id").loc[31, "description"])  # 30 Ransomware on a file server
+
+# Subsets compare by value: their categories may differ
+rows = [ordered(repository.rows([1, 3, 31])).to_dict("records") for repository in (csv, sqlite)]
+print(rows[0] == rows[1], len(rows[0]))  # True 2
+
+page = {"severity": ["Critical"], "status": ["Open"]}
+pages = [repository.query(page, sort="timestamp", descending=True, limit=4) for repository in (csv, sqlite)]
+print(pages[0]["rows"].to_dict("records") == pages[1]["rows"].to_dict("records"))  # True
+print(pages[0]["total"] == pages[1]["total"], pages[0]["next_cursor"] == pages[1]["next_cursor"])  # True True
+after = pages[0]["next_cursor"]
+pages = [repository.query(page, sort="timestamp", descending=True, after=after, limit=4) for repository in (csv, sqlite)]
+print(pages[0]["rows"]["incident_id"].tolist() == pages[1]["rows"]["incident_id"].tolist())  # True
+
+# A page that ends exactly at the last of the 9 matches has no next cursor
+exact = [repository.query(page, limit=9) for repository in (csv, sqlite)]
+print([len(result["rows"]) for result in exact], [result["next_cursor"] for result in exact])  # [9, 9] [None, None]
+
+for repository in (csv, sqlite):
+    try:
+        repository.query({}, sort="severity; DROP TABLE cyber_incidents")
+    except ValueError:
+        print(repository.backend, "rejected the sort column")  # csv ... / sqlite rejected the sort column
+
+print(sqlite.search("file server")["incident_id"].tolist())  # [31]
+print(csv.search("file server")["incident_id"].tolist())  # [31]
+
+# Back on the csv backend (the configured one here), search follows the
+# CSV store again instead of the table the SQLite backend had taken over
+csv.append([{**added[1], "incident_id": 40, "description": "Keylogger found on a laptop"}])
+print(csv.search("keylogger")["incident_id"].tolist())  # [40]
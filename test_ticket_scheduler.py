@@ -0,0 +1,42 @@
+import pandas as pd
+
+from services.it_ai_insights import ITAIInsights
+from services.ticket_scheduler import TicketScheduler
+
+# Every (priority, assignee) pair takes 10 hours; Alice holds the whole backlog
+history = [(i, "High", "Resolved", assignee, 10.0) for i, assignee in enumerate(["Alice", "Bob", "Cara"] * 2, 1)]
+backlog = [(100 + i, "High", "Open", "Alice", None) for i in range(6)]
+df = pd.DataFrame(
+    history + backlog,
+    columns=["ticket_id", "priority", "status", "assigned_to", "resolution_time_hours"]
+)
+
+plan = ITAIInsights.assignment_plan(df)
+print(plan["peak_before"], plan["peak_after"])  # 180.0 60.0
+print(len(plan["moves"]), {move[1] for move in plan["moves"]})  # 4 {'Alice'}
+print(plan["after"])  # {'Alice': 60.0, 'Bob': 60.0, 'Cara': 60.0}
+
+replanned = ITAIInsights.assignment_plan(df, replan=True)
+print(replanned["peak_after"])  # 60.0
+
+# Already balanced: nothing to propose
+balanced = df.assign(assigned_to=["Alice", "Bob", "Cara"] * 4)
+print(ITAIInsights.assignment_plan(balanced)["moves"])  # []
+
+# A re-plan that doesn't lower the peak is dropped, and so are its
+# recommendations: Bob, idle in the current split, gets the next ticket
+history = [(i, priority, "Resolved", assignee, 10.0)
+           for i, (priority, assignee) in enumerate([(p, a) for p in ("Low", "Medium") for a in ("Alice", "Bob", "Cara")], 1)]
+split = pd.DataFrame(
+    history + [(100, "Low", "Open", "Cara", None), (101, "Medium", "Open", "Alice", None)],
+    columns=df.columns
+)
+rejected = ITAIInsights.assignment_plan(split, replan=True)
+print(rejected["moves"], rejected["next"]["High"])  # [] Bob
+
+# Next tickets go to whoever would finish them with the lowest load
+scheduler = TicketScheduler(["Alice", "Bob"])
+print([scheduler.assign(ticket_id, "Low") for ticket_id in range(4)])  # ['Alice', 'Bob', 'Alice', 'Bob']
+scheduler.release(0)
+scheduler.release(2)
+print(scheduler.best("Critical"))  # Alice